@@ -90,6 +90,12 @@ const buidlstringObjData = function(item, itemId) {
         status: translation.status || 'untranslated' // Default status
       };
 
+      // Machine pre-translations (see pretranslator.py) are uploaded as
+      // not approved translations, so they still need a review
+      if (stringObj.translations[lang.id].status === 'pretranslated') {
+        stringObj.translations[lang.id].status = 'translated';
+      }
+
       contexTranslations[lang.id] = stringObj.translations[lang.id];
     }
   }
@@ -12,21 +12,40 @@
 # TODO: remove after Python < 3.9 is no longer used/supported
 from __future__ import annotations
 
-import re, json, os, argparse
+import re, os, sys, argparse, queue, threading
 from typing import Optional
 
-import tkinter as tk
-from tkinter import filedialog, messagebox
+# The extraction and merge come from the `plamemo` package, next to json-exporter.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-ENGLISH_TAG = "en"
-JAPANESE_TAG = "ja"
-SPANISH_TAG = "es-ES"
+from plamemo import (
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    SceneMismatchError,
+    get_file_pairs,
+    process_file_pair,
+    save_extracted_translations,
+)
 
+# NOTE: `tkinter` is imported lazily (see `get_tk_root`), so CLI-only runs
+# and frozen executables don't pay for loading the GUI
 
-class SceneMismatchError(Exception):
-    """Exception raised for mismatched scenes in input files."""
 
-    pass
+# Hidden Tk root shared by every dialog, created on first use
+_tk_root = None
+
+
+def get_tk_root():
+    """
+    Returns the shared hidden Tk root, importing `tkinter` and creating it on first use.
+    """
+    global _tk_root
+    if _tk_root is None:
+        import tkinter as tk
+
+        _tk_root = tk.Tk()
+        _tk_root.withdraw()  # Hide the root window
+    return _tk_root
 
 
 # ============================== DEPRECATED =============================
@@ -37,9 +56,10 @@ def input_file_selector(language: str = None) -> str:
     """
     Opens a file dialog to select a file and returns the selected file path.
     """
-    root = tk.Tk()
-    root.withdraw()  # Hide the root window
+    from tkinter import filedialog
+
     file_path = filedialog.askopenfilename(
+        parent=get_tk_root(),
         title=(
             f"Select the {language.upper()} JSON file"
             if language
@@ -60,6 +80,8 @@ def output_file_namer(
     - It can recognize if the input files are from different scenes to say ERROR.
     - Otherwise, if the input files don't match the filename format, it will open a file dialog to save the file with a custom title.
     """
+    from tkinter import filedialog
+
     pattern = r"pm(\d{2}_\d{2})\.txt\.scn\.m\.json"
     match_en = re.search(pattern, input_file_path_en)
     match_ja = re.search(pattern, input_file_path_ja)
@@ -77,6 +99,7 @@ def output_file_namer(
         default_filename = "extracted.json"
 
     return filedialog.asksaveasfilename(
+        parent=get_tk_root(),
         title="Save file as",
         defaultextension=".json",
         initialfile=default_filename,
@@ -91,14 +114,15 @@ def input_folder_selector(language: str = None) -> str:
     """
     Opens a folder dialog to select a folder and returns the selected folder path.
     """
-    root = tk.Tk()
-    root.withdraw()  # Hide the root window
+    from tkinter import filedialog
+
     folder_path = filedialog.askdirectory(
+        parent=get_tk_root(),
         title=(
             f"Select the folder containing {language.upper()} JSON files"
             if language
             else "Select a folder"
-        )
+        ),
     )
     return folder_path
 
@@ -108,314 +132,153 @@ def output_folder_selector() -> str:
     Opens a folder dialog to select a folder for saving output files.
     Returns the selected folder path.
     """
-    root = tk.Tk()
-    root.withdraw()  # Hide the root window
+    from tkinter import filedialog
+
     folder_path = filedialog.askdirectory(
-        title="Select the folder to save OUTPUT files"
+        parent=get_tk_root(), title="Select the folder to save OUTPUT files"
     )
     return folder_path
 
 
-def get_file_pairs(folder_en: str, folder_ja: str) -> list[dict]:
-    """
-    Matches files with the same name in the English and Japanese folders.
-    Returns a list of dictionaries with matched file paths.
-    Files without a match will still be included with a None value for the missing counterpart.
-    """
-    files_en = {f for f in os.listdir(folder_en) if f.endswith(".json")}
-    files_ja = {f for f in os.listdir(folder_ja) if f.endswith(".json")}
-
-    all_files = files_en | files_ja  # Union of all filenames
-    file_pairs = []
-
-    for file_name in all_files:
-        file_pairs.append(
-            {
-                ENGLISH_TAG: (
-                    os.path.join(folder_en, file_name)
-                    if file_name in files_en
-                    else None
-                ),
-                JAPANESE_TAG: (
-                    os.path.join(folder_ja, file_name)
-                    if file_name in files_ja
-                    else None
-                ),
-            }
-        )
-
-    return file_pairs
+# ================================ EXPORT ======================================
 
 
-def load_data(input_file_path: str) -> dict:
+def export_file_pair(file_pair: dict, output_folder_path: str) -> None:
     """
-    Loads the JSON file from the specified path.
+    Loads, extracts, merges and saves the translations of a single EN/JA file pair.
     """
-    with open(input_file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    processed_file = process_file_pair(file_pair)
+    save_extracted_translations(
+        processed_file.translations_merged,
+        os.path.join(output_folder_path, processed_file.output_file_name),
+    )
 
 
-def save_extracted_translations(
-    extracted_translations: dict, output_file_path: str
+def export_worker(
+    file_pairs: list[dict],
+    output_folder_path: str,
+    progress_queue: queue.Queue,
+    cancel_event: threading.Event,
 ) -> None:
     """
-    Saves the extracted translations dictionary to a JSON file.
+    Exports every file pair, reporting to `progress_queue` after each file.
+    Runs in a background thread, so it never touches Tk widgets. Messages are tuples:
+    - `("progress", done_count, total_count, file_name)`
+    - `("done", done_count, total_count)`
+    - `("cancelled", done_count, total_count)`
+    - `("error", message)`
     """
-    with open(output_file_path, "wb") as fp:
-        fp.write(
-            json.dumps(extracted_translations, ensure_ascii=False, indent=2).encode(
-                "utf8"
+    total_count = len(file_pairs)
+    try:
+        for done_count, file_pair in enumerate(file_pairs):
+            if cancel_event.is_set():
+                progress_queue.put(("cancelled", done_count, total_count))
+                return
+
+            export_file_pair(file_pair, output_folder_path)
+            file_name = os.path.basename(
+                file_pair.get(ENGLISH_TAG) or file_pair.get(JAPANESE_TAG)
             )
-        )
+            progress_queue.put(("progress", done_count + 1, total_count, file_name))
 
+        progress_queue.put(("done", total_count, total_count))
 
-# ============================== MAIN FUNCTIONS ====================================
+    except Exception as e:
+        progress_queue.put(("error", str(e)))
 
 
-def getDefaultScenesTexts(
-    scene: dict, file_title: str, global_labels: list, simplified: bool
-) -> dict:
-    """
-    Get texts and details from the Default type scenes
-
-    Note: scene objects has the following format:
-
-    # type 1: default scenes
-    ```
-    scenes: [
-      {
-        label: '',
-        texts: [
-          [
-            'Eru',           # t[0]: character name
-            'Girl',          # t[1]: apparently the temporary name before revealing the character name
-            'Good morning!'  # t[2]: text/dialog
-          ]
-        ]
-      }
-    ]
-    ```
-    """
-    texts = {}
-    scene_label = scene["label"].strip("*")
-    scene_title = scene["title"]
-
-    for i in range(len(scene["texts"])):
-        text_group = scene["texts"][i]
-        # format number with leading zero
-        identifier = f"{file_title}-{scene_label}.{i:02d}"
-
-        # voice-off when no character available
-        character = text_group[0] if text_group[0] is not None else "voice-off"
-
-        # checks if temporary name is present (the name before the)
-        # e.g: Eru is not revealed as 'Eru', but as 'Girl' when Tsukasa meets her
-        before_revealing_name = text_group[1] if text_group[1] is not None else None
-
-        labels = [
-            "character:{}".format(character),
-            "scene-type:default",
-            "scene-label:{}".format(scene_label),
-            "scene-title:{}".format(scene_title),
-        ]
-
-        if before_revealing_name is not None:
-            labels.append("before-revealing-name:{}".format(before_revealing_name))
-
-        texts[identifier] = {
-            "character": character,
-            "text": text_group[2],
-            "translations": {},
-        }
-
-        # Exclude context properties in simplified format
-        if not simplified:
-            context = "japanese context"
-            custom_data = "character:{}".format(character)
-
-            extend = {
-                "isHidden": False,
-                "context": context,
-                "labels": labels + global_labels,
-                "customData": custom_data,
-            }
-            texts[identifier].update(extend)
-
-    return texts
-
-
-def getSelectionScenesTexts(
-    scene: dict, file_title: str, global_labels: list, simplified: bool
-) -> dict:
+def run_export_with_progress(file_pairs: list[dict], output_folder_path: str) -> None:
     """
-    Get texts and details from the Selection type scenes
-
-    Note: scene objects has the following format:
-
-    ### type 2: selection scenes
-    ```
-    scenes: [
-      {
-        label: '',
-        selects: {
-          0: {
-            target: ''  # target scene label (optional)
-            text: ''
-          },
-          1: {
-            target: ''  # target scene label (optional)
-            text: ''
-          },
-        }
-      }
-    ]
-    ```
+    Shows a progress window while `export_worker` runs in a background thread.
+    The Tk main loop only polls the progress queue, so the window stays responsive.
     """
-    texts = {}
-    scene_label = scene["label"].strip("*")
-    scene_title = scene["title"]
-
-    for i in range(len(scene["selects"])):
-        text_group = scene["selects"][i]
-        # format number with leading zero
-        identifier = f"{file_title}-{scene_label}.{i:02d}"
-
-        # scene target
-        scene_target = (
-            text_group["target"].strip("*") if "target" in text_group else "none"
-        )
-
-        labels = [
-            "scene-type:selection",
-            "scene-label:{}".format(scene_label),
-            "scene-title:{}".format(scene_title),
-            "scene-target:{}".format(scene_target),
-        ]
-
-        texts[identifier] = {
-            "text": text_group["text"],
-            "translations": {},
-        }
+    import tkinter as tk
+    from tkinter import messagebox, ttk
 
-        # Exclude context properties in simplified format
-        if not simplified:
-            context = "jap context"
-            custom_data = "character:{}".format("pending")
+    root = get_tk_root()
+    window = tk.Toplevel(root)
+    window.title("Exporting translations")
+    window.resizable(False, False)
 
-            extend = {
-                "isHidden": False,
-                "context": context,
-                "labels": labels + global_labels,
-                "customData": custom_data,
-            }
-            texts[identifier].update(extend)
-
-    return texts
+    status_text = tk.StringVar(value="Starting...")
+    progress_bar = ttk.Progressbar(
+        window, length=360, mode="determinate", maximum=len(file_pairs)
+    )
+    progress_bar.pack(padx=16, pady=(16, 8))
+    tk.Label(window, textvariable=status_text, anchor="w").pack(fill="x", padx=16)
+
+    progress_queue = queue.Queue()
+    cancel_event = threading.Event()
+
+    def cancel() -> None:
+        cancel_event.set()
+        status_text.set("Cancelling after the current file...")
+        cancel_button.config(state="disabled")
+
+    cancel_button = tk.Button(window, text="Cancel", command=cancel)
+    cancel_button.pack(pady=(8, 16))
+    # Closing the window cancels the export too
+    window.protocol("WM_DELETE_WINDOW", cancel)
+
+    def finish(show_message, title: str, message: str) -> None:
+        window.destroy()
+        show_message(title, message, parent=root)
+        root.quit()
+
+    def poll_queue() -> None:
+        try:
+            while True:
+                message = progress_queue.get_nowait()
+                kind = message[0]
+                if kind == "progress":
+                    _, done_count, total_count, file_name = message
+                    progress_bar["value"] = done_count
+                    status_text.set(f"{done_count}/{total_count}: {file_name}")
+                elif kind == "done":
+                    finish(
+                        messagebox.showinfo,
+                        "Success",
+                        "Translations extracted successfully for all matched files.",
+                    )
+                    return
+                elif kind == "cancelled":
+                    _, done_count, total_count = message
+                    finish(
+                        messagebox.showwarning,
+                        "Cancelled",
+                        f"Export cancelled after {done_count} of {total_count} files.",
+                    )
+                    return
+                elif kind == "error":
+                    finish(messagebox.showerror, "Error", message[1])
+                    return
+        except queue.Empty:
+            pass
+        window.after(100, poll_queue)
+
+    worker = threading.Thread(
+        target=export_worker,
+        args=(file_pairs, output_folder_path, progress_queue, cancel_event),
+        daemon=True,
+    )
+    worker.start()
+    window.after(100, poll_queue)
+    root.mainloop()
 
 
-def extract_translations(data: dict, simplified=False) -> dict:
+def run_export_headless(file_pairs: list[dict], output_folder_path: str) -> None:
     """
-    Processes the loaded JSON and extracts translations organized by scenes.
+    Exports every file pair printing the progress, without loading the GUI.
     """
-    # Common data
-    filename = data["name"]
-    file_title = filename.split(".")[0]
-    global_labels = ["filename:{}".format(filename)]
-
-    texts = {}
-    for scene in data["scenes"]:
-        scene_label = scene["label"].strip("*")
-        # type 1: default scenes
-        if "texts" in scene:
-            texts[scene_label] = getDefaultScenesTexts(
-                scene, file_title, global_labels, simplified
-            )
-        # type 2: selection scenes
-        if "selects" in scene:
-            texts[scene_label] = getSelectionScenesTexts(
-                scene, file_title, global_labels, simplified
-            )
-
-    extracted_translations = {"texts": texts}
-
-    # Exclude context properties in simplified format
-    if not simplified:
-        extend = {
-            "filename": filename,
-            "labels": global_labels,
-        }
-        extracted_translations = {**extend, **extracted_translations}
-
-    return extracted_translations
-
+    total_count = len(file_pairs)
+    for done_count, file_pair in enumerate(file_pairs, start=1):
+        export_file_pair(file_pair, output_folder_path)
+        file_name = os.path.basename(
+            file_pair.get(ENGLISH_TAG) or file_pair.get(JAPANESE_TAG)
+        )
+        print(f"[{done_count}/{total_count}] {file_name}")
 
-def translations_merger(
-    translations_en: dict | None, translations_ja: dict | None
-) -> dict:
-    """
-    Merges Japanese translations into the English translations.
-    Adds an empty Spanish translation with status 'untranslated'.
-    If Japanese or English translation doesn't exist fully or partially, leaves that space blank.
-    """
-    # Initialize the merged translations with an empty structure
-    merged_translations = {"texts": {}}
-
-    # Get the scenes from both translations, defaulting to empty dicts if missing
-    scenes_en = translations_en.get("texts", {}) if translations_en else {}
-    scenes_ja = translations_ja.get("texts", {}) if translations_ja else {}
-
-    # Combine all scene labels from both translations
-    all_scene_labels = set(scenes_en.keys()) | set(scenes_ja.keys())
-
-    for scene_label in all_scene_labels:
-        # Get texts for the current scene from both translations
-        scene_texts_en = scenes_en.get(scene_label, {})
-        scene_texts_ja = scenes_ja.get(scene_label, {})
-
-        # Initialize the merged scene
-        merged_scene = {}
-
-        # Combine all identifiers (keys) from both translations
-        all_identifiers = set(scene_texts_en.keys()) | set(scene_texts_ja.keys())
-
-        for identifier in all_identifiers:
-            # Get text data for the current identifier from both translations
-            text_data_en = scene_texts_en.get(identifier, {})
-            text_data_ja = scene_texts_ja.get(identifier, {})
-
-            # Extract the English and Japanese texts (default to empty strings if missing)
-            en_text = text_data_en.get("text", "(No English source available)")
-            ja_text = text_data_ja.get("text", "(No Japanese source available)")
-
-            # Merge the translations
-            merged_scene[identifier] = {
-                "text": en_text,  # Use English text as the base
-                "translations": {
-                    JAPANESE_TAG: {
-                        "text": ja_text,
-                        "status": "approved" if ja_text else "untranslated",
-                    },
-                    ENGLISH_TAG: {
-                        "text": en_text,
-                        "status": "approved" if en_text else "untranslated",
-                    },
-                    SPANISH_TAG: {
-                        "text": "",
-                        "status": "untranslated",
-                    },
-                },
-                # Add context if Japanese text exists, otherwise provide a default message
-                "context": (
-                    f"Original Text: {ja_text}"
-                    if ja_text
-                    else "No Japanese source available, probably it's original content."
-                ),
-            }
-
-        # Add the merged scene to the merged translations
-        merged_translations["texts"][scene_label] = merged_scene
-
-    return merged_translations
+    print(f"\nTranslations extracted successfully for all matched files.")
 
 
 # ================================ MAIN ======================================
@@ -426,7 +289,13 @@ def main(
 ) -> Optional[dict]:
     """
     Main function that executes the loading, extraction, and saving of translations.
+    When every folder is provided via CLI, runs without GUI. Otherwise, asks for the missing
+    folders and shows the export progress in a window.
     """
+    headless = bool(
+        input_folder_path_en and input_folder_path_ja and output_folder_path
+    )
+
     try:
         # If folders are not provided via CLI, use folder selectors
         if not input_folder_path_en:
@@ -449,58 +318,20 @@ def main(
         if not file_pairs:
             raise SceneMismatchError("No matching files found in the selected folders.")
 
-        # Process each file pair
-        for file_pair in file_pairs:
-            input_file_path_en = file_pair.get(ENGLISH_TAG)
-            input_file_path_ja = file_pair.get(JAPANESE_TAG)
-
-            # Generate output file name
-            output_file_name = os.path.basename(
-                input_file_path_en or input_file_path_ja
-            ).replace(".txt.scn.m.json", ".txt_crowdin.json")
-            output_file_path_full = os.path.join(output_folder_path, output_file_name)
-
-            simplified = False
-
-            # Load and process data depending on the existing files and data
-            if input_file_path_en and input_file_path_ja:
-                data_en = load_data(input_file_path_en) if input_file_path_en else {}
-                data_ja = load_data(input_file_path_ja) if input_file_path_ja else {}
-                extracted_translations_en = extract_translations(data_en, simplified)
-                extracted_translations_ja = extract_translations(data_ja, simplified)
-                extracted_translations_merged = translations_merger(
-                    extracted_translations_en, extracted_translations_ja
-                )
-            elif not input_file_path_en:  # EN file doesn't exist
-                data_ja = load_data(input_file_path_ja) if input_file_path_ja else {}
-                extracted_translations_ja = extract_translations(data_ja, simplified)
-                extracted_translations_merged = translations_merger(
-                    None, extracted_translations_ja
-                )
-            elif not input_file_path_ja:  # ja file doesn't exist
-                data_en = load_data(input_file_path_en) if input_file_path_en else {}
-                extracted_translations_en = extract_translations(data_en, simplified)
-                extracted_translations_merged = translations_merger(
-                    extracted_translations_en, None
-                )
-
-            # Save merged translations
-            save_extracted_translations(
-                extracted_translations_merged, output_file_path_full
-            )
-
-        messagebox.showinfo(
-            "Success",
-            f"Translations extracted successfully for all matched files.",
-        )
-        return None
-
-    except SceneMismatchError as e:
-        messagebox.showerror("Error", str(e))
+        if headless:
+            run_export_headless(file_pairs, output_folder_path)
+        else:
+            run_export_with_progress(file_pairs, output_folder_path)
         return None
 
     except Exception as e:
-        messagebox.showerror("Error", str(e))
+        if headless:
+            print(f"Error: {e}")
+            exit(1)
+
+        from tkinter import messagebox
+
+        messagebox.showerror("Error", str(e), parent=get_tk_root())
         return None
 
 
@@ -530,7 +361,9 @@ if __name__ == "__main__":
     # Validate CLI arguments
     if not args.input_folder_en and not args.input_folder_ja and not args.output_folder:
         parser.print_help()
-        print("\nError: No valid arguments provided. Please specify at least one option.")
+        print(
+            "\nError: No valid arguments provided. Please specify at least one option."
+        )
         exit(1)
 
     # Call main with CLI arguments
@@ -0,0 +1,155 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Single entry point for every tool of the translations manager, e.g.
+#
+#     python cli.py export --input-folder-en <en> --input-folder-ja <ja> --output-folder <out>
+#     python cli.py validate <folder>
+#
+# Each subcommand runs the tool script as if it was called directly, with the same options.
+# Tools are only imported when their subcommand is dispatched, so `--help` and frozen
+# executables start fast. Keep this module free of imports beyond `os` and `sys`.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import os, sys
+
+# subcommand -> (module, folder relative to this file, description)
+COMMANDS = {
+    "export": (
+        "json-exporter",
+        "",
+        "Extract and merge the game scripts into CROWDIN files.",
+    ),
+    "gui": (
+        "json-exporter-with-gui",
+        "TODO-gui-version",
+        "Export with folder selection dialogs and a progress window.",
+    ),
+    "validate": (
+        "crowdin_validator",
+        "",
+        "Validate CROWDIN files before uploading them.",
+    ),
+    "report": (
+        "progress_report",
+        "",
+        "Translation progress and remaining workload.",
+    ),
+    "overflow": (
+        "text_overflow_checker",
+        "",
+        "Find translations that overflow the text box.",
+    ),
+    "markup": (
+        "markup_checker",
+        "",
+        "Compare the markup of source and translated lines.",
+    ),
+    "qa": (
+        "qa_engine",
+        "",
+        "Run every QA rule over the translations in one pass.",
+    ),
+    "glossary": (
+        "glossary_checker",
+        "",
+        "Check the glossary terms of the translations.",
+    ),
+    "pretranslate": (
+        "pretranslator",
+        "",
+        "Pre-fill untranslated lines with machine translation.",
+    ),
+    "split": (
+        "output_planner",
+        "",
+        "Split CROWDIN bundles back into one file per script.",
+    ),
+    "archive": (
+        "export_archive",
+        "",
+        "List, extract and diff export archives.",
+    ),
+    "convert": (
+        "output_formats",
+        "",
+        "Convert between the CROWDIN JSON, XLIFF, PO and CSV formats.",
+    ),
+    "preview": (
+        "preview_server",
+        "",
+        "Serve a local preview of the scenes.",
+    ),
+    "corpus": (
+        "corpus_cache",
+        "",
+        "Inspect the corpus cache.",
+    ),
+    "benchmark": (
+        "startup_benchmark",
+        "",
+        "Measure the startup time of the CLI.",
+    ),
+}
+
+PROGRAM_NAME = os.path.basename(sys.argv[0]) if sys.argv else "cli.py"
+
+
+def print_help() -> None:
+    width = max(len(command) for command in COMMANDS)
+    print(f"usage: {PROGRAM_NAME} <command> [options]\n")
+    print("Translations manager tools. Run a command with --help to see its options.\n")
+    print("commands:")
+    for command, (_, _, description) in COMMANDS.items():
+        print(f"  {command.ljust(width)}  {description}")
+
+
+def hidden_imports() -> list[str]:
+    """
+    Modules of the subcommands, for PyInstaller: they're imported dynamically so it can't find them.
+    """
+    return [module for module, _, _ in COMMANDS.values()] + ["plamemo"]
+
+
+def run_command(command: str, arguments: list[str]) -> None:
+    """
+    Runs the tool of a subcommand as `__main__`, with the given command line arguments.
+    """
+    import runpy
+
+    module, folder, _ = COMMANDS[command]
+    if folder:
+        sys.path.insert(
+            0, os.path.join(os.path.dirname(os.path.abspath(__file__)), folder)
+        )
+    sys.argv = [sys.argv[0], *arguments]
+    # The tool replaces `__main__` while it runs, as if it was called directly:
+    # process pools pickle its functions by looking them up in `__main__`,
+    # and spawned workers import it again from its module name
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+def main(arguments: list[str]) -> int:
+    if not arguments or arguments[0] in ("-h", "--help"):
+        print_help()
+        return 0 if arguments else 1
+
+    if arguments[0] == "--hidden-imports":
+        print(" ".join(f"--hidden-import {module}" for module in hidden_imports()))
+        return 0
+
+    command = arguments[0]
+    if command not in COMMANDS:
+        print_help()
+        print(f"\nError: unknown command '{command}'.")
+        return 1
+
+    run_command(command, arguments[1:])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
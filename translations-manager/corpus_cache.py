@@ -0,0 +1,452 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Compact binary cache of the whole game script, written by json-exporter.py as a side effect.
+# Reading it with `mmap` gives lazy access to any line without parsing the `.scn.m.json` files again.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import argparse, hashlib, mmap, os, struct
+from typing import Iterator, NamedTuple, Optional
+
+from plamemo import label_value
+
+CORPUS_CACHE_FILENAME = "corpus.pmcache"
+
+# File layout (little endian):
+#
+#   header          MAGIC, VERSION, reserved, section count
+#   section table   one SECTION_ENTRY per source file
+#   sections        for each file: fixed-width records, then its string table
+#
+# Every record field is an (offset, length) pair pointing into the string table
+# of its own section, so a section can be read without touching the others.
+MAGIC = b"PMCC"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+# source hash, name offset/length, records offset, record count, strings offset/length
+SECTION_ENTRY = struct.Struct("<20sIIIIII")
+
+RECORD_FIELDS = (
+    "identifier",
+    "character",
+    "scene_label",
+    "scene_title",
+    "text_en",
+    "text_ja",
+)
+RECORD = struct.Struct("<" + "II" * len(RECORD_FIELDS))
+
+
+class CorpusCacheError(Exception):
+    """Exception raised for unreadable or incompatible corpus cache files."""
+
+    pass
+
+
+class CorpusLine(NamedTuple):
+    identifier: str
+    character: str
+    scene_label: str
+    scene_title: str
+    text_en: str
+    text_ja: str
+
+
+# ============================== UTIL ====================================
+
+
+def source_hash(*file_paths: Optional[str]) -> bytes:
+    """
+    Returns the SHA-1 digest of the given source files, in order.
+    Missing counterparts (None) are hashed as an empty marker so EN-only and JA-only files differ.
+    """
+    digest = hashlib.sha1()
+    for file_path in file_paths:
+        digest.update(b"\0")
+        if file_path is None:
+            continue
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+    return digest.digest()
+
+
+def records_from_extracted(
+    translations_en: dict | None, translations_ja: dict | None
+) -> list[CorpusLine]:
+    """
+    Builds the cache records from the output of `extract_translations` for both languages.
+    Records are sorted by identifier, which is what the reader uses for lookups.
+    """
+    scenes_en = translations_en.get("texts", {}) if translations_en else {}
+    scenes_ja = translations_ja.get("texts", {}) if translations_ja else {}
+
+    records = []
+    for scene_label in set(scenes_en.keys()) | set(scenes_ja.keys()):
+        scene_texts_en = scenes_en.get(scene_label, {})
+        scene_texts_ja = scenes_ja.get(scene_label, {})
+
+        for identifier in set(scene_texts_en.keys()) | set(scene_texts_ja.keys()):
+            text_data_en = scene_texts_en.get(identifier, {})
+            text_data_ja = scene_texts_ja.get(identifier, {})
+            # EN is the base language, JA is only used when EN is missing
+            text_data = text_data_en or text_data_ja
+            records.append(
+                CorpusLine(
+                    identifier=identifier,
+                    character=text_data.get("character", ""),
+                    scene_label=scene_label,
+                    scene_title=label_value(text_data.get("labels", []), "scene-title")
+                    or "",
+                    text_en=text_data_en.get("text") or "",
+                    text_ja=text_data_ja.get("text") or "",
+                )
+            )
+
+    records.sort(key=lambda record: record.identifier)
+    return records
+
+
+# ============================== WRITER ====================================
+
+
+class CorpusCacheWriter:
+    """
+    Collects one section per source file and writes them in a single cache file.
+    """
+
+    def __init__(self) -> None:
+        self.sections = []
+
+    def add_file(
+        self, file_name: str, file_hash: bytes, records: list[CorpusLine]
+    ) -> None:
+        """
+        Adds the section of a source file. Strings are deduplicated inside each section.
+        """
+        strings = bytearray()
+        string_offsets = {}
+
+        def intern(value: str) -> tuple:
+            if value not in string_offsets:
+                encoded = value.encode("utf8")
+                string_offsets[value] = (len(strings), len(encoded))
+                strings.extend(encoded)
+            return string_offsets[value]
+
+        name = intern(file_name)
+        packed_records = bytearray()
+        for record in records:
+            fields = []
+            for value in record:
+                fields.extend(intern(value or ""))
+            packed_records.extend(RECORD.pack(*fields))
+
+        self.sections.append(
+            (
+                file_name,
+                file_hash,
+                name,
+                len(records),
+                bytes(packed_records),
+                bytes(strings),
+            )
+        )
+
+    def write(self, output_file_path: str) -> None:
+        """
+        Writes the cache file. The file is replaced atomically so readers never see a partial cache.
+        """
+        # Sections are kept sorted by file name
+        self.sections.sort(key=lambda section: section[0])
+        offset = HEADER.size + SECTION_ENTRY.size * len(self.sections)
+
+        table = bytearray(HEADER.pack(MAGIC, VERSION, 0, len(self.sections)))
+        body = bytearray()
+        for _, file_hash, name, record_count, packed_records, strings in self.sections:
+            records_offset = offset + len(body)
+            body.extend(packed_records)
+            strings_offset = offset + len(body)
+            body.extend(strings)
+            table.extend(
+                SECTION_ENTRY.pack(
+                    file_hash,
+                    name[0],
+                    name[1],
+                    records_offset,
+                    record_count,
+                    strings_offset,
+                    len(strings),
+                )
+            )
+
+        temporary_file_path = output_file_path + ".tmp"
+        try:
+            with open(temporary_file_path, "wb") as fp:
+                fp.write(table)
+                fp.write(body)
+            os.replace(temporary_file_path, output_file_path)
+        finally:
+            # Only left when writing failed
+            if os.path.exists(temporary_file_path):
+                os.remove(temporary_file_path)
+
+
+# ============================== READER ====================================
+
+
+class CorpusSection:
+    """
+    Lazy view over the records of one source file. Lines are only decoded when accessed.
+    """
+
+    def __init__(
+        self,
+        buffer: memoryview,
+        file_hash: bytes,
+        records_offset: int,
+        record_count: int,
+        strings_offset: int,
+        strings_length: int,
+    ) -> None:
+        self.buffer = buffer
+        self.file_hash = file_hash
+        self.records_offset = records_offset
+        self.record_count = record_count
+        self.strings = buffer[strings_offset : strings_offset + strings_length]
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def __getitem__(self, index: int) -> CorpusLine:
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError("corpus line index out of range")
+        fields = RECORD.unpack_from(
+            self.buffer, self.records_offset + index * RECORD.size
+        )
+        return CorpusLine(
+            *(
+                str(self.strings[fields[i] : fields[i] + fields[i + 1]], "utf8")
+                for i in range(0, len(fields), 2)
+            )
+        )
+
+    def __iter__(self) -> Iterator[CorpusLine]:
+        for index in range(self.record_count):
+            yield self[index]
+
+    def raw(self, index: int, field: str) -> memoryview:
+        """
+        Returns the UTF-8 bytes of a single field without copying them out of the cache.
+        """
+        position = RECORD_FIELDS.index(field) * 2
+        fields = RECORD.unpack_from(
+            self.buffer, self.records_offset + index * RECORD.size
+        )
+        return self.strings[fields[position] : fields[position] + fields[position + 1]]
+
+    def identifier_at(self, index: int) -> str:
+        return str(self.raw(index, "identifier"), "utf8")
+
+    def find(
+        self,
+        identifier: str,
+        text_en: Optional[str] = None,
+        text_ja: Optional[str] = None,
+    ) -> Optional[CorpusLine]:
+        """
+        Returns the line with the given identifier, using a binary search over the sorted records.
+        If `text_en` or `text_ja` are given (e.g. from a Crowdin file) and differ from the cached
+        texts, the cache was built from other sources: the line is stale and None is returned.
+        Missing sources are cached as empty texts, they're not compared.
+        """
+        low, high = 0, self.record_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.identifier_at(middle) < identifier:
+                low = middle + 1
+            else:
+                high = middle
+        if low >= self.record_count or self.identifier_at(low) != identifier:
+            return None
+        line = self[low]
+        for cached_text, text in ((line.text_en, text_en), (line.text_ja, text_ja)):
+            if cached_text and text is not None and cached_text != text:
+                return None
+        return line
+
+
+class CorpusCache:
+    """
+    Memory-mapped reader of a corpus cache file. Only the section table is parsed when opening it.
+    """
+
+    def __init__(self, cache_file_path: str) -> None:
+        self.file = open(cache_file_path, "rb")
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self.file.close()
+            raise CorpusCacheError(f"Corpus cache is empty: {cache_file_path}")
+
+        self.buffer = memoryview(self.mmap)
+        try:
+            magic, version, _, section_count = HEADER.unpack_from(self.buffer, 0)
+            if magic != MAGIC or version != VERSION:
+                raise CorpusCacheError(
+                    f"Unsupported corpus cache format: {cache_file_path}"
+                )
+            self.entries = self.read_section_table(section_count)
+        except (struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise CorpusCacheError(
+                f"Corpus cache is truncated or corrupted: {cache_file_path}"
+            ) from e
+        except CorpusCacheError:
+            self.close()
+            raise
+
+    def read_section_table(self, section_count: int) -> dict:
+        """
+        Returns `{file name: section table entry}`, checking every section fits in the file.
+        """
+        entries = {}
+        for i in range(section_count):
+            entry = SECTION_ENTRY.unpack_from(
+                self.buffer, HEADER.size + i * SECTION_ENTRY.size
+            )
+            (
+                _,
+                name_offset,
+                name_length,
+                records_offset,
+                record_count,
+                strings_offset,
+                strings_length,
+            ) = entry
+            if (
+                records_offset + record_count * RECORD.size > len(self.buffer)
+                or strings_offset + strings_length > len(self.buffer)
+                or name_offset + name_length > strings_length
+            ):
+                raise struct.error("section out of the file bounds")
+            name_start = strings_offset + name_offset
+            name = str(self.buffer[name_start : name_start + name_length], "utf8")
+            entries[name] = entry
+        return entries
+
+    def __enter__(self) -> CorpusCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            self.buffer.release()
+            self.mmap.close()
+        except BufferError:
+            # sections still reference the mapping, it's released once they're collected
+            pass
+        self.file.close()
+
+    def files(self) -> list[str]:
+        return sorted(self.entries)
+
+    def is_fresh(self, file_name: str, file_hash: bytes) -> bool:
+        """
+        Whether the section of `file_name` was built from a source with the given hash
+        (see `source_hash`).
+        """
+        entry = self.entries.get(file_name)
+        return entry is not None and entry[0] == file_hash
+
+    def section(
+        self, file_name: str, file_hash: Optional[bytes] = None
+    ) -> Optional[CorpusSection]:
+        """
+        Returns the section of a source file.
+        If `file_hash` is given and doesn't match, the section is stale and None is returned.
+        """
+        if file_hash is not None and not self.is_fresh(file_name, file_hash):
+            return None
+        entry = self.entries.get(file_name)
+        if entry is None:
+            return None
+        (
+            stored_hash,
+            _,
+            _,
+            records_offset,
+            record_count,
+            strings_offset,
+            strings_length,
+        ) = entry
+        return CorpusSection(
+            self.buffer,
+            stored_hash,
+            records_offset,
+            record_count,
+            strings_offset,
+            strings_length,
+        )
+
+    def __iter__(self) -> Iterator[CorpusLine]:
+        for file_name in self.files():
+            yield from self.section(file_name)
+
+
+def open_corpus_cache(cache_file_path: str) -> Optional[CorpusCache]:
+    """
+    Opens the corpus cache if there's one. The tools reading it work without it too,
+    so an unreadable cache is reported and ignored.
+    """
+    if not os.path.exists(cache_file_path):
+        return None
+    try:
+        return CorpusCache(cache_file_path)
+    except (OSError, CorpusCacheError) as e:
+        print(f"Warning: the corpus cache is ignored. {e}")
+        return None
+
+
+# ================================ MAIN ======================================
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Inspect a corpus cache written by json-exporter.py."
+    )
+    parser.add_argument("cache_file", type=str, help="Path to the corpus cache file.")
+    parser.add_argument("--file", type=str, help="Print the lines of this source file.")
+    parser.add_argument(
+        "--identifier",
+        type=str,
+        help="Print a single line by identifier (requires --file).",
+    )
+    args = parser.parse_args()
+
+    with CorpusCache(args.cache_file) as cache:
+        if not args.file:
+            for file_name in cache.files():
+                print(f"{file_name}\t{len(cache.section(file_name))} lines")
+            exit(0)
+
+        section = cache.section(args.file)
+        if section is None:
+            print(f"Error: {args.file} is not in the corpus cache.")
+            exit(1)
+
+        lines = [section.find(args.identifier)] if args.identifier else section
+        for line in lines:
+            if line is None:
+                print(f"Error: {args.identifier} is not in {args.file}.")
+                exit(1)
+            print(
+                f"{line.identifier}\t{line.character}\t{line.text_en}\t{line.text_ja}"
+            )
@@ -0,0 +1,274 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# This script validates the `.txt_crowdin.json` files generated by json-exporter.py before uploading them.
+# It checks the contract expected by `crowdin/custom-file-importer.js` and `crowdin/custom-file-exporter.js`,
+# so rejected strings are found locally instead of after a slow upload.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import json, os, argparse
+from typing import Optional
+
+from plamemo import ENGLISH_TAG, JAPANESE_TAG, SPANISH_TAG, get_crowdin_files
+
+
+# Same as `forcedTargetLanguages` in crowdin/custom-file-importer.js
+TARGET_LANGUAGES = (ENGLISH_TAG, JAPANESE_TAG, SPANISH_TAG)
+# 'pretranslated' is written by pretranslator.py, the importer uploads it as 'translated'
+TRANSLATION_STATUSES = ("untranslated", "translated", "approved", "pretranslated")
+CUSTOM_DATA_MAX_LENGTH = 4096
+
+ERROR = "error"
+WARNING = "warning"
+
+
+# ============================== UTIL ====================================
+
+
+def issue(
+    severity: str,
+    code: str,
+    message: str,
+    file_path: str,
+    scene_label: Optional[str] = None,
+    identifier: Optional[str] = None,
+) -> dict:
+    """
+    Builds a structured report entry.
+    """
+    return {
+        "severity": severity,
+        "code": code,
+        "file": os.path.basename(file_path),
+        "scene": scene_label,
+        "identifier": identifier,
+        "message": message,
+    }
+
+
+# ============================== CHECKS ====================================
+
+
+def validate_item(
+    item: dict, identifier: str, scene_label: str, file_path: str
+) -> list[dict]:
+    """
+    Checks a single string against what the importer reads and the exporter writes back.
+    """
+    issues = []
+
+    def add(severity: str, code: str, message: str) -> None:
+        issues.append(
+            issue(severity, code, message, file_path, scene_label, identifier)
+        )
+
+    if not isinstance(item, dict):
+        add(ERROR, "invalid-item", "string data must be an object")
+        return issues
+
+    # importer: `text: item.text`
+    if not isinstance(item.get("text"), str):
+        add(ERROR, "missing-text", "'text' must be a string")
+    elif not item["text"]:
+        add(WARNING, "empty-text", "'text' is empty")
+
+    # exporter: `stringObj.labels.find(...)` and `labels.length === 0`
+    labels = item.get("labels")
+    if labels is None:
+        add(
+            ERROR,
+            "missing-labels",
+            "'labels' is missing, the exporter can't find the scene",
+        )
+    elif not isinstance(labels, list) or not all(isinstance(l, str) for l in labels):
+        add(ERROR, "invalid-labels", "'labels' must be a list of strings")
+    elif not labels:
+        add(ERROR, "empty-labels", "'labels' is empty")
+    else:
+        scene_labels = [
+            l.split(":", 1)[1] for l in labels if l.startswith("scene-label:")
+        ]
+        if not scene_labels:
+            add(ERROR, "missing-scene-label", "no 'scene-label:' label")
+        elif scene_labels[0] != scene_label:
+            add(
+                ERROR,
+                "wrong-scene-label",
+                f"'scene-label:{scene_labels[0]}' doesn't match its scene '{scene_label}'",
+            )
+
+    if "isHidden" in item and not isinstance(item["isHidden"], bool):
+        add(ERROR, "invalid-is-hidden", "'isHidden' must be a boolean")
+
+    if "context" in item and not isinstance(item["context"], str):
+        add(ERROR, "invalid-context", "'context' must be a string")
+
+    # importer: "Max 4k of custom data"
+    custom_data = item.get("customData")
+    if custom_data is not None:
+        if not isinstance(custom_data, str):
+            add(ERROR, "invalid-custom-data", "'customData' must be a string")
+        elif len(custom_data) > CUSTOM_DATA_MAX_LENGTH:
+            add(
+                ERROR,
+                "custom-data-too-long",
+                f"'customData' has {len(custom_data)} characters (max {CUSTOM_DATA_MAX_LENGTH})",
+            )
+
+    # importer: `Object.keys(item.translations)`, which fails when missing
+    translations = item.get("translations")
+    if not isinstance(translations, dict):
+        add(ERROR, "missing-translations", "'translations' must be an object")
+        return issues
+
+    languages = [lang for lang in TARGET_LANGUAGES if lang in translations]
+    if not languages:
+        add(ERROR, "empty-languages", "no translation for any of the target languages")
+
+    for lang in languages:
+        translation = translations[lang]
+        if not isinstance(translation, dict):
+            add(ERROR, "invalid-translation", f"'{lang}' translation must be an object")
+            continue
+        if not isinstance(translation.get("text"), str):
+            add(
+                ERROR,
+                "invalid-translation-text",
+                f"'{lang}' translation text must be a string",
+            )
+        status = translation.get("status", "untranslated")
+        if status not in TRANSLATION_STATUSES:
+            add(ERROR, "invalid-status", f"'{lang}' has unknown status '{status}'")
+
+    for lang in translations:
+        if lang not in TARGET_LANGUAGES:
+            add(
+                WARNING,
+                "unknown-language",
+                f"'{lang}' is not a target language, it will be ignored",
+            )
+
+    return issues
+
+
+def validate_file(file_path: str) -> list[dict]:
+    """
+    Validates a whole Crowdin file. Runs in a worker process.
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+    except (OSError, ValueError) as e:
+        return [issue(ERROR, "invalid-json", str(e), file_path)]
+
+    scenes = content.get("texts") if isinstance(content, dict) else None
+    if not isinstance(scenes, dict):
+        return [
+            issue(
+                ERROR, "missing-texts", "'texts' must be an object of scenes", file_path
+            )
+        ]
+
+    issues = []
+    seen_identifiers = {}
+    for scene_label, texts in scenes.items():
+        if not isinstance(texts, dict):
+            issues.append(
+                issue(
+                    ERROR,
+                    "invalid-scene",
+                    "scene must be an object of strings",
+                    file_path,
+                    scene_label,
+                )
+            )
+            continue
+
+        for identifier, item in texts.items():
+            # Crowdin identifiers are unique per file
+            if identifier in seen_identifiers:
+                issues.append(
+                    issue(
+                        ERROR,
+                        "duplicated-identifier",
+                        f"also defined in scene '{seen_identifiers[identifier]}'",
+                        file_path,
+                        scene_label,
+                        identifier,
+                    )
+                )
+            seen_identifiers[identifier] = scene_label
+            issues.extend(validate_item(item, identifier, scene_label, file_path))
+
+    return issues
+
+
+def validate_folder(folder: str, jobs: Optional[int] = None) -> list[dict]:
+    """
+    Validates every Crowdin file of the folder in parallel, one file per task.
+    """
+    file_paths = get_crowdin_files(folder)
+    if jobs == 1 or len(file_paths) < 2:
+        results = map(validate_file, file_paths)
+        return [entry for entries in results for entry in entries]
+
+    # Imported here, loading it would slow down `--help` and single-file runs
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(validate_file, file_paths, chunksize=8)
+        return [entry for entries in results for entry in entries]
+
+
+# ================================ MAIN ======================================
+
+
+def main(folder=None, jobs=None, output_json=False, show_warnings=True) -> int:
+    """
+    Validates the folder and prints the report. Returns the process exit code.
+    """
+    issues = validate_folder(folder, jobs)
+    if not show_warnings:
+        issues = [entry for entry in issues if entry["severity"] == ERROR]
+
+    error_count = sum(1 for entry in issues if entry["severity"] == ERROR)
+    warning_count = len(issues) - error_count
+
+    if output_json:
+        report = {"errors": error_count, "warnings": warning_count, "issues": issues}
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for entry in issues:
+            location = ":".join(
+                v for v in (entry["file"], entry["scene"], entry["identifier"]) if v
+            )
+            print(
+                f"{entry['severity'].upper()} [{entry['code']}] {location}: {entry['message']}"
+            )
+        print(f"\n{error_count} errors, {warning_count} warnings.")
+
+    return 1 if error_count else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Validate CROWDIN files against the custom file importer/exporter contract."
+    )
+    parser.add_argument(
+        "folder",
+        type=str,
+        help="Path to the folder containing .txt_crowdin.json files.",
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="Number of worker processes (default: CPU count)."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument(
+        "--errors-only", action="store_true", help="Don't report warnings."
+    )
+    args = parser.parse_args()
+
+    exit(main(args.folder, args.jobs, args.json, not args.errors_only))
@@ -0,0 +1,343 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Single-file archive of the CROWDIN files exported by json-exporter.py, to move the whole
+# merged corpus between machines and CI steps at once. Every file is compressed on its own
+# and the archive ends with an index of offsets, so any script can be read without the others.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import json, os, argparse, hashlib, struct, zlib
+from typing import Iterator, NamedTuple, Optional
+
+ARCHIVE_EXTENSION = ".pmarchive"
+
+# File layout (little endian):
+#
+#   header      MAGIC, VERSION, reserved, index offset, entry count
+#   data        the zlib-compressed files, one after the other
+#   index       one INDEX_ENTRY per file, each followed by its UTF-8 name
+#
+# The header is written last, once the index offset is known.
+MAGIC = b"PMAR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQI")
+# data offset, compressed length, original length, SHA-1 of the original, name length
+INDEX_ENTRY = struct.Struct("<QII20sH")
+
+COMPRESSION_LEVEL = 6
+
+
+class ExportArchiveError(Exception):
+    """Exception raised for unreadable or incompatible archive files."""
+
+    pass
+
+
+class ArchiveEntry(NamedTuple):
+    name: str
+    offset: int
+    compressed_size: int
+    size: int
+    sha1: bytes
+
+
+# ============================== WRITER ====================================
+
+
+def serialize(merged_translations: dict) -> bytes:
+    """
+    Same bytes as `save_extracted_translations`, so extracted files match the folder output.
+    """
+    return json.dumps(merged_translations, ensure_ascii=False, indent=2).encode("utf8")
+
+
+class ArchiveWriter:
+    """
+    Writes files to an archive as they come, so the whole corpus is never kept in memory.
+    The archive is replaced atomically when closed.
+    """
+
+    def __init__(self, archive_path: str) -> None:
+        self.archive_path = archive_path
+        self.temporary_path = archive_path + ".tmp"
+        self.fp = open(self.temporary_path, "wb")
+        self.fp.write(b"\0" * HEADER.size)
+        self.entries = {}
+
+    def __enter__(self) -> ArchiveWriter:
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.fp.close()
+            os.remove(self.temporary_path)
+
+    def add(self, name: str, data: bytes) -> None:
+        if name in self.entries:
+            raise ExportArchiveError(f"Duplicated file in archive: {name}")
+        compressed = zlib.compress(data, COMPRESSION_LEVEL)
+        self.entries[name] = ArchiveEntry(
+            name,
+            self.fp.tell(),
+            len(compressed),
+            len(data),
+            hashlib.sha1(data).digest(),
+        )
+        self.fp.write(compressed)
+
+    def close(self) -> None:
+        index_offset = self.fp.tell()
+        # Index sorted by name, like a listing of the output folder
+        for name in sorted(self.entries):
+            entry = self.entries[name]
+            encoded_name = name.encode("utf8")
+            self.fp.write(
+                INDEX_ENTRY.pack(
+                    entry.offset,
+                    entry.compressed_size,
+                    entry.size,
+                    entry.sha1,
+                    len(encoded_name),
+                )
+            )
+            self.fp.write(encoded_name)
+
+        self.fp.seek(0)
+        self.fp.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, len(self.entries)))
+        self.fp.close()
+        os.replace(self.temporary_path, self.archive_path)
+
+
+def write_archive(merged_translations_by_file: dict, archive_path: str) -> None:
+    """
+    Writes the merged translations of every script (output file name -> merged translations).
+    """
+    with ArchiveWriter(archive_path) as writer:
+        for output_file_name in sorted(merged_translations_by_file):
+            writer.add(
+                output_file_name,
+                serialize(merged_translations_by_file[output_file_name]),
+            )
+
+
+# ============================== READER ====================================
+
+
+class ArchiveReader:
+    """
+    Random access reader. Only the header and the index are read when opening the archive.
+    """
+
+    def __init__(self, archive_path: str) -> None:
+        self.fp = open(archive_path, "rb")
+        header = self.fp.read(HEADER.size)
+        if len(header) < HEADER.size:
+            self.fp.close()
+            raise ExportArchiveError(f"Archive is truncated: {archive_path}")
+        magic, version, _, index_offset, entry_count = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            self.fp.close()
+            raise ExportArchiveError(f"Unsupported archive format: {archive_path}")
+
+        self.fp.seek(index_offset)
+        index = self.fp.read()
+        self.entries = {}
+        position = 0
+        try:
+            for _ in range(entry_count):
+                offset, compressed_size, size, sha1, name_length = (
+                    INDEX_ENTRY.unpack_from(index, position)
+                )
+                position += INDEX_ENTRY.size
+                if position + name_length > len(index):
+                    raise struct.error("name out of bounds")
+                name = str(index[position : position + name_length], "utf8")
+                position += name_length
+                self.entries[name] = ArchiveEntry(
+                    name, offset, compressed_size, size, sha1
+                )
+        except (struct.error, UnicodeDecodeError) as e:
+            self.fp.close()
+            raise ExportArchiveError(
+                f"Archive index is truncated: {archive_path}"
+            ) from e
+
+    def __enter__(self) -> ArchiveReader:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.fp.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __iter__(self) -> Iterator[ArchiveEntry]:
+        return iter(self.entries.values())
+
+    def names(self) -> list[str]:
+        return list(self.entries)
+
+    def read(self, name: str) -> bytes:
+        """
+        Returns the original bytes of a file, decompressing only that file.
+        """
+        entry = self.entries.get(name)
+        if entry is None:
+            raise ExportArchiveError(f"{name} is not in the archive.")
+        self.fp.seek(entry.offset)
+        data = zlib.decompress(self.fp.read(entry.compressed_size))
+        if hashlib.sha1(data).digest() != entry.sha1:
+            raise ExportArchiveError(f"{name} is corrupted in the archive.")
+        return data
+
+    def load(self, name: str) -> dict:
+        return json.loads(self.read(name))
+
+
+# ============================== TOOLS ====================================
+
+
+def extract_archive(
+    archive_path: str, output_folder_path: str, names: Optional[list] = None
+) -> list[str]:
+    """
+    Writes the archived files (or only `names`) to the output folder. Returns the written names.
+    """
+    with ArchiveReader(archive_path) as archive:
+        names = names or archive.names()
+        for name in names:
+            data = archive.read(name)
+            with open(
+                os.path.join(output_folder_path, os.path.basename(name)), "wb"
+            ) as fp:
+                fp.write(data)
+    return names
+
+
+def changed_lines(old: dict, new: dict) -> dict:
+    """
+    Identifiers added, removed or changed (texts or statuses) between two versions of a file.
+    """
+    old_items = {
+        identifier: item
+        for texts in old.get("texts", {}).values()
+        for identifier, item in texts.items()
+    }
+    new_items = {
+        identifier: item
+        for texts in new.get("texts", {}).values()
+        for identifier, item in texts.items()
+    }
+    return {
+        "added": sorted(new_items.keys() - old_items.keys()),
+        "removed": sorted(old_items.keys() - new_items.keys()),
+        "changed": sorted(
+            identifier
+            for identifier in old_items.keys() & new_items.keys()
+            if old_items[identifier] != new_items[identifier]
+        ),
+    }
+
+
+def diff_archives(old_archive_path: str, new_archive_path: str) -> dict:
+    """
+    Compares two archives. Unchanged files are told apart by their hash in the index,
+    so only the changed files are decompressed.
+    """
+    with ArchiveReader(old_archive_path) as old, ArchiveReader(new_archive_path) as new:
+        old_names, new_names = set(old.names()), set(new.names())
+        changed = {}
+        for name in sorted(old_names & new_names):
+            if old.entries[name].sha1 != new.entries[name].sha1:
+                lines = changed_lines(old.load(name), new.load(name))
+                # Files that only differ in key order have no changed lines
+                if any(lines.values()):
+                    changed[name] = lines
+        return {
+            "added": sorted(new_names - old_names),
+            "removed": sorted(old_names - new_names),
+            "changed": changed,
+        }
+
+
+# ================================ MAIN ======================================
+
+
+def main(args: argparse.Namespace) -> int:
+    try:
+        if args.command == "list":
+            with ArchiveReader(args.archive) as archive:
+                for entry in archive:
+                    print(f"{entry.name}\t{entry.size}\t{entry.compressed_size}")
+
+        elif args.command == "extract":
+            written_files = extract_archive(
+                args.archive, args.output_folder, args.files
+            )
+            print(f"{len(written_files)} files extracted.")
+
+        elif args.command == "diff":
+            diff = diff_archives(args.old_archive, args.new_archive)
+            if args.json:
+                print(json.dumps(diff, ensure_ascii=False, indent=2))
+            else:
+                for name in diff["added"]:
+                    print(f"+ {name}")
+                for name in diff["removed"]:
+                    print(f"- {name}")
+                for name, lines in diff["changed"].items():
+                    print(
+                        f"~ {name}: {len(lines['added'])} added, {len(lines['removed'])} removed,"
+                        f" {len(lines['changed'])} changed lines"
+                    )
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="List, extract and diff archives written by json-exporter.py --archive."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List the archived files.")
+    list_parser.add_argument("archive", type=str, help="Path to the archive.")
+
+    extract_parser = subparsers.add_parser(
+        "extract", help="Extract the archived files to a folder."
+    )
+    extract_parser.add_argument("archive", type=str, help="Path to the archive.")
+    extract_parser.add_argument(
+        "--output-folder",
+        type=str,
+        required=True,
+        help="Path to the folder where the files will be saved.",
+    )
+    extract_parser.add_argument(
+        "files",
+        type=str,
+        nargs="*",
+        help="Files to extract (default: all).",
+    )
+
+    diff_parser = subparsers.add_parser(
+        "diff", help="Show the files and lines that differ between two archives."
+    )
+    diff_parser.add_argument("old_archive", type=str, help="Path to the old archive.")
+    diff_parser.add_argument("new_archive", type=str, help="Path to the new archive.")
+    diff_parser.add_argument(
+        "--json", action="store_true", help="Print the differences as JSON."
+    )
+
+    exit(main(parser.parse_args()))
@@ -0,0 +1,341 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# This script checks that `es-ES` translations use the glossary renderings of character names
+# (including their names before being revealed), places and recurring terms.
+# Every glossary term is matched in a single pass per text with an Aho-Corasick automaton.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import json, os, argparse, hashlib
+from collections import defaultdict, deque
+from typing import Iterator
+
+from plamemo import ENGLISH_TAG, JAPANESE_TAG, SPANISH_TAG, get_crowdin_files
+
+
+CACHE_FILENAME = ".glossary-check-cache.json"
+# Bump when the matching changes, so cached results are checked again
+CHECK_VERSION = 2
+
+
+# ============================== AHO-CORASICK ====================================
+
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over a set of terms. Finds every term occurrence in one pass.
+
+    Matching is case-insensitive (terms and texts are casefolded the same way), and terms starting or ending with a letter or digit only
+    match whole words (so "Eru" doesn't match in "Eruption"). Japanese text has no word
+    boundaries, so CJK terms match anywhere.
+    """
+
+    def __init__(self, terms: dict) -> None:
+        """
+        `terms` maps each term to the value returned when it's found (e.g. its glossary entry indices).
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        # node -> list of (casefolded term length, value)
+        self.output = [[]]
+
+        for term, value in terms.items():
+            folded_term = term.casefold()
+            node = 0
+            for char in folded_term:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.output[node].append((len(folded_term), value))
+
+        # Breadth-first construction of the failure links
+        pending = deque(self.goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self.goto[node].items():
+                pending.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text: str) -> Iterator[tuple]:
+        """
+        Yields `(start, end, value)` for every whole-word term occurrence in the text.
+        Positions are those of the original text, even when casefolding changes its length.
+        """
+        folded, origins = casefold_with_origins(text)
+
+        node = 0
+        for position, char in enumerate(folded):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, value in self.output[node]:
+                folded_start = position - length + 1
+                # Matches must start and end on whole characters of the original text
+                # (e.g. "s" doesn't match half of the "ss" folded from "ß")
+                if (
+                    folded_start > 0
+                    and origins[folded_start - 1] == origins[folded_start]
+                ):
+                    continue
+                if (
+                    position + 1 < len(folded)
+                    and origins[position + 1] == origins[position]
+                ):
+                    continue
+                start, end = origins[folded_start], origins[position] + 1
+                if is_word_boundary(text, start, end):
+                    yield start, end, value
+
+
+def casefold_with_origins(text: str) -> tuple:
+    """
+    Returns the casefolded text, and the position in `text` of each casefolded character.
+    """
+    folded = []
+    origins = []
+    for position, char in enumerate(text):
+        folded_char = char.casefold()
+        folded.append(folded_char)
+        origins.extend([position] * len(folded_char))
+    return "".join(folded), origins
+
+
+def is_word_char(char: str) -> bool:
+    # CJK scripts don't separate words, so only alphanumeric ASCII/Latin characters count
+    return char.isalnum() and ord(char) < 0x3000
+
+
+def is_word_boundary(text: str, start: int, end: int) -> bool:
+    if is_word_char(text[start]) and start > 0 and is_word_char(text[start - 1]):
+        return False
+    if is_word_char(text[end - 1]) and end < len(text) and is_word_char(text[end]):
+        return False
+    return True
+
+
+# ============================== GLOSSARY ====================================
+
+
+def load_glossary(glossary_file_path: str) -> list[dict]:
+    """
+    Loads the glossary, a JSON list of entries like:
+
+    ```
+    {
+      "en": ["Isla"],              # source terms, any of them
+      "ja": ["アイラ"],
+      "es-ES": ["Isla"],           # accepted renderings, one of them is required
+      "forbidden": ["Aila"]        # optional, renderings that must not be used
+    }
+    ```
+
+    Character names before being revealed (the `before-revealing-name` labels) are
+    regular entries, e.g. `{"en": ["Girl"], "ja": ["少女"], "es-ES": ["Chica"]}`.
+    """
+    with open(glossary_file_path, "r", encoding="utf-8") as f:
+        glossary = json.load(f)
+
+    entries = []
+    for entry in glossary:
+        entries.append(
+            {
+                key: (
+                    [entry[key]]
+                    if isinstance(entry.get(key), str)
+                    else entry.get(key, [])
+                )
+                for key in (ENGLISH_TAG, JAPANESE_TAG, SPANISH_TAG, "forbidden")
+            }
+        )
+    return entries
+
+
+class GlossaryChecker:
+    """
+    Checks texts against a glossary with one automaton for the source terms and another one
+    for the Spanish renderings (both accepted and forbidden).
+    A term can be in several entries (e.g. a name shared by two characters), so each term
+    maps to the list of its entries.
+    """
+
+    def __init__(self, glossary: list[dict]) -> None:
+        self.glossary = glossary
+
+        source_terms = defaultdict(list)
+        rendering_terms = defaultdict(list)
+        for index, entry in enumerate(glossary):
+            for lang in (ENGLISH_TAG, JAPANESE_TAG):
+                for term in entry[lang]:
+                    source_terms[term].append(index)
+            for term in entry["forbidden"]:
+                rendering_terms[term].append(("forbidden", index))
+            for term in entry[SPANISH_TAG]:
+                rendering_terms[term].append(("accepted", index))
+
+        self.source_matcher = TermMatcher(source_terms)
+        self.rendering_matcher = TermMatcher(rendering_terms)
+        self.fingerprint = hashlib.sha1(
+            json.dumps([CHECK_VERSION, glossary], sort_keys=True).encode("utf8")
+        ).hexdigest()
+
+    def check(self, text_en: str, text_ja: str, text_es: str) -> list[dict]:
+        """
+        Returns the glossary issues of a translated line.
+        """
+        required = set()
+        for text in (text_en, text_ja):
+            for _, _, indices in self.source_matcher.find(text):
+                required.update(indices)
+
+        found = set()
+        issues = []
+        for start, end, renderings in self.rendering_matcher.find(text_es):
+            for kind, index in renderings:
+                if kind == "accepted":
+                    found.add(index)
+                else:
+                    issues.append(
+                        {
+                            "kind": "misused",
+                            "term": self.glossary[index][SPANISH_TAG],
+                            "found": text_es[start:end],
+                        }
+                    )
+
+        for index in sorted(required - found):
+            entry = self.glossary[index]
+            issues.append(
+                {
+                    "kind": "missing",
+                    "term": entry[SPANISH_TAG],
+                    "source": entry[ENGLISH_TAG] + entry[JAPANESE_TAG],
+                }
+            )
+        return issues
+
+
+# ============================== CHECKS ====================================
+
+
+def check_file(file_content: bytes, checker: GlossaryChecker) -> list[dict]:
+    """
+    Checks every translated line of a Crowdin file.
+    """
+    content = json.loads(file_content)
+
+    issues = []
+    for texts in content.get("texts", {}).values():
+        for identifier, item in texts.items():
+            translations = item.get("translations", {})
+            text_es = translations.get(SPANISH_TAG, {}).get("text") or ""
+            if not text_es:
+                continue
+
+            text_en = (
+                translations.get(ENGLISH_TAG, {}).get("text") or item.get("text") or ""
+            )
+            text_ja = translations.get(JAPANESE_TAG, {}).get("text") or ""
+            for line_issue in checker.check(text_en, text_ja, text_es):
+                issues.append({"identifier": identifier, "text": text_es, **line_issue})
+
+    return issues
+
+
+def check_folder(folder: str, checker: GlossaryChecker, cache_file_path: str) -> dict:
+    """
+    Checks every Crowdin file of the folder. Results are cached per file hash and glossary,
+    so unchanged files aren't checked again.
+    """
+    try:
+        with open(cache_file_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    results = {}
+    new_cache = {}
+    for file_path in get_crowdin_files(folder):
+        file_name = os.path.basename(file_path)
+        with open(file_path, "rb") as f:
+            file_content = f.read()
+
+        file_hash = hashlib.sha1(file_content).hexdigest() + checker.fingerprint
+        cached = cache.get(file_name)
+        if cached is not None and cached["hash"] == file_hash:
+            issues = cached["issues"]
+        else:
+            issues = check_file(file_content, checker)
+
+        new_cache[file_name] = {"hash": file_hash, "issues": issues}
+        results[file_name] = issues
+
+    with open(cache_file_path, "wb") as fp:
+        fp.write(json.dumps(new_cache, ensure_ascii=False).encode("utf8"))
+
+    return results
+
+
+# ================================ MAIN ======================================
+
+
+def main(
+    folder=None, glossary_file_path=None, cache_file_path=None, output_json=False
+) -> int:
+    """
+    Checks the folder and prints the glossary issues. Returns the process exit code.
+    """
+    checker = GlossaryChecker(load_glossary(glossary_file_path))
+    results = check_folder(
+        folder, checker, cache_file_path or os.path.join(folder, CACHE_FILENAME)
+    )
+    issue_count = sum(len(issues) for issues in results.values())
+
+    if output_json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for file_name, issues in results.items():
+            for entry in issues:
+                if entry["kind"] == "missing":
+                    detail = f"{' / '.join(entry['source'])} should be {' / '.join(entry['term'])}"
+                else:
+                    detail = f"'{entry['found']}' should be {' / '.join(entry['term'])}"
+                print(f"{file_name}:{entry['identifier']} [{entry['kind']}] {detail}")
+                print(f"    {entry['text']}")
+        print(f"\n{issue_count} glossary issues.")
+
+    return 1 if issue_count else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that translations follow the glossary renderings."
+    )
+    parser.add_argument(
+        "folder",
+        type=str,
+        help="Path to the folder containing .txt_crowdin.json files.",
+    )
+    parser.add_argument(
+        "--glossary", type=str, required=True, help="Path to the glossary JSON file."
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        help=f"Path of the results cache (default: <folder>/{CACHE_FILENAME}).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    exit(main(args.folder, args.glossary, args.cache_file, args.json))
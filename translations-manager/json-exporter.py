@@ -12,333 +12,66 @@
 # TODO: remove after Python < 3.9 is no longer used/supported
 from __future__ import annotations
 
-import re, json, os, argparse
+import os, argparse, contextlib
 from typing import Optional
 
-ENGLISH_TAG = "en"
-JAPANESE_TAG = "ja"
-SPANISH_TAG = "es-ES"
-
-
-class SceneMismatchError(Exception):
-    """Exception raised for mismatched scenes in input files."""
-    pass
-
-
-
-# ============================== UTIL ====================================
-
-def get_file_pairs(folder_en: str, folder_ja: str) -> list[dict]:
-    """
-    Matches files with the same name in the English and Japanese folders.
-    Returns a list of dictionaries with matched file paths.
-    Files without a match will still be included with a None value for the missing counterpart.
-    """
-    files_en = {f for f in os.listdir(folder_en) if f.endswith(".json")}
-    files_ja = {f for f in os.listdir(folder_ja) if f.endswith(".json")}
-
-    all_files = files_en | files_ja  # Union of all filenames
-    file_pairs = []
-
-    for file_name in all_files:
-        file_pairs.append(
-            {
-                ENGLISH_TAG: (
-                    os.path.join(folder_en, file_name)
-                    if file_name in files_en
-                    else None
-                ),
-                JAPANESE_TAG: (
-                    os.path.join(folder_ja, file_name)
-                    if file_name in files_ja
-                    else None
-                ),
-            }
-        )
-
-    return file_pairs
-
-
-def load_data(input_file_path: str) -> dict:
-    """
-    Loads the JSON file from the specified path.
-    """
-    with open(input_file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save_extracted_translations(
-    extracted_translations: dict, output_file_path: str
-) -> None:
-    """
-    Saves the extracted translations dictionary to a JSON file.
-    """
-    with open(output_file_path, "wb") as fp:
-        fp.write(
-            json.dumps(extracted_translations, ensure_ascii=False, indent=2).encode(
-                "utf8"
-            )
-        )
-
-
-# ============================== MAIN FUNCTIONS ====================================
-
-
-def getDefaultScenesTexts(
-    scene: dict, file_title: str, global_labels: list, simplified: bool
-) -> dict:
-    """
-    Get texts and details from the Default type scenes
-
-    Note: scene objects has the following format:
-
-    # type 1: default scenes
-    ```
-    scenes: [
-      {
-        label: '',
-        texts: [
-          [
-            'Eru',           # t[0]: character name
-            'Girl',          # t[1]: apparently the temporary name before revealing the character name
-            'Good morning!'  # t[2]: text/dialog
-          ]
-        ]
-      }
-    ]
-    ```
-    """
-    texts = {}
-    scene_label = scene["label"].strip("*")
-    scene_title = scene["title"]
-
-    for i in range(len(scene["texts"])):
-        text_group = scene["texts"][i]
-        # format number with leading zero
-        identifier = f"{file_title}-{scene_label}.{i:02d}"
-
-        # voice-off when no character available
-        character = text_group[0] if text_group[0] is not None else "voice-off"
-
-        # checks if temporary name is present (the name before the)
-        # e.g: Eru is not revealed as 'Eru', but as 'Girl' when Tsukasa meets her
-        before_revealing_name = text_group[1] if text_group[1] is not None else None
-
-        labels = [
-            "character:{}".format(character),
-            "scene-type:default",
-            "scene-label:{}".format(scene_label),
-            "scene-title:{}".format(scene_title),
-        ]
-
-        if before_revealing_name is not None:
-            labels.append("before-revealing-name:{}".format(before_revealing_name))
-
-        texts[identifier] = {
-            "character": character,
-            "text": text_group[2],
-            "translations": {},
-        }
-
-        # Exclude context properties in simplified format
-        if not simplified:
-            context = "japanese context"
-            custom_data = "character:{}".format(character)
-
-            extend = {
-                "isHidden": False,
-                "context": context,
-                "labels": labels + global_labels,
-                "customData": custom_data,
-            }
-            texts[identifier].update(extend)
-
-    return texts
-
-
-def getSelectionScenesTexts(
-    scene: dict, file_title: str, global_labels: list, simplified: bool
-) -> dict:
-    """
-    Get texts and details from the Selection type scenes
-
-    Note: scene objects has the following format:
-
-    ### type 2: selection scenes
-    ```
-    scenes: [
-      {
-        label: '',
-        selects: {
-          0: {
-            target: ''  # target scene label (optional)
-            text: ''
-          },
-          1: {
-            target: ''  # target scene label (optional)
-            text: ''
-          },
-        }
-      }
-    ]
-    ```
-    """
-    texts = {}
-    scene_label = scene["label"].strip("*")
-    scene_title = scene["title"]
-
-    for i in range(len(scene["selects"])):
-        text_group = scene["selects"][i]
-        # format number with leading zero
-        identifier = f"{file_title}-{scene_label}.{i:02d}"
-
-        # scene target
-        scene_target = (
-            text_group["target"].strip("*") if "target" in text_group else "none"
-        )
-
-        labels = [
-            "scene-type:selection",
-            "scene-label:{}".format(scene_label),
-            "scene-title:{}".format(scene_title),
-            "scene-target:{}".format(scene_target),
-        ]
-
-        texts[identifier] = {
-            "text": text_group["text"],
-            "translations": {},
-        }
-
-        # Exclude context properties in simplified format
-        if not simplified:
-            context = "jap context"
-            custom_data = "character:{}".format("pending")
-
-            extend = {
-                "isHidden": False,
-                "context": context,
-                "labels": labels + global_labels,
-                "customData": custom_data,
-            }
-            texts[identifier].update(extend)
-
-    return texts
-
-
-def extract_translations(data: dict, simplified=False) -> dict:
-    """
-    Processes the loaded JSON and extracts translations organized by scenes.
-    """
-    # Common data
-    filename = data["name"]
-    file_title = filename.split(".")[0]
-    global_labels = ["filename:{}".format(filename)]
-
-    texts = {}
-    for scene in data["scenes"]:
-        scene_label = scene["label"].strip("*")
-        # type 1: default scenes
-        if "texts" in scene:
-            texts[scene_label] = getDefaultScenesTexts(
-                scene, file_title, global_labels, simplified
-            )
-        # type 2: selection scenes
-        if "selects" in scene:
-            texts[scene_label] = getSelectionScenesTexts(
-                scene, file_title, global_labels, simplified
-            )
-
-    extracted_translations = {"texts": texts}
-
-    # Exclude context properties in simplified format
-    if not simplified:
-        extend = {
-            "filename": filename,
-            "labels": global_labels,
-        }
-        extracted_translations = {**extend, **extracted_translations}
-
-    return extracted_translations
-
-
-def translations_merger(
-    translations_en: dict | None, translations_ja: dict | None
-) -> dict:
-    """
-    Merges Japanese translations into the English translations.
-    Adds an empty Spanish translation with status 'untranslated'.
-    If Japanese or English translation doesn't exist fully or partially, leaves that space blank.
-    """
-    # Initialize the merged translations with an empty structure
-    merged_translations = {"texts": {}}
-
-    # Get the scenes from both translations, defaulting to empty dicts if missing
-    scenes_en = translations_en.get("texts", {}) if translations_en else {}
-    scenes_ja = translations_ja.get("texts", {}) if translations_ja else {}
-
-    # Combine all scene labels from both translations
-    all_scene_labels = set(scenes_en.keys()) | set(scenes_ja.keys())
-
-    for scene_label in all_scene_labels:
-        # Get texts for the current scene from both translations
-        scene_texts_en = scenes_en.get(scene_label, {})
-        scene_texts_ja = scenes_ja.get(scene_label, {})
-
-        # Initialize the merged scene
-        merged_scene = {}
-
-        # Combine all identifiers (keys) from both translations
-        all_identifiers = set(scene_texts_en.keys()) | set(scene_texts_ja.keys())
-
-        for identifier in all_identifiers:
-            # Get text data for the current identifier from both translations
-            text_data_en = scene_texts_en.get(identifier, {})
-            text_data_ja = scene_texts_ja.get(identifier, {})
-
-            # Extract the English and Japanese texts (default to empty strings if missing)
-            en_text = text_data_en.get("text", "(No English source available)")
-            ja_text = text_data_ja.get("text", "(No Japanese source available)")
-
-            # Merge the translations
-            merged_scene[identifier] = {
-                "text": en_text,  # Use English text as the base
-                "translations": {
-                    JAPANESE_TAG: {
-                        "text": ja_text,
-                        "status": "approved" if ja_text else "untranslated",
-                    },
-                    ENGLISH_TAG: {
-                        "text": en_text,
-                        "status": "approved" if en_text else "untranslated",
-                    },
-                    SPANISH_TAG: {
-                        "text": "",
-                        "status": "untranslated",
-                    },
-                },
-                # Add context if Japanese text exists, otherwise provide a default message
-                "context": (
-                    f"Original Text: {ja_text}"
-                    if ja_text
-                    else "No Japanese source available, probably it's original content."
-                ),
-            }
-
-        # Add the merged scene to the merged translations
-        merged_translations["texts"][scene_label] = merged_scene
-
-    return merged_translations
-
+import corpus_cache
+import export_archive
+import output_formats
+import output_planner
+import pretranslator
+
+# Extraction and merge functions live in the importable `plamemo` package,
+# they're re-exported here for the tools that still use this script's namespace
+from plamemo import (
+    DEFAULT_CONTEXT_LINES,
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    SPANISH_TAG,
+    SceneMismatchError,
+    extract_translations,
+    getDefaultScenesTexts,
+    getSelectionScenesTexts,
+    get_file_pairs,
+    iter_file_records,
+    iter_processed_files,
+    load_data,
+    save_extracted_translations,
+    translations_merger,
+)
 
 
 # ================================ MAIN ======================================
 
 
 def main(
-    input_folder_path_en=None, input_folder_path_ja=None, output_folder_path=None
+    input_folder_path_en=None,
+    input_folder_path_ja=None,
+    output_folder_path=None,
+    corpus_cache_path=None,
+    write_corpus_cache=True,
+    context_lines=DEFAULT_CONTEXT_LINES,
+    bundle=False,
+    bundle_max_lines=output_planner.DEFAULT_BUNDLE_MAX_LINES,
+    bundle_max_bytes=output_planner.DEFAULT_BUNDLE_MAX_BYTES,
+    pretranslate_backend=None,
+    pretranslate_cache_path=None,
+    archive_path=None,
+    formats=(output_formats.CROWDIN_FORMAT,),
 ) -> Optional[dict]:
     """
     Main function that executes the loading, extraction, and saving of translations.
+    As a side effect, writes the corpus cache (see `corpus_cache.py`) to `corpus_cache_path`,
+    or to the output folder if no path is given.
+    `context_lines` is the number of previous and next dialogue lines added to each line context.
+    If `bundle` is set, scenes are packed into bundle files (see `output_planner.py`)
+    instead of writing one file per script.
+    If `pretranslate_backend` is set, untranslated Spanish lines are pre-filled with machine
+    translations (see `pretranslator.py`) before saving.
+    If `archive_path` is set, every file is written to a single archive (see `export_archive.py`)
+    instead of the output folder, which is then optional.
+    `formats` are the output formats to write (see `output_formats.py`). Bundles, archives
+    and pre-translations apply to the CROWDIN files, the other formats go to the output folder.
     """
     try:
         # Verify all required folder are provided
@@ -348,52 +81,156 @@ def main(
         if not input_folder_path_ja:
             raise Exception("Japanese files folder missing. Please provide a folder.")
 
-        if not output_folder_path:
+        if not output_folder_path and not archive_path:
             raise Exception("Output files folder missing. Please provide a folder.")
 
+        if archive_path and bundle:
+            raise Exception("Bundles can't be written to an archive.")
+
+        write_crowdin = output_formats.CROWDIN_FORMAT in formats
+        if (archive_path or bundle) and not write_crowdin:
+            raise Exception(
+                "Bundles and archives are only written in the crowdin format."
+            )
+
+        # Streaming writers of the other formats, fed with the line records
+        emitters = [
+            output_formats.get_emitter_class(format_spec)(output_folder_path)
+            for format_spec in formats
+            if format_spec != output_formats.CROWDIN_FORMAT
+        ]
+        if emitters and not output_folder_path:
+            raise Exception(
+                "Output files folder missing. Please provide a folder for the other formats."
+            )
+
+        # Caches go next to the archive when there's no output folder
+        cache_folder_path = output_folder_path or os.path.dirname(
+            os.path.abspath(archive_path)
+        )
+
         # Get file pairs
-        file_pairs = get_file_pairs(input_folder_path_en, input_folder_path_ja)
-        if not file_pairs:
+        if not get_file_pairs(input_folder_path_en, input_folder_path_ja):
             raise SceneMismatchError("No matching files found in the selected folders.")
 
-        # Process each file pair
-        for file_pair in file_pairs:
-            input_file_path_en = file_pair.get(ENGLISH_TAG)
-            input_file_path_ja = file_pair.get(JAPANESE_TAG)
-
-            # Generate output file name
-            output_file_name = os.path.basename(
-                input_file_path_en or input_file_path_ja
-            ).replace(".txt.scn.m.json", ".txt_crowdin.json")
-            output_file_path_full = os.path.join(output_folder_path, output_file_name)
-
-            simplified = False
-
-            # Load and process data depending on the existing files and data
-            if input_file_path_en and input_file_path_ja:
-                data_en = load_data(input_file_path_en) if input_file_path_en else {}
-                data_ja = load_data(input_file_path_ja) if input_file_path_ja else {}
-                extracted_translations_en = extract_translations(data_en, simplified)
-                extracted_translations_ja = extract_translations(data_ja, simplified)
-                extracted_translations_merged = translations_merger(
-                    extracted_translations_en, extracted_translations_ja
-                )
-            elif not input_file_path_en:  # EN file doesn't exist
-                data_ja = load_data(input_file_path_ja) if input_file_path_ja else {}
-                extracted_translations_ja = extract_translations(data_ja, simplified)
-                extracted_translations_merged = translations_merger(
-                    None, extracted_translations_ja
+        corpus_cache_writer = (
+            corpus_cache.CorpusCacheWriter() if write_corpus_cache else None
+        )
+        # Output file name -> merged translations, when bundling or pre-translating
+        merged_translations_by_file = {}
+        save_at_the_end = bundle or bool(pretranslate_backend)
+        # Processed files whose records are emitted once pre-translated
+        processed_files_to_emit = []
+        # The temporary archive file is removed if the export fails
+        with (
+            export_archive.ArchiveWriter(archive_path)
+            if archive_path
+            else contextlib.nullcontext()
+        ) as archive_writer:
+            # Process each file pair
+            for processed_file in iter_processed_files(
+                input_folder_path_en, input_folder_path_ja, context_lines=context_lines
+            ):
+                input_file_path_en = processed_file.file_pair.get(ENGLISH_TAG)
+                input_file_path_ja = processed_file.file_pair.get(JAPANESE_TAG)
+                output_file_name = processed_file.output_file_name
+
+                # Save merged translations, or keep them until every file has been processed
+                if save_at_the_end:
+                    merged_translations_by_file[output_file_name] = (
+                        processed_file.translations_merged
+                    )
+                elif not write_crowdin:
+                    pass
+                elif archive_writer is not None:
+                    archive_writer.add(
+                        output_file_name,
+                        export_archive.serialize(processed_file.translations_merged),
+                    )
+                else:
+                    save_extracted_translations(
+                        processed_file.translations_merged,
+                        os.path.join(output_folder_path, output_file_name),
+                    )
+
+                # Emit the other formats, after the pre-translation if there's one
+                if emitters and pretranslate_backend:
+                    processed_files_to_emit.append(processed_file)
+                elif emitters:
+                    for record in iter_file_records(processed_file):
+                        for emitter in emitters:
+                            emitter.emit(record)
+
+                # Add the file section to the corpus cache
+                if corpus_cache_writer is not None:
+                    corpus_cache_writer.add_file(
+                        os.path.basename(input_file_path_en or input_file_path_ja),
+                        corpus_cache.source_hash(
+                            input_file_path_en, input_file_path_ja
+                        ),
+                        corpus_cache.records_from_extracted(
+                            processed_file.translations_en,
+                            processed_file.translations_ja,
+                        ),
+                    )
+
+            if pretranslate_backend:
+                stats = pretranslator.pretranslate(
+                    list(merged_translations_by_file.values()),
+                    pretranslator.load_backend(pretranslate_backend),
+                    pretranslator.TranslationCache(
+                        pretranslate_cache_path
+                        or os.path.join(cache_folder_path, pretranslator.CACHE_FILENAME)
+                    ),
                 )
-            elif not input_file_path_ja:  # ja file doesn't exist
-                data_en = load_data(input_file_path_en) if input_file_path_en else {}
-                extracted_translations_en = extract_translations(data_en, simplified)
-                extracted_translations_merged = translations_merger(
-                    extracted_translations_en, None
+                print(
+                    f"{stats['lines']} lines pre-translated"
+                    f" ({stats['translated_texts']} new texts, {stats['cached_texts']} cached)."
                 )
 
-            # Save merged translations
-            save_extracted_translations(
-                extracted_translations_merged, output_file_path_full
+            # Records share the merged translations, so they include the pre-translations
+            for processed_file in processed_files_to_emit:
+                for record in iter_file_records(processed_file):
+                    for emitter in emitters:
+                        emitter.emit(record)
+
+            for emitter in emitters:
+                emitter.close()
+                print(f"{len(emitter.written_files)} {emitter.name} files written.")
+
+            if not write_crowdin:
+                pass
+            elif bundle:
+                bundle_files = output_planner.write_bundles(
+                    merged_translations_by_file,
+                    output_folder_path,
+                    bundle_max_lines,
+                    bundle_max_bytes,
+                )
+                print(f"{len(bundle_files)} bundles written.")
+            elif save_at_the_end:
+                for (
+                    output_file_name,
+                    merged_translations,
+                ) in merged_translations_by_file.items():
+                    if archive_writer is not None:
+                        archive_writer.add(
+                            output_file_name,
+                            export_archive.serialize(merged_translations),
+                        )
+                    else:
+                        save_extracted_translations(
+                            merged_translations,
+                            os.path.join(output_folder_path, output_file_name),
+                        )
+
+        if archive_writer is not None:
+            print(f"{len(archive_writer.entries)} files archived in {archive_path}.")
+
+        if corpus_cache_writer is not None:
+            corpus_cache_writer.write(
+                corpus_cache_path
+                or os.path.join(cache_folder_path, corpus_cache.CORPUS_CACHE_FILENAME)
             )
 
         print(f"\nTranslations extracted successfully for all matched files.")
@@ -428,13 +265,78 @@ if __name__ == "__main__":
         type=str,
         help="Path to the folder where output JSON files will be saved.",
     )
+    parser.add_argument(
+        "--archive",
+        type=str,
+        help="Write every output file to this single archive instead of the output folder.",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        action="append",
+        help=(
+            f"Output format: {', '.join(output_formats.EMITTERS)} or `module:ClassName`."
+            " Can be repeated to write several formats at once (default: crowdin)."
+        ),
+    )
+    parser.add_argument(
+        "--context-lines",
+        type=int,
+        default=DEFAULT_CONTEXT_LINES,
+        help=f"Previous and next dialogue lines shown in each line context (default: {DEFAULT_CONTEXT_LINES}).",
+    )
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="Pack scenes into bundle files instead of writing one file per script.",
+    )
+    parser.add_argument(
+        "--bundle-max-lines",
+        type=int,
+        default=output_planner.DEFAULT_BUNDLE_MAX_LINES,
+        help=f"Target lines per bundle (default: {output_planner.DEFAULT_BUNDLE_MAX_LINES}).",
+    )
+    parser.add_argument(
+        "--bundle-max-bytes",
+        type=int,
+        default=output_planner.DEFAULT_BUNDLE_MAX_BYTES,
+        help=f"Target bytes per bundle (default: {output_planner.DEFAULT_BUNDLE_MAX_BYTES}).",
+    )
+    parser.add_argument(
+        "--pretranslate",
+        type=str,
+        metavar="BACKEND",
+        help="Pre-fill untranslated Spanish lines with a machine translation backend (e.g. `fake`).",
+    )
+    parser.add_argument(
+        "--pretranslate-cache",
+        type=str,
+        help=f"Path of the machine translation cache (default: <output-folder>/{pretranslator.CACHE_FILENAME}).",
+    )
+    parser.add_argument(
+        "--corpus-cache",
+        type=str,
+        help="Path of the corpus cache file (default: <output-folder>/corpus.pmcache).",
+    )
+    parser.add_argument(
+        "--no-corpus-cache",
+        action="store_true",
+        help="Don't write the corpus cache.",
+    )
 
     args = parser.parse_args()
 
     # Validate CLI arguments
-    if not args.input_folder_en and not args.input_folder_ja and not args.output_folder:
+    if (
+        not args.input_folder_en
+        and not args.input_folder_ja
+        and not args.output_folder
+        and not args.archive
+    ):
         parser.print_help()
-        print("\nError: No valid arguments provided. Please specify at least one option.")
+        print(
+            "\nError: No valid arguments provided. Please specify at least one option."
+        )
         exit(1)
 
     # Call main with CLI arguments
@@ -442,6 +344,16 @@ if __name__ == "__main__":
         input_folder_path_en=args.input_folder_en,
         input_folder_path_ja=args.input_folder_ja,
         output_folder_path=args.output_folder,
+        corpus_cache_path=args.corpus_cache,
+        write_corpus_cache=not args.no_corpus_cache,
+        context_lines=args.context_lines,
+        bundle=args.bundle,
+        bundle_max_lines=args.bundle_max_lines,
+        bundle_max_bytes=args.bundle_max_bytes,
+        pretranslate_backend=args.pretranslate,
+        pretranslate_cache_path=args.pretranslate_cache,
+        archive_path=args.archive,
+        formats=args.format or (output_formats.CROWDIN_FORMAT,),
     )
 
 #               ?#########G5###5###########J77G#################PB###########~
@@ -0,0 +1,253 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# This script checks that translations keep the engine inline markup of their source text
+# (ruby, line breaks, waits, name substitutions...), which otherwise breaks the game.
+# It works over the `.txt_crowdin.json` files downloaded from CROWDIN, before importing them back.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import re, json, os, argparse, hashlib
+from collections import Counter
+from typing import Optional
+
+from plamemo import ENGLISH_TAG, SPANISH_TAG, get_crowdin_files
+
+
+STATE_FILENAME = ".markup-check-state.json"
+# Bump when the tokenizer or the state format changes, so every line is checked again
+STATE_VERSION = 2
+
+# Inline markup, each pattern yields the tokens to compare between source and translation
+TAG_PATTERNS = (
+    # engine tags, e.g. `[r]`, `[l]`, `[wait time=200]`, `[ruby text="..."]`
+    # only the tag name is compared, attributes like ruby texts are translated
+    ("tag", re.compile(r"\[\s*([A-Za-z_][\w.]*)[^\[\]]*\]")),
+    # escaped line breaks
+    ("newline", re.compile(r"(\\n)")),
+    # name substitutions, e.g. `%name%`, `{player}`
+    ("substitution", re.compile(r"(%[A-Za-z_]\w*%|\{[A-Za-z_]\w*\})")),
+)
+
+
+# ============================== UTIL ====================================
+
+
+def tokenize_markup(text: str) -> Counter:
+    """
+    Returns the multiset of markup tokens of a text, e.g. `{"tag:r": 2, "newline:\\n": 1}`.
+    """
+    tokens = Counter()
+    for kind, pattern in TAG_PATTERNS:
+        for match in pattern.finditer(text):
+            tokens[f"{kind}:{match.group(1)}"] += 1
+    return tokens
+
+
+def line_hash(source_text: str, translation_text: str) -> str:
+    return hashlib.sha1(f"{source_text}\0{translation_text}".encode("utf8")).hexdigest()
+
+
+def file_hash(data: bytes, source_language: str, target_language: str) -> str:
+    """
+    Hash of a whole file and the compared languages, to skip unchanged files without parsing them.
+    """
+    return hashlib.sha1(
+        f"{source_language}\0{target_language}\0".encode("utf8") + data
+    ).hexdigest()
+
+
+def load_state(state_file_path: str) -> dict:
+    """
+    Loads the previous run state:
+    `{file: {"hash": ..., "lines": {identifier: {"hash": ..., "issue": ...}}}}`.
+    """
+    try:
+        with open(state_file_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state.get("files", {}) if state.get("version") == STATE_VERSION else {}
+
+
+def save_state(state_file_path: str, files_state: dict) -> None:
+    with open(state_file_path, "wb") as fp:
+        fp.write(
+            json.dumps(
+                {"version": STATE_VERSION, "files": files_state}, ensure_ascii=False
+            ).encode("utf8")
+        )
+
+
+# ============================== CHECKS ====================================
+
+
+def compare_markup(source_text: str, translation_text: str) -> Optional[dict]:
+    """
+    Compares the markup of both texts. Returns the missing and extra tokens, or None if they match.
+    """
+    source_tokens = tokenize_markup(source_text)
+    translation_tokens = tokenize_markup(translation_text)
+    if source_tokens == translation_tokens:
+        return None
+    return {
+        "missing": sorted((source_tokens - translation_tokens).elements()),
+        "extra": sorted((translation_tokens - source_tokens).elements()),
+    }
+
+
+def check_file(
+    file_path: str,
+    previous_state: dict,
+    source_language: str = ENGLISH_TAG,
+    target_language: str = SPANISH_TAG,
+) -> tuple:
+    """
+    Checks the translated lines of a Crowdin file whose source or translation changed
+    since the previous run. Unchanged files aren't even parsed, and unchanged lines of
+    the changed files keep their previous result.
+    Returns the file state and the number of lines checked.
+    """
+    with open(file_path, "rb") as fp:
+        data = fp.read()
+
+    current_file_hash = file_hash(data, source_language, target_language)
+    if previous_state.get("hash") == current_file_hash:
+        return previous_state, 0
+
+    content = json.loads(data.decode("utf-8"))
+    previous_lines = previous_state.get("lines", {})
+    lines_state = {}
+    checked_count = 0
+    for texts in content.get("texts", {}).values():
+        for identifier, item in texts.items():
+            translations = item.get("translations", {})
+            source_text = (
+                translations.get(source_language, {}).get("text")
+                or item.get("text")
+                or ""
+            )
+            translation_text = translations.get(target_language, {}).get("text") or ""
+            if not translation_text:
+                continue
+
+            current_hash = line_hash(source_text, translation_text)
+            previous = previous_lines.get(identifier)
+            if previous is not None and previous["hash"] == current_hash:
+                lines_state[identifier] = previous
+                continue
+
+            checked_count += 1
+            mismatch = compare_markup(source_text, translation_text)
+            lines_state[identifier] = {
+                "hash": current_hash,
+                "issue": (
+                    {**mismatch, "source": source_text, "translation": translation_text}
+                    if mismatch
+                    else None
+                ),
+            }
+
+    return {"hash": current_file_hash, "lines": lines_state}, checked_count
+
+
+# ================================ MAIN ======================================
+
+
+def main(
+    folder=None,
+    state_file_path=None,
+    source_language=ENGLISH_TAG,
+    target_language=SPANISH_TAG,
+    full=False,
+    output_json=False,
+) -> int:
+    """
+    Checks the folder and prints the lines with broken markup. Returns the process exit code.
+    """
+    state_file_path = state_file_path or os.path.join(folder, STATE_FILENAME)
+    previous_files_state = {} if full else load_state(state_file_path)
+
+    files_state = {}
+    checked_count = 0
+    for file_path in get_crowdin_files(folder):
+        file_name = os.path.basename(file_path)
+        files_state[file_name], file_checked_count = check_file(
+            file_path,
+            previous_files_state.get(file_name, {}),
+            source_language,
+            target_language,
+        )
+        checked_count += file_checked_count
+
+    save_state(state_file_path, files_state)
+
+    issues = [
+        {"file": file_name, "identifier": identifier, **line_state["issue"]}
+        for file_name, file_state in files_state.items()
+        for identifier, line_state in sorted(file_state["lines"].items())
+        if line_state["issue"]
+    ]
+
+    if output_json:
+        print(json.dumps(issues, ensure_ascii=False, indent=2))
+    else:
+        for entry in issues:
+            print(f"{entry['file']}:{entry['identifier']}")
+            if entry["missing"]:
+                print(f"    missing: {', '.join(entry['missing'])}")
+            if entry["extra"]:
+                print(f"    extra:   {', '.join(entry['extra'])}")
+        print(
+            f"\n{len(issues)} lines with broken markup ({checked_count} lines checked)."
+        )
+
+    return 1 if issues else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that translations keep the inline markup of their source texts."
+    )
+    parser.add_argument(
+        "folder",
+        type=str,
+        help="Path to the folder containing .txt_crowdin.json files.",
+    )
+    parser.add_argument(
+        "--state-file",
+        type=str,
+        help=f"Path of the incremental state file (default: <folder>/{STATE_FILENAME}).",
+    )
+    parser.add_argument(
+        "--source-language",
+        type=str,
+        default=ENGLISH_TAG,
+        help="Source language (default: en).",
+    )
+    parser.add_argument(
+        "--target-language",
+        type=str,
+        default=SPANISH_TAG,
+        help="Translation language (default: es-ES).",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Check every line, ignoring the previous state.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    exit(
+        main(
+            args.folder,
+            args.state_file,
+            args.source_language,
+            args.target_language,
+            args.full,
+            args.json,
+        )
+    )
@@ -0,0 +1,572 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Output formats of the exported lines: CROWDIN JSON, XLIFF 1.2, gettext PO and CSV.
+# Emitters are fed with the line records of the merged scripts (see `plamemo.iter_file_records`),
+# so json-exporter.py writes any combination of formats while parsing each script once.
+# Every format keeps the identifiers, texts and statuses, and can be loaded back or converted.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import re, csv, json, os, argparse, importlib
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+from plamemo import (
+    CROWDIN_FILE_SUFFIX,
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    SPANISH_TAG,
+    LineRecord,
+)
+
+CROWDIN_FORMAT = "crowdin"
+
+# Same order as `translations_merger`
+LANGUAGES = (JAPANESE_TAG, ENGLISH_TAG, SPANISH_TAG)
+SOURCE_LANGUAGE = ENGLISH_TAG
+TARGET_LANGUAGE = SPANISH_TAG
+
+# CROWDIN status <-> XLIFF 1.2 `state` of the target
+XLIFF_STATES = {
+    "untranslated": "needs-translation",
+    "translated": "translated",
+    "approved": "final",
+    "pretranslated": "needs-review-translation",
+}
+XLIFF_STATUSES = {state: status for status, state in XLIFF_STATES.items()}
+XLIFF_NAMESPACE = "urn:oasis:names:tc:xliff:document:1.2"
+# Characters XML 1.0 doesn't allow, not even escaped: control characters other than tab,
+# line feed and carriage return, surrogates, U+FFFE and U+FFFF. They're left out of XLIFF files
+XML_INVALID_CHARACTERS = re.compile(
+    "[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]"
+)
+
+CSV_COLUMNS = (
+    ["identifier", "scene"]
+    + [column for language in LANGUAGES for column in (language, f"{language} status")]
+    + ["context", "labels"]
+)
+
+
+# ============================== UTIL ====================================
+
+
+def base_file_name(output_file_name: str) -> str:
+    """
+    `pm01_00.txt_crowdin.json` -> `pm01_00.txt`, the name shared by every format.
+    """
+    return output_file_name[: -len(CROWDIN_FILE_SUFFIX)] + ".txt"
+
+
+def format_statuses(translations: dict) -> str:
+    return " ".join(
+        f"{language}={translations[language]['status']}" for language in LANGUAGES
+    )
+
+
+def parse_statuses(value: str) -> dict:
+    return dict(item.split("=", 1) for item in value.split())
+
+
+def make_item(texts: dict, statuses: dict, context: str, labels: str = "") -> dict:
+    """
+    A line as in the CROWDIN files, built back from the texts and statuses per language.
+    Formats other than CROWDIN keep the labels one per line.
+    """
+    translations = {
+        language: {
+            "text": texts.get(language, ""),
+            "status": statuses.get(language, "untranslated"),
+        }
+        for language in LANGUAGES
+    }
+    item = {
+        "text": translations[ENGLISH_TAG]["text"],
+        "translations": translations,
+        "context": context,
+    }
+    if labels:
+        item["labels"] = labels.split("\n")
+    return item
+
+
+# ============================== EMITTERS ====================================
+
+
+class Emitter(ABC):
+    """
+    Base class of the output formats. Records are emitted in script order, one script
+    after the other; a file is written for each script (`output_file_name` of the records).
+    Subclasses must implement `start_file`, `emit_record` and `finish_file`, and `load_file`
+    to read their files back as CROWDIN structures.
+    """
+
+    name = "base"
+    extension = ""
+
+    def __init__(self, output_folder_path: str) -> None:
+        self.output_folder_path = output_folder_path
+        self.current_file_name = None
+        self.written_files = []
+
+    def file_name(self, output_file_name: str) -> str:
+        return base_file_name(output_file_name) + self.extension
+
+    def emit(self, record: LineRecord) -> None:
+        if record.output_file_name != self.current_file_name:
+            self.close()
+            self.current_file_name = record.output_file_name
+            file_name = self.file_name(record.output_file_name)
+            self.start_file(os.path.join(self.output_folder_path, file_name))
+            self.written_files.append(file_name)
+        self.emit_record(record)
+
+    def close(self) -> None:
+        """
+        Finishes the current file. Call it after the last record.
+        """
+        if self.current_file_name is not None:
+            self.finish_file()
+            self.current_file_name = None
+
+    @abstractmethod
+    def start_file(self, file_path: str) -> None:
+        """
+        Opens a new file. Records of its script follow.
+        """
+
+    @abstractmethod
+    def emit_record(self, record: LineRecord) -> None:
+        """
+        Writes a record to the current file.
+        """
+
+    @abstractmethod
+    def finish_file(self) -> None:
+        """
+        Writes the end of the current file and closes it.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def load_file(file_path: str) -> dict:
+        """
+        Reads a file of this format back as a CROWDIN structure (`{"texts": ...}`).
+        """
+
+
+class CrowdinEmitter(Emitter):
+    """
+    CROWDIN JSON, same content as `save_extracted_translations`. Scripts are kept in memory
+    until finished, the JSON structure can't be written line by line.
+    """
+
+    name = CROWDIN_FORMAT
+    extension = "_crowdin.json"
+
+    def start_file(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.scenes = {}
+
+    def emit_record(self, record: LineRecord) -> None:
+        item = {
+            "text": record.translations[ENGLISH_TAG]["text"],
+            "translations": record.translations,
+            "context": record.context,
+        }
+        if record.labels:
+            item["labels"] = record.labels
+        self.scenes.setdefault(record.scene_label, {})[record.identifier] = item
+
+    def finish_file(self) -> None:
+        with open(self.file_path, "wb") as fp:
+            fp.write(
+                json.dumps({"texts": self.scenes}, ensure_ascii=False, indent=2).encode(
+                    "utf8"
+                )
+            )
+
+    @staticmethod
+    def load_file(file_path: str) -> dict:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+class XliffEmitter(Emitter):
+    """
+    XLIFF 1.2: one `<group>` per scene and one `<trans-unit>` per line, with the Japanese text,
+    the statuses of every language and the context as notes.
+    """
+
+    name = "xliff"
+    extension = ".xliff"
+
+    @staticmethod
+    def escape(text: str) -> str:
+        # Imported here, `xml.sax.saxutils` imports `urllib` and slows down the exporter startup
+        from xml.sax.saxutils import escape
+
+        # Carriage returns would be read back as line feeds
+        return escape(XML_INVALID_CHARACTERS.sub("", text), {"\r": "&#13;"})
+
+    @staticmethod
+    def quoteattr(text: str) -> str:
+        from xml.sax.saxutils import quoteattr
+
+        return quoteattr(XML_INVALID_CHARACTERS.sub("", text))
+
+    def start_file(self, file_path: str) -> None:
+        self.fp = open(file_path, "w", encoding="utf-8")
+        self.scene_label = None
+        original = os.path.basename(file_path)[: -len(self.extension)]
+        self.fp.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<xliff version="1.2" xmlns="{XLIFF_NAMESPACE}">\n'
+            f'  <file original={self.quoteattr(original)} datatype="plaintext"'
+            f' source-language="{SOURCE_LANGUAGE}" target-language="{TARGET_LANGUAGE}">\n'
+            "    <body>\n"
+        )
+
+    def emit_record(self, record: LineRecord) -> None:
+        if record.scene_label != self.scene_label:
+            if self.scene_label is not None:
+                self.fp.write("      </group>\n")
+            self.scene_label = record.scene_label
+            self.fp.write(
+                f"      <group resname={self.quoteattr(record.scene_label)}>\n"
+            )
+
+        target = record.translations[TARGET_LANGUAGE]
+        self.fp.write(
+            f"        <trans-unit id={self.quoteattr(record.identifier)}>\n"
+            f"          <source>{self.escape(record.translations[SOURCE_LANGUAGE]['text'])}</source>\n"
+            f"          <target state={self.quoteattr(XLIFF_STATES.get(target['status'], 'needs-translation'))}>"
+            f"{self.escape(target['text'])}</target>\n"
+            f"          <note from=\"{JAPANESE_TAG}\">{self.escape(record.translations[JAPANESE_TAG]['text'])}</note>\n"
+            f'          <note from="status">{self.escape(format_statuses(record.translations))}</note>\n'
+            f'          <note from="context">{self.escape(record.context)}</note>\n'
+            f'          <note from="labels">{self.escape(chr(10).join(record.labels))}</note>\n'
+            "        </trans-unit>\n"
+        )
+
+    def finish_file(self) -> None:
+        if self.scene_label is not None:
+            self.fp.write("      </group>\n")
+        self.fp.write("    </body>\n  </file>\n</xliff>\n")
+        self.fp.close()
+
+    @staticmethod
+    def load_file(file_path: str) -> dict:
+        # Only needed to load files back, not when exporting
+        import xml.etree.ElementTree as ElementTree
+
+        ns = {"x": XLIFF_NAMESPACE}
+        scenes = {}
+        for group in ElementTree.parse(file_path).getroot().iterfind(".//x:group", ns):
+            scene = scenes.setdefault(group.get("resname"), {})
+            for unit in group.iterfind("x:trans-unit", ns):
+                notes = {
+                    note.get("from"): note.text or ""
+                    for note in unit.iterfind("x:note", ns)
+                }
+                target = unit.find("x:target", ns)
+                statuses = parse_statuses(notes.get("status", ""))
+                # The target state wins, translation tools only update that one
+                statuses[TARGET_LANGUAGE] = XLIFF_STATUSES.get(
+                    target.get("state"), statuses.get(TARGET_LANGUAGE, "untranslated")
+                )
+                scene[unit.get("id")] = make_item(
+                    {
+                        SOURCE_LANGUAGE: unit.find("x:source", ns).text or "",
+                        JAPANESE_TAG: notes.get(JAPANESE_TAG, ""),
+                        TARGET_LANGUAGE: target.text or "",
+                    },
+                    statuses,
+                    notes.get("context", ""),
+                    notes.get("labels", ""),
+                )
+        return {"texts": scenes}
+
+
+def po_quote(text: str) -> str:
+    return '"{}"'.format(
+        text.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\t", "\\t")
+        .replace("\r", "\\r")
+    )
+
+
+def po_unquote(value: str) -> str:
+    escapes = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+    text = []
+    characters = iter(value.strip()[1:-1])
+    for character in characters:
+        if character == "\\":
+            character = next(characters)
+            text.append(escapes.get(character, "\\" + character))
+        else:
+            text.append(character)
+    return "".join(text)
+
+
+class PoEmitter(Emitter):
+    """
+    gettext PO: the identifier is the `msgctxt`, EN the `msgid` and ES the `msgstr`.
+    The scene, Japanese text, statuses and context are extracted comments (`#.`),
+    and pre-translated lines are marked `fuzzy`.
+    """
+
+    name = "po"
+    extension = ".po"
+
+    def start_file(self, file_path: str) -> None:
+        self.fp = open(file_path, "w", encoding="utf-8")
+        self.fp.write(
+            'msgid ""\n'
+            'msgstr ""\n'
+            '"Content-Type: text/plain; charset=UTF-8\\n"\n'
+            f'"Language: {TARGET_LANGUAGE}\\n"\n'
+        )
+
+    def emit_record(self, record: LineRecord) -> None:
+        translations = record.translations
+        self.fp.write(
+            "\n"
+            f"#. scene: {record.scene_label}\n"
+            f"#. {JAPANESE_TAG}: {po_quote(translations[JAPANESE_TAG]['text'])}\n"
+            f"#. status: {format_statuses(translations)}\n"
+            f"#. context: {po_quote(record.context)}\n"
+            f"#. labels: {po_quote(chr(10).join(record.labels))}\n"
+            + (
+                "#, fuzzy\n"
+                if translations[TARGET_LANGUAGE]["status"] == "pretranslated"
+                else ""
+            )
+            + f"msgctxt {po_quote(record.identifier)}\n"
+            f"msgid {po_quote(translations[SOURCE_LANGUAGE]['text'])}\n"
+            f"msgstr {po_quote(translations[TARGET_LANGUAGE]['text'])}\n"
+        )
+
+    def finish_file(self) -> None:
+        self.fp.close()
+
+    @staticmethod
+    def load_file(file_path: str) -> dict:
+        scenes = {}
+
+        def add_entry(entry: dict) -> None:
+            # The header has no msgctxt
+            if "msgctxt" not in entry:
+                return
+            statuses = parse_statuses(entry.get("status", ""))
+            scenes.setdefault(entry.get("scene", ""), {})[entry["msgctxt"]] = make_item(
+                {
+                    SOURCE_LANGUAGE: entry.get("msgid", ""),
+                    JAPANESE_TAG: entry.get(JAPANESE_TAG, ""),
+                    TARGET_LANGUAGE: entry.get("msgstr", ""),
+                },
+                statuses,
+                entry.get("context", ""),
+                entry.get("labels", ""),
+            )
+
+        entry, keyword = {}, None
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    add_entry(entry)
+                    entry, keyword = {}, None
+                elif line.startswith("#. "):
+                    name, value = line[3:].split(": ", 1)
+                    entry[name] = po_unquote(value) if value.startswith('"') else value
+                elif line.startswith("#"):
+                    continue
+                elif line.startswith('"'):
+                    # Continuation of a multi-line string
+                    entry[keyword] += po_unquote(line)
+                else:
+                    keyword, value = line.split(" ", 1)
+                    entry[keyword] = po_unquote(value)
+        add_entry(entry)
+        return {"texts": scenes}
+
+
+class CsvEmitter(Emitter):
+    """
+    CSV with a row per line: identifier, scene, text and status of every language, and context.
+    """
+
+    name = "csv"
+    extension = ".csv"
+
+    def start_file(self, file_path: str) -> None:
+        self.fp = open(file_path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.fp)
+        self.writer.writerow(CSV_COLUMNS)
+
+    def emit_record(self, record: LineRecord) -> None:
+        self.writer.writerow(
+            [record.identifier, record.scene_label]
+            + [
+                value
+                for language in LANGUAGES
+                for value in (
+                    record.translations[language]["text"],
+                    record.translations[language]["status"],
+                )
+            ]
+            + [record.context, "\n".join(record.labels)]
+        )
+
+    def finish_file(self) -> None:
+        self.fp.close()
+
+    @staticmethod
+    def load_file(file_path: str) -> dict:
+        scenes = {}
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                scenes.setdefault(row["scene"], {})[row["identifier"]] = make_item(
+                    {language: row[language] for language in LANGUAGES},
+                    {language: row[f"{language} status"] for language in LANGUAGES},
+                    row["context"],
+                    row.get("labels") or "",
+                )
+        return {"texts": scenes}
+
+
+EMITTERS = {
+    CROWDIN_FORMAT: CrowdinEmitter,
+    "xliff": XliffEmitter,
+    "po": PoEmitter,
+    "csv": CsvEmitter,
+}
+
+
+def get_emitter_class(format_spec: str) -> type:
+    """
+    Returns the emitter of a registered format name (e.g. `po`)
+    or a `module:ClassName` import path for custom formats.
+    """
+    if format_spec in EMITTERS:
+        return EMITTERS[format_spec]
+    if ":" in format_spec:
+        module_name, class_name = format_spec.split(":", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+    raise Exception(f"Unknown output format: {format_spec}")
+
+
+# ============================== CONVERSION ====================================
+
+
+def find_format(file_name: str) -> Optional[type]:
+    """
+    Emitter of a file, by its extension. CROWDIN files are matched first.
+    """
+    for emitter_class in EMITTERS.values():
+        if file_name.endswith(".txt" + emitter_class.extension):
+            return emitter_class
+    return None
+
+
+def iter_loaded_records(
+    merged_translations: dict, output_file_name: str
+) -> Iterator[LineRecord]:
+    """
+    Records of a loaded file. Only the fields every format keeps are set.
+    """
+    for scene_label, texts in merged_translations["texts"].items():
+        for identifier, item in texts.items():
+            translations = item["translations"]
+            yield LineRecord(
+                file_name=output_file_name.replace(
+                    CROWDIN_FILE_SUFFIX, ".txt.scn.m.json"
+                ),
+                output_file_name=output_file_name,
+                identifier=identifier,
+                scene_label=scene_label,
+                scene_title="",
+                scene_type="",
+                character=None,
+                before_revealing_name=None,
+                scene_target=None,
+                text_en=translations[ENGLISH_TAG]["text"],
+                text_ja=translations[JAPANESE_TAG]["text"],
+                context=item.get("context", ""),
+                labels=item.get("labels", []),
+                translations=translations,
+            )
+
+
+def convert_folder(
+    input_folder_path: str, output_folder_path: str, format_specs: list[str]
+) -> list[str]:
+    """
+    Converts every file of the folder, in any supported format, to the given formats.
+    Returns the written file names.
+    """
+    emitters = [
+        get_emitter_class(format_spec)(output_folder_path)
+        for format_spec in format_specs
+    ]
+    for file_name in sorted(os.listdir(input_folder_path)):
+        emitter_class = find_format(file_name)
+        if emitter_class is None:
+            continue
+        merged_translations = emitter_class.load_file(
+            os.path.join(input_folder_path, file_name)
+        )
+        output_file_name = (
+            file_name[: -len(emitter_class.extension)][: -len(".txt")]
+            + CROWDIN_FILE_SUFFIX
+        )
+        for record in iter_loaded_records(merged_translations, output_file_name):
+            for emitter in emitters:
+                emitter.emit(record)
+
+    for emitter in emitters:
+        emitter.close()
+    return [file_name for emitter in emitters for file_name in emitter.written_files]
+
+
+# ================================ MAIN ======================================
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert exported files between the CROWDIN JSON, XLIFF, PO and CSV formats."
+    )
+    parser.add_argument(
+        "input_folder",
+        type=str,
+        help="Path to the folder with the files to convert (any supported format).",
+    )
+    parser.add_argument(
+        "--output-folder",
+        type=str,
+        required=True,
+        help="Path to the folder where the converted files will be saved.",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        action="append",
+        required=True,
+        help=f"Output format: {', '.join(EMITTERS)} or `module:ClassName`. Can be repeated.",
+    )
+    args = parser.parse_args()
+
+    try:
+        written_files = convert_folder(
+            args.input_folder, args.output_folder, args.format
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        exit(1)
+    print(f"{len(written_files)} files written.")
@@ -0,0 +1,295 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Packs the scenes exported by json-exporter.py into CROWDIN bundle files of a target size,
+# instead of one file per script. Scenes are never split, and a stable scene-to-bundle index
+# keeps scenes in the same bundle across re-exports and routes translations back to their script.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import json, os, argparse
+from typing import Optional
+
+from plamemo import CROWDIN_FILE_SUFFIX
+
+BUNDLE_FILE_PREFIX = "bundle-"
+BUNDLE_INDEX_FILENAME = "bundles-index.json"
+BUNDLE_INDEX_VERSION = 1
+
+DEFAULT_BUNDLE_MAX_LINES = 2000
+DEFAULT_BUNDLE_MAX_BYTES = 2 * 1024 * 1024
+
+
+# ============================== UTIL ====================================
+
+
+def bundle_file_name(number: int) -> str:
+    return f"{BUNDLE_FILE_PREFIX}{number:04d}{CROWDIN_FILE_SUFFIX}"
+
+
+def scene_key(output_file_name: str, scene_label: str) -> str:
+    """
+    Key of a scene inside a bundle, unique across the whole game.
+    Uses the same `<file title>-<scene label>` prefix as the line identifiers.
+    """
+    return "{}-{}".format(output_file_name.split(".")[0], scene_label)
+
+
+def relabel_scene(scene_texts: dict, scene_label: str) -> dict:
+    """
+    Copy of the scene strings with their `scene-label:` label set to `scene_label`.
+    The Crowdin exporter routes each string to `texts[<scene-label>]` of the uploaded
+    file, so the label must match the scene key of the file it's in.
+    """
+    relabeled_texts = {}
+    for identifier, item in scene_texts.items():
+        # Replaced in place, so splitting a bundle gives back the exported labels
+        labels = [
+            f"scene-label:{scene_label}" if label.startswith("scene-label:") else label
+            for label in item.get("labels", [])
+        ]
+        if f"scene-label:{scene_label}" not in labels:
+            labels.insert(0, f"scene-label:{scene_label}")
+        relabeled_texts[identifier] = {**item, "labels": labels}
+    return relabeled_texts
+
+
+def scene_size(scene_texts: dict) -> int:
+    """
+    Size in bytes of the scene once saved.
+    """
+    return len(json.dumps(scene_texts, ensure_ascii=False, indent=2).encode("utf8"))
+
+
+def load_bundle_index(index_file_path: str) -> dict:
+    """
+    Loads the scene index: `{scene key: {"file": ..., "scene": ..., "bundle": ...}}`.
+    """
+    try:
+        with open(index_file_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except OSError:
+        return {}
+    if index.get("version") != BUNDLE_INDEX_VERSION:
+        raise Exception(f"Unsupported bundle index version: {index_file_path}")
+    return index["scenes"]
+
+
+def source_scene(scenes_index: dict, file_name: str, scene_label: str) -> tuple:
+    """
+    Returns the `(CROWDIN file name, scene label)` a scene was exported with.
+    Scenes of bundles are looked up in the scene index, other scenes are returned as they are.
+    """
+    entry = (
+        scenes_index.get(scene_label)
+        if file_name.startswith(BUNDLE_FILE_PREFIX)
+        else None
+    )
+    if entry is None:
+        return file_name, scene_label
+    return entry["file"], entry["scene"]
+
+
+def save_bundle_index(index_file_path: str, scenes_index: dict) -> None:
+    with open(index_file_path, "wb") as fp:
+        fp.write(
+            json.dumps(
+                {"version": BUNDLE_INDEX_VERSION, "scenes": scenes_index},
+                ensure_ascii=False,
+                indent=2,
+                sort_keys=True,
+            ).encode("utf8")
+        )
+
+
+# ============================== PLANNER ====================================
+
+
+def plan_bundles(
+    scenes: list[tuple],
+    previous_index: dict,
+    max_lines: int = DEFAULT_BUNDLE_MAX_LINES,
+    max_bytes: int = DEFAULT_BUNDLE_MAX_BYTES,
+) -> dict:
+    """
+    Assigns every scene to a bundle. `scenes` are `(scene key, line count, size)` tuples.
+
+    Scenes already in the previous index keep their bundle, even if it's now over the
+    target size, so re-exports don't move strings between Crowdin files. New scenes are
+    packed in order into the first bundle with enough room, or into a new bundle.
+    A scene bigger than the target gets a bundle of its own.
+    Returns `{scene key: bundle file name}`.
+    """
+    assignments = {}
+    # bundle file name -> [line count, size]
+    usage = {}
+
+    new_scenes = []
+    for key, line_count, size in scenes:
+        bundle = previous_index.get(key, {}).get("bundle")
+        if bundle is None:
+            new_scenes.append((key, line_count, size))
+            continue
+        assignments[key] = bundle
+        bundle_usage = usage.setdefault(bundle, [0, 0])
+        bundle_usage[0] += line_count
+        bundle_usage[1] += size
+
+    # Bundle numbers are never reused, so an emptied bundle doesn't receive other scenes
+    used_numbers = [
+        int(entry["bundle"][len(BUNDLE_FILE_PREFIX) :].split(".")[0])
+        for entry in previous_index.values()
+    ]
+    next_number = max(used_numbers, default=0) + 1
+
+    for key, line_count, size in new_scenes:
+        bundle = next(
+            (
+                name
+                for name, (used_lines, used_bytes) in usage.items()
+                if used_lines + line_count <= max_lines
+                and used_bytes + size <= max_bytes
+            ),
+            None,
+        )
+        if bundle is None:
+            bundle = bundle_file_name(next_number)
+            next_number += 1
+            usage[bundle] = [0, 0]
+        assignments[key] = bundle
+        usage[bundle][0] += line_count
+        usage[bundle][1] += size
+
+    return assignments
+
+
+def write_bundles(
+    merged_translations_by_file: dict,
+    output_folder_path: str,
+    max_lines: int = DEFAULT_BUNDLE_MAX_LINES,
+    max_bytes: int = DEFAULT_BUNDLE_MAX_BYTES,
+) -> list[str]:
+    """
+    Writes the merged translations of every script as bundles, plus the updated index.
+    Scenes are keyed by `scene_key` in the bundles, and their strings are labeled with it.
+    `merged_translations_by_file` maps each output file name to its `translations_merger` output.
+    Returns the written bundle file names.
+    """
+    index_file_path = os.path.join(output_folder_path, BUNDLE_INDEX_FILENAME)
+    previous_index = load_bundle_index(index_file_path)
+
+    scenes = []
+    scenes_index = {}
+    scene_texts_by_key = {}
+    for output_file_name in sorted(merged_translations_by_file):
+        merged_translations = merged_translations_by_file[output_file_name]
+        for scene_label, scene_texts in merged_translations["texts"].items():
+            key = scene_key(output_file_name, scene_label)
+            scene_texts = relabel_scene(scene_texts, key)
+            scenes.append((key, len(scene_texts), scene_size(scene_texts)))
+            scenes_index[key] = {"file": output_file_name, "scene": scene_label}
+            scene_texts_by_key[key] = scene_texts
+
+    assignments = plan_bundles(scenes, previous_index, max_lines, max_bytes)
+
+    bundles = {}
+    for key, _, _ in scenes:
+        bundles.setdefault(assignments[key], {})[key] = scene_texts_by_key[key]
+        scenes_index[key]["bundle"] = assignments[key]
+
+    for bundle, bundle_scenes in bundles.items():
+        with open(os.path.join(output_folder_path, bundle), "wb") as fp:
+            fp.write(
+                json.dumps(
+                    {"texts": bundle_scenes}, ensure_ascii=False, indent=2
+                ).encode("utf8")
+            )
+
+    # Remove bundles whose scenes are all gone, so they're not uploaded again
+    for entry in previous_index.values():
+        stale_bundle_path = os.path.join(output_folder_path, entry["bundle"])
+        if entry["bundle"] not in bundles and os.path.exists(stale_bundle_path):
+            os.remove(stale_bundle_path)
+
+    # Scenes that are no longer exported keep their entry, so their bundle number isn't reused
+    save_bundle_index(index_file_path, {**previous_index, **scenes_index})
+    return sorted(bundles)
+
+
+def split_bundles(
+    bundle_folder_path: str,
+    output_folder_path: str,
+    index_file_path: Optional[str] = None,
+) -> list[str]:
+    """
+    Routes the scenes of the bundles (e.g. downloaded from Crowdin) back to one file per script,
+    with their original scene labels. Returns the written file names.
+    """
+    scenes_index = load_bundle_index(
+        index_file_path or os.path.join(bundle_folder_path, BUNDLE_INDEX_FILENAME)
+    )
+    if not scenes_index:
+        raise Exception("Bundle index missing or empty.")
+
+    files = {}
+    for bundle in sorted({entry["bundle"] for entry in scenes_index.values()}):
+        bundle_path = os.path.join(bundle_folder_path, bundle)
+        if not os.path.exists(bundle_path):
+            continue
+        with open(bundle_path, "r", encoding="utf-8") as f:
+            bundle_scenes = json.load(f)["texts"]
+
+        for key, scene_texts in bundle_scenes.items():
+            if key not in scenes_index:
+                raise Exception(f"Scene {key} of {bundle} is not in the bundle index.")
+            entry = scenes_index[key]
+            files.setdefault(entry["file"], {})[entry["scene"]] = relabel_scene(
+                scene_texts, entry["scene"]
+            )
+
+    for output_file_name, scenes in files.items():
+        with open(os.path.join(output_folder_path, output_file_name), "wb") as fp:
+            fp.write(
+                json.dumps({"texts": scenes}, ensure_ascii=False, indent=2).encode(
+                    "utf8"
+                )
+            )
+
+    return sorted(files)
+
+
+# ================================ MAIN ======================================
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Split CROWDIN bundles written by json-exporter.py --bundle back into one file per script."
+    )
+    parser.add_argument(
+        "bundle_folder",
+        type=str,
+        help="Path to the folder containing the bundle files.",
+    )
+    parser.add_argument(
+        "--output-folder",
+        type=str,
+        required=True,
+        help="Path to the folder where per-script files will be saved.",
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        help=f"Path to the bundle index (default: <bundle_folder>/{BUNDLE_INDEX_FILENAME}).",
+    )
+    args = parser.parse_args()
+
+    try:
+        written_files = split_bundles(
+            args.bundle_folder, args.output_folder, args.index
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        exit(1)
+    print(f"{len(written_files)} files written.")
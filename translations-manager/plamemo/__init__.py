@@ -0,0 +1,41 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Importable API of the translations manager: extraction and merge of the game scripts,
+# and lazy iteration over their lines. Used by json-exporter.py and its GUI version,
+# and by the other tools for the names and helpers they share (language tags, CROWDIN files...).
+#
+#     from plamemo import iter_line_records
+#
+#     for record in iter_line_records("en", "ja", characters=["Isla"]):
+#         print(record.identifier, record.text_en, record.text_ja)
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+from .extraction import (
+    CONTEXT_LINE_MAX_LENGTH,
+    CONTEXT_MAX_LENGTH,
+    CROWDIN_FILE_SUFFIX,
+    DEFAULT_CONTEXT_LINES,
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    MISSING_SOURCE_TEXTS,
+    NO_ENGLISH_SOURCE,
+    NO_JAPANESE_SOURCE,
+    SPANISH_TAG,
+    ProcessedFile,
+    SceneMismatchError,
+    build_dialogue_contexts,
+    extract_translations,
+    getDefaultScenesTexts,
+    getSelectionScenesTexts,
+    get_crowdin_files,
+    get_file_pairs,
+    get_output_file_name,
+    iter_processed_files,
+    load_data,
+    process_file_pair,
+    save_extracted_translations,
+    shorten,
+    translations_merger,
+)
+from .records import LineRecord, iter_file_records, iter_line_records, label_value
@@ -0,0 +1,563 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+# By:
+# - QuitoTactico - https://github.com/QuitoTactico
+# - dvdantunes   - https://github.com/dvdantunes
+
+# Extraction and merge of the translations of the JSON files exported from the game engine.
+# It extracts the English and Japanese translations and merges them into a single structure,
+# with an empty Spanish translation, ready for use on the CROWDIN platform.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import json, os
+from typing import Iterator, NamedTuple, Optional
+
+ENGLISH_TAG = "en"
+JAPANESE_TAG = "ja"
+SPANISH_TAG = "es-ES"
+
+CROWDIN_FILE_SUFFIX = ".txt_crowdin.json"
+
+# Placeholders written by `translations_merger` when a source is missing
+NO_ENGLISH_SOURCE = "(No English source available)"
+NO_JAPANESE_SOURCE = "(No Japanese source available)"
+# English texts of lines with nothing to translate from
+MISSING_SOURCE_TEXTS = (NO_ENGLISH_SOURCE, "")
+
+# Surrounding dialogue lines added to the context of each line
+DEFAULT_CONTEXT_LINES = 3
+# Keep the context readable in the Crowdin editor
+CONTEXT_LINE_MAX_LENGTH = 200
+CONTEXT_MAX_LENGTH = 2000
+
+
+class SceneMismatchError(Exception):
+    """Exception raised for mismatched scenes in input files."""
+
+    pass
+
+
+# ============================== UTIL ====================================
+
+
+def get_crowdin_files(folder: str) -> list[str]:
+    """
+    Returns the sorted paths of the Crowdin files in the folder.
+    """
+    return sorted(
+        os.path.join(folder, f)
+        for f in os.listdir(folder)
+        if f.endswith(CROWDIN_FILE_SUFFIX)
+    )
+
+
+def get_file_pairs(folder_en: str, folder_ja: str) -> list[dict]:
+    """
+    Matches files with the same name in the English and Japanese folders.
+    Returns a list of dictionaries with matched file paths.
+    Files without a match will still be included with a None value for the missing counterpart.
+    """
+    files_en = {f for f in os.listdir(folder_en) if f.endswith(".json")}
+    files_ja = {f for f in os.listdir(folder_ja) if f.endswith(".json")}
+
+    all_files = files_en | files_ja  # Union of all filenames
+    file_pairs = []
+
+    for file_name in all_files:
+        file_pairs.append(
+            {
+                ENGLISH_TAG: (
+                    os.path.join(folder_en, file_name)
+                    if file_name in files_en
+                    else None
+                ),
+                JAPANESE_TAG: (
+                    os.path.join(folder_ja, file_name)
+                    if file_name in files_ja
+                    else None
+                ),
+            }
+        )
+
+    return file_pairs
+
+
+def load_data(input_file_path: str) -> dict:
+    """
+    Loads the JSON file from the specified path.
+    """
+    with open(input_file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_extracted_translations(
+    extracted_translations: dict, output_file_path: str
+) -> None:
+    """
+    Saves the extracted translations dictionary to a JSON file.
+    """
+    with open(output_file_path, "wb") as fp:
+        fp.write(
+            json.dumps(extracted_translations, ensure_ascii=False, indent=2).encode(
+                "utf8"
+            )
+        )
+
+
+def shorten(text: str, max_length: int) -> str:
+    """
+    Cuts the text to `max_length` characters, marking the cut with an ellipsis.
+    """
+    return text if len(text) <= max_length else text[: max_length - 1] + "…"
+
+
+def build_dialogue_contexts(
+    lines: list[str], context_lines: int, choice: Optional[str] = None
+) -> list[str]:
+    """
+    Builds the context of every line of a scene: the previous and next `context_lines`
+    lines, and the choice that led to the scene, if any.
+    `lines` are already formatted as `speaker: text`, so each one is formatted only once
+    and every context is just a slice of the scene (a sliding window).
+    Contexts longer than `CONTEXT_MAX_LENGTH` lose their farthest lines first, so the
+    current line (marked with `>`) is always kept.
+    """
+    header = [f'Chosen option: "{choice}"'] if choice else []
+    header_length = sum(len(line) + 1 for line in header)
+    contexts = []
+    for i in range(len(lines)):
+        previous_lines = lines[max(0, i - context_lines) : i]
+        next_lines = lines[i + 1 : i + 1 + context_lines]
+        current_line = "> " + lines[i]
+
+        length = (
+            header_length
+            + sum(len(line) + 1 for line in previous_lines + next_lines)
+            + len(current_line)
+        )
+        while length > CONTEXT_MAX_LENGTH and (previous_lines or next_lines):
+            if len(previous_lines) > len(next_lines):
+                length -= len(previous_lines.pop(0)) + 1
+            else:
+                length -= len(next_lines.pop()) + 1
+
+        window = previous_lines + [current_line] + next_lines
+        contexts.append(shorten("\n".join(header + window), CONTEXT_MAX_LENGTH))
+    return contexts
+
+
+# ============================== MAIN FUNCTIONS ====================================
+
+
+def getDefaultScenesTexts(
+    scene: dict,
+    file_title: str,
+    global_labels: list,
+    simplified: bool,
+    choice: Optional[str] = None,
+    context_lines: int = DEFAULT_CONTEXT_LINES,
+) -> dict:
+    """
+    Get texts and details from the Default type scenes
+
+    Note: scene objects has the following format:
+
+    # type 1: default scenes
+    ```
+    scenes: [
+      {
+        label: '',
+        texts: [
+          [
+            'Eru',           # t[0]: character name
+            'Girl',          # t[1]: apparently the temporary name before revealing the character name
+            'Good morning!'  # t[2]: text/dialog
+          ]
+        ]
+      }
+    ]
+    ```
+
+    The context of each line shows the surrounding dialogue (see `build_dialogue_contexts`)
+    and `choice`, the text of the option that led to this scene.
+    """
+    texts = {}
+    scene_label = scene["label"].strip("*")
+    scene_title = scene["title"]
+
+    if not simplified:
+        # Lines as the player sees them: the temporary name is shown until it's revealed
+        contexts = build_dialogue_contexts(
+            [
+                "{}: {}".format(
+                    text_group[1] or text_group[0] or "voice-off",
+                    shorten(text_group[2] or "", CONTEXT_LINE_MAX_LENGTH),
+                )
+                for text_group in scene["texts"]
+            ],
+            context_lines,
+            choice,
+        )
+
+    for i in range(len(scene["texts"])):
+        text_group = scene["texts"][i]
+        # format number with leading zero
+        identifier = f"{file_title}-{scene_label}.{i:02d}"
+
+        # voice-off when no character available
+        character = text_group[0] if text_group[0] is not None else "voice-off"
+
+        # checks if temporary name is present (the name before the)
+        # e.g: Eru is not revealed as 'Eru', but as 'Girl' when Tsukasa meets her
+        before_revealing_name = text_group[1] if text_group[1] is not None else None
+
+        labels = [
+            "character:{}".format(character),
+            "scene-type:default",
+            "scene-label:{}".format(scene_label),
+            "scene-title:{}".format(scene_title),
+        ]
+
+        if before_revealing_name is not None:
+            labels.append("before-revealing-name:{}".format(before_revealing_name))
+
+        texts[identifier] = {
+            "character": character,
+            "text": text_group[2],
+            "translations": {},
+        }
+
+        # Exclude context properties in simplified format
+        if not simplified:
+            context = contexts[i]
+            custom_data = "character:{}".format(character)
+
+            extend = {
+                "isHidden": False,
+                "context": context,
+                "labels": labels + global_labels,
+                "customData": custom_data,
+            }
+            texts[identifier].update(extend)
+
+    return texts
+
+
+def getSelectionScenesTexts(
+    scene: dict, file_title: str, global_labels: list, simplified: bool
+) -> dict:
+    """
+    Get texts and details from the Selection type scenes
+
+    Note: scene objects has the following format:
+
+    ### type 2: selection scenes
+    ```
+    scenes: [
+      {
+        label: '',
+        selects: {
+          0: {
+            target: ''  # target scene label (optional)
+            text: ''
+          },
+          1: {
+            target: ''  # target scene label (optional)
+            text: ''
+          },
+        }
+      }
+    ]
+    ```
+    """
+    texts = {}
+    scene_label = scene["label"].strip("*")
+    scene_title = scene["title"]
+
+    if not simplified:
+        # Every option of the selection, pointing to the current one
+        options = [
+            "{} (-> {})".format(
+                shorten(text_group["text"] or "", CONTEXT_LINE_MAX_LENGTH),
+                text_group["target"].strip("*") if "target" in text_group else "none",
+            )
+            for text_group in scene["selects"]
+        ]
+
+    for i in range(len(scene["selects"])):
+        text_group = scene["selects"][i]
+        # format number with leading zero
+        identifier = f"{file_title}-{scene_label}.{i:02d}"
+
+        # scene target
+        scene_target = (
+            text_group["target"].strip("*") if "target" in text_group else "none"
+        )
+
+        labels = [
+            "scene-type:selection",
+            "scene-label:{}".format(scene_label),
+            "scene-title:{}".format(scene_title),
+            "scene-target:{}".format(scene_target),
+        ]
+
+        texts[identifier] = {
+            "text": text_group["text"],
+            "translations": {},
+        }
+
+        # Exclude context properties in simplified format
+        if not simplified:
+            context = shorten(
+                "\n".join(
+                    ["Options:"]
+                    + [
+                        ("> " if j == i else "  ") + option
+                        for j, option in enumerate(options)
+                    ]
+                ),
+                CONTEXT_MAX_LENGTH,
+            )
+            custom_data = "character:{}".format("pending")
+
+            extend = {
+                "isHidden": False,
+                "context": context,
+                "labels": labels + global_labels,
+                "customData": custom_data,
+            }
+            texts[identifier].update(extend)
+
+    return texts
+
+
+def extract_translations(
+    data: dict, simplified=False, context_lines=DEFAULT_CONTEXT_LINES
+) -> dict:
+    """
+    Processes the loaded JSON and extracts translations organized by scenes.
+    """
+    # Common data
+    filename = data["name"]
+    file_title = filename.split(".")[0]
+    global_labels = ["filename:{}".format(filename)]
+
+    # Text of the options leading to each scene, used as context
+    choices = {}
+    for scene in data["scenes"]:
+        for text_group in scene.get("selects", []):
+            if "target" in text_group:
+                choices.setdefault(text_group["target"].strip("*"), text_group["text"])
+
+    texts = {}
+    for scene in data["scenes"]:
+        scene_label = scene["label"].strip("*")
+        # type 1: default scenes
+        if "texts" in scene:
+            texts[scene_label] = getDefaultScenesTexts(
+                scene,
+                file_title,
+                global_labels,
+                simplified,
+                choices.get(scene_label),
+                context_lines,
+            )
+        # type 2: selection scenes
+        if "selects" in scene:
+            texts[scene_label] = getSelectionScenesTexts(
+                scene, file_title, global_labels, simplified
+            )
+
+    extracted_translations = {"texts": texts}
+
+    # Exclude context properties in simplified format
+    if not simplified:
+        extend = {
+            "filename": filename,
+            "labels": global_labels,
+        }
+        extracted_translations = {**extend, **extracted_translations}
+
+    return extracted_translations
+
+
+def translations_merger(
+    translations_en: dict | None, translations_ja: dict | None
+) -> dict:
+    """
+    Merges Japanese translations into the English translations.
+    Adds an empty Spanish translation with status 'untranslated'.
+    Keeps the labels of the extraction, so the Crowdin exporter can place every string back.
+    If Japanese or English translation doesn't exist fully or partially, leaves that space blank.
+    The context shows the Japanese original followed by the surrounding dialogue, if extracted.
+    """
+    # Initialize the merged translations with an empty structure
+    merged_translations = {"texts": {}}
+
+    # Get the scenes from both translations, defaulting to empty dicts if missing
+    scenes_en = translations_en.get("texts", {}) if translations_en else {}
+    scenes_ja = translations_ja.get("texts", {}) if translations_ja else {}
+
+    # Combine all scene labels from both translations, in script order (English first)
+    # so the output is the same on every run
+    all_scene_labels = list(scenes_en) + [
+        label for label in scenes_ja if label not in scenes_en
+    ]
+
+    for scene_label in all_scene_labels:
+        # Get texts for the current scene from both translations
+        scene_texts_en = scenes_en.get(scene_label, {})
+        scene_texts_ja = scenes_ja.get(scene_label, {})
+
+        # Initialize the merged scene
+        merged_scene = {}
+
+        # Combine all identifiers (keys) from both translations, in script order too
+        all_identifiers = list(scene_texts_en) + [
+            identifier
+            for identifier in scene_texts_ja
+            if identifier not in scene_texts_en
+        ]
+
+        for identifier in all_identifiers:
+            # Get text data for the current identifier from both translations
+            text_data_en = scene_texts_en.get(identifier, {})
+            text_data_ja = scene_texts_ja.get(identifier, {})
+
+            # Extract the English and Japanese texts (default to empty strings if missing)
+            en_text = text_data_en.get("text", NO_ENGLISH_SOURCE)
+            ja_text = text_data_ja.get("text", NO_JAPANESE_SOURCE)
+
+            # Surrounding dialogue, preferably in English as it's the base text
+            dialogue_context = text_data_en.get("context") or text_data_ja.get(
+                "context"
+            )
+
+            # Labels of the extraction, the Crowdin exporter finds the scene by `scene-label:`
+            labels = list(
+                text_data_en.get("labels") or text_data_ja.get("labels") or []
+            )
+            if not any(label.startswith("scene-label:") for label in labels):
+                labels.insert(0, f"scene-label:{scene_label}")
+
+            # Merge the translations
+            merged_scene[identifier] = {
+                "text": en_text,  # Use English text as the base
+                "translations": {
+                    JAPANESE_TAG: {
+                        "text": ja_text,
+                        "status": "approved" if ja_text else "untranslated",
+                    },
+                    ENGLISH_TAG: {
+                        "text": en_text,
+                        "status": "approved" if en_text else "untranslated",
+                    },
+                    SPANISH_TAG: {
+                        "text": "",
+                        "status": "untranslated",
+                    },
+                },
+                # Add context if Japanese text exists, otherwise provide a default message
+                "context": shorten(
+                    "\n\n".join(
+                        filter(
+                            None,
+                            [
+                                (
+                                    f"Original Text: {ja_text}"
+                                    if ja_text
+                                    else "No Japanese source available, probably it's original content."
+                                ),
+                                dialogue_context,
+                            ],
+                        )
+                    ),
+                    CONTEXT_MAX_LENGTH,
+                ),
+                "labels": labels,
+            }
+
+        # Add the merged scene to the merged translations
+        merged_translations["texts"][scene_label] = merged_scene
+
+    return merged_translations
+
+
+# ============================== FILE PAIRS ====================================
+
+
+class ProcessedFile(NamedTuple):
+    file_pair: dict
+    output_file_name: str
+    translations_en: Optional[dict]
+    translations_ja: Optional[dict]
+    translations_merged: dict
+
+
+def get_output_file_name(file_pair: dict) -> str:
+    """
+    Name of the CROWDIN file of a file pair, e.g. `pm01_00.txt_crowdin.json`.
+    """
+    return os.path.basename(
+        file_pair.get(ENGLISH_TAG) or file_pair.get(JAPANESE_TAG)
+    ).replace(".txt.scn.m.json", CROWDIN_FILE_SUFFIX)
+
+
+def process_file_pair(
+    file_pair: dict, simplified=False, context_lines=DEFAULT_CONTEXT_LINES
+) -> ProcessedFile:
+    """
+    Loads, extracts and merges the translations of a single EN/JA file pair.
+    The missing counterpart of a pair (None) is left blank in the merge.
+    """
+    input_file_path_en = file_pair.get(ENGLISH_TAG)
+    input_file_path_ja = file_pair.get(JAPANESE_TAG)
+
+    translations_en = (
+        extract_translations(load_data(input_file_path_en), simplified, context_lines)
+        if input_file_path_en
+        else None
+    )
+    translations_ja = (
+        extract_translations(load_data(input_file_path_ja), simplified, context_lines)
+        if input_file_path_ja
+        else None
+    )
+
+    return ProcessedFile(
+        file_pair,
+        get_output_file_name(file_pair),
+        translations_en,
+        translations_ja,
+        translations_merger(translations_en, translations_ja),
+    )
+
+
+def iter_processed_files(
+    folder_en: str,
+    folder_ja: str,
+    files: Optional[list] = None,
+    simplified=False,
+    context_lines=DEFAULT_CONTEXT_LINES,
+) -> Iterator[ProcessedFile]:
+    """
+    Lazily processes every file pair of the folders, in file name order.
+    `files` restricts the pairs to those source file names (e.g. `pm01_00.txt.scn.m.json`),
+    other pairs are not even loaded.
+    """
+    file_pairs = sorted(
+        get_file_pairs(folder_en, folder_ja),
+        key=lambda file_pair: os.path.basename(
+            file_pair.get(ENGLISH_TAG) or file_pair.get(JAPANESE_TAG)
+        ),
+    )
+    for file_pair in file_pairs:
+        file_name = os.path.basename(
+            file_pair.get(ENGLISH_TAG) or file_pair.get(JAPANESE_TAG)
+        )
+        if files is not None and file_name not in files:
+            continue
+        yield process_file_pair(file_pair, simplified, context_lines)
@@ -0,0 +1,119 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Line records: one flat record per extracted and merged line, yielded lazily
+# so other tools can consume the whole game script without intermediate files.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+from typing import Iterator, NamedTuple, Optional
+
+from .extraction import (
+    CROWDIN_FILE_SUFFIX,
+    DEFAULT_CONTEXT_LINES,
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    ProcessedFile,
+    iter_processed_files,
+)
+
+
+class LineRecord(NamedTuple):
+    file_name: str  # source file name, e.g. `pm01_00.txt.scn.m.json`
+    output_file_name: str  # CROWDIN file name, e.g. `pm01_00.txt_crowdin.json`
+    identifier: str
+    scene_label: str
+    scene_title: str
+    scene_type: str  # `default` or `selection`
+    character: Optional[str]  # None in selection scenes
+    before_revealing_name: Optional[str]
+    # scene a selection option leads to, `none` if it has no target
+    scene_target: Optional[str]
+    text_en: str
+    text_ja: str
+    context: str
+    labels: list  # CROWDIN labels of the merged line
+    translations: dict  # merged translations per language, with their status
+
+
+def label_value(labels: list, prefix: str) -> Optional[str]:
+    """
+    Returns the value of the first `<prefix>:<value>` label, if any.
+    """
+    for label in labels:
+        if label.startswith(prefix + ":"):
+            return label[len(prefix) + 1 :]
+    return None
+
+
+def iter_file_records(processed_file: ProcessedFile) -> Iterator[LineRecord]:
+    """
+    Yields the records of a processed file pair, in scene and line order.
+    Details like the character come from the English extraction, or the Japanese one
+    when the line has no English source.
+    """
+    scenes_en = (processed_file.translations_en or {}).get("texts", {})
+    scenes_ja = (processed_file.translations_ja or {}).get("texts", {})
+    merged_scenes = processed_file.translations_merged["texts"]
+    file_name = processed_file.output_file_name.replace(
+        CROWDIN_FILE_SUFFIX, ".txt.scn.m.json"
+    )
+
+    # The merge keeps the scenes and lines in script order
+    for scene_label, merged_scene in merged_scenes.items():
+        scene_texts_en = scenes_en.get(scene_label, {})
+        scene_texts_ja = scenes_ja.get(scene_label, {})
+
+        for identifier, merged in merged_scene.items():
+            text_data = scene_texts_en.get(identifier) or scene_texts_ja[identifier]
+            labels = text_data.get("labels", [])
+            translations = merged["translations"]
+
+            yield LineRecord(
+                file_name=file_name,
+                output_file_name=processed_file.output_file_name,
+                identifier=identifier,
+                scene_label=scene_label,
+                scene_title=label_value(labels, "scene-title") or "",
+                scene_type=label_value(labels, "scene-type") or "",
+                character=text_data.get("character"),
+                before_revealing_name=label_value(labels, "before-revealing-name"),
+                scene_target=label_value(labels, "scene-target"),
+                text_en=translations[ENGLISH_TAG]["text"],
+                text_ja=translations[JAPANESE_TAG]["text"],
+                context=merged.get("context", ""),
+                labels=merged.get("labels", []),
+                translations=translations,
+            )
+
+
+def iter_line_records(
+    folder_en: str,
+    folder_ja: str,
+    files: Optional[list] = None,
+    scenes: Optional[list] = None,
+    characters: Optional[list] = None,
+    context_lines: int = DEFAULT_CONTEXT_LINES,
+) -> Iterator[LineRecord]:
+    """
+    Lazily yields a record per line of every EN/JA file pair of the folders.
+    File pairs are loaded one at a time, when the previous one has been consumed.
+
+    Filters (None means no filter):
+    - `files`: source file names, e.g. `pm01_00.txt.scn.m.json`. Other files are not loaded.
+    - `scenes`: scene labels or titles.
+    - `characters`: character names, as in the English script.
+    """
+    for processed_file in iter_processed_files(
+        folder_en, folder_ja, files, context_lines=context_lines
+    ):
+        for record in iter_file_records(processed_file):
+            if scenes is not None and not (
+                record.scene_label in scenes or record.scene_title in scenes
+            ):
+                continue
+            if characters is not None and record.character not in characters:
+                continue
+            yield record
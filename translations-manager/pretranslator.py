@@ -0,0 +1,409 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Optional machine pre-translation stage for the `.txt_crowdin.json` files.
+# Untranslated `es-ES` lines are deduplicated and sent to a pluggable MT backend in batches,
+# and every result is kept in a persistent cache, so reruns never translate the same text twice.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import json, os, argparse, hashlib, importlib, time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from plamemo import ENGLISH_TAG, MISSING_SOURCE_TEXTS, SPANISH_TAG, get_crowdin_files
+
+
+CACHE_FILENAME = ".mt-cache.jsonl"
+
+# Status of pre-filled translations, so reviewers can tell them apart.
+# custom-file-importer.js uploads them as 'translated' (not approved)
+PRETRANSLATED_STATUS = "pretranslated"
+
+
+DEFAULT_BATCH_MAX_TEXTS = 50
+DEFAULT_BATCH_MAX_CHARS = 5000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+
+# Prefix of the fake backend translations
+FAKE_TRANSLATION_MARKER = "⟦MT⟧ "
+
+
+class TranslationBackendError(Exception):
+    """Exception raised by backends when a batch can't be translated (it will be retried)."""
+
+    pass
+
+
+# ============================== BACKENDS ====================================
+
+
+class TranslationBackend(ABC):
+    """
+    Base class of the MT backends. Subclasses must implement `translate_batch`.
+    `name` identifies the engine in the cache, so change it when the engine or its settings change.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def translate_batch(
+        self, texts: list[str], source_language: str, target_language: str
+    ) -> list[str]:
+        """
+        Returns the translations of the texts, in the same order.
+        Raises `TranslationBackendError` when the batch should be retried.
+        """
+
+
+class FakeBackend(TranslationBackend):
+    """
+    Local backend for tests and benchmarks: prefixes every text with `FAKE_TRANSLATION_MARKER`
+    instead of translating it. The marker isn't engine markup, so checkers don't parse it as a tag.
+    `latency` simulates the time a request to a real engine takes, in seconds,
+    and every `fail_every`-th request fails, to exercise the retries.
+    """
+
+    name = "fake-mt"
+
+    def __init__(self, latency: float = 0.0, fail_every: int = 0) -> None:
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+
+    def translate_batch(
+        self, texts: list[str], source_language: str, target_language: str
+    ) -> list[str]:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and self.requests % self.fail_every == 0:
+            raise TranslationBackendError("fake backend failure")
+        return [f"{FAKE_TRANSLATION_MARKER}{text}" for text in texts]
+
+
+BACKENDS = {
+    "fake": FakeBackend,
+}
+
+
+def load_backend(
+    backend_spec: str, options: Optional[dict] = None
+) -> TranslationBackend:
+    """
+    Returns a backend instance from a registered name (e.g. `fake`)
+    or a `module:ClassName` import path for custom backends.
+    """
+    if backend_spec in BACKENDS:
+        backend_class = BACKENDS[backend_spec]
+    elif ":" in backend_spec:
+        module_name, class_name = backend_spec.split(":", 1)
+        backend_class = getattr(importlib.import_module(module_name), class_name)
+    else:
+        raise Exception(f"Unknown translation backend: {backend_spec}")
+    return backend_class(**(options or {}))
+
+
+# ============================== CACHE ====================================
+
+
+class TranslationCache:
+    """
+    Persistent translation cache keyed by engine, languages and source text.
+    It's an append-only JSON lines file, so results are kept even if a run is interrupted.
+    A line left incomplete by an interrupted run is skipped, and cut off the end of the file
+    so the next entries start on their own line.
+    """
+
+    def __init__(self, cache_file_path: str) -> None:
+        self.cache_file_path = cache_file_path
+        self.entries = {}
+        if not os.path.exists(cache_file_path):
+            return
+
+        complete_length = 0
+        with open(cache_file_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                complete_length += len(line)
+                try:
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry["translation"]
+                except (ValueError, TypeError, KeyError):
+                    continue
+
+        if complete_length != os.path.getsize(cache_file_path):
+            with open(cache_file_path, "r+b") as fp:
+                fp.truncate(complete_length)
+
+    @staticmethod
+    def key(engine: str, source_language: str, target_language: str, text: str) -> str:
+        return hashlib.sha1(
+            f"{engine}\0{source_language}\0{target_language}\0{text}".encode("utf8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.entries.get(key)
+
+    def add_many(self, translations: dict) -> None:
+        """
+        Adds and saves `{key: translation}` entries.
+        Each entry is a single flushed write, so an interrupted run leaves at most one incomplete line.
+        """
+        self.entries.update(translations)
+        with open(self.cache_file_path, "ab") as fp:
+            for key, translation in translations.items():
+                fp.write(
+                    (
+                        json.dumps(
+                            {"key": key, "translation": translation}, ensure_ascii=False
+                        )
+                        + "\n"
+                    ).encode("utf8")
+                )
+                fp.flush()
+
+
+# ============================== STAGE ====================================
+
+
+def make_batches(texts: list[str], max_texts: int, max_chars: int) -> list[list[str]]:
+    """
+    Splits the texts into batches of at most `max_texts` texts and `max_chars` characters.
+    A text longer than `max_chars` gets a batch of its own.
+    """
+    batches = []
+    batch, batch_chars = [], 0
+    for text in texts:
+        if batch and (len(batch) >= max_texts or batch_chars + len(text) > max_chars):
+            batches.append(batch)
+            batch, batch_chars = [], 0
+        batch.append(text)
+        batch_chars += len(text)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def translate_with_retries(
+    backend: TranslationBackend,
+    batch: list[str],
+    source_language: str,
+    target_language: str,
+    max_retries: int,
+) -> list[str]:
+    """
+    Translates a batch, retrying with exponential backoff when the backend fails.
+    Transport errors (connection errors, timeouts...) of the backend are retried too.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            try:
+                translations = backend.translate_batch(
+                    batch, source_language, target_language
+                )
+            except OSError as e:
+                # Includes `TimeoutError`, `socket.timeout` and `urllib.error.URLError`
+                raise TranslationBackendError(f"{type(e).__name__}: {e}") from e
+            if len(translations) != len(batch):
+                raise TranslationBackendError(
+                    f"backend returned {len(translations)} translations for {len(batch)} texts"
+                )
+            return translations
+        except TranslationBackendError:
+            if attempt == max_retries:
+                raise
+            time.sleep(0.5 * 2**attempt)
+
+
+def pretranslate(
+    merged_translations_list: list[dict],
+    backend: TranslationBackend,
+    cache: TranslationCache,
+    source_language: str = ENGLISH_TAG,
+    target_language: str = SPANISH_TAG,
+    batch_max_texts: int = DEFAULT_BATCH_MAX_TEXTS,
+    batch_max_chars: int = DEFAULT_BATCH_MAX_CHARS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> dict:
+    """
+    Pre-fills the untranslated lines of `translations_merger` outputs, in place.
+    Source texts are deduplicated across all files, cached texts are never sent again,
+    and the rest are translated in batches by `concurrency` parallel workers.
+    Pre-filled lines get the `pretranslated` status. Returns the stage statistics.
+    """
+    # Imported here so json-exporter.py doesn't load it when not pre-translating
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    # Untranslated lines, grouped by their cache key
+    pending = {}
+    for merged_translations in merged_translations_list:
+        for texts in merged_translations["texts"].values():
+            for item in texts.values():
+                translations = item["translations"]
+                target = translations.get(target_language, {})
+                if target.get("status", "untranslated") != "untranslated":
+                    continue
+                source_text = translations.get(source_language, {}).get("text", "")
+                if source_text in MISSING_SOURCE_TEXTS:
+                    continue
+                key = cache.key(
+                    backend.name, source_language, target_language, source_text
+                )
+                pending.setdefault(key, (source_text, []))[1].append(item)
+
+    missing = {
+        key: source_text
+        for key, (source_text, _) in pending.items()
+        if cache.get(key) is None
+    }
+    batches = make_batches(list(missing.values()), batch_max_texts, batch_max_chars)
+    keys_by_text = {source_text: key for key, source_text in missing.items()}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(
+                translate_with_retries,
+                backend,
+                batch,
+                source_language,
+                target_language,
+                max_retries,
+            ): batch
+            for batch in batches
+        }
+        # Results are cached as soon as each batch is done
+        for future in as_completed(futures):
+            batch = futures[future]
+            cache.add_many(
+                {
+                    keys_by_text[source_text]: translation
+                    for source_text, translation in zip(batch, future.result())
+                }
+            )
+
+    line_count = 0
+    for key, (_, items) in pending.items():
+        for item in items:
+            item["translations"][target_language] = {
+                "text": cache.get(key),
+                "status": PRETRANSLATED_STATUS,
+            }
+            line_count += 1
+
+    return {
+        "lines": line_count,
+        "unique_texts": len(pending),
+        "cached_texts": len(pending) - len(missing),
+        "translated_texts": len(missing),
+        "requests": len(batches),
+    }
+
+
+# ================================ MAIN ======================================
+
+
+def main(
+    folder=None,
+    backend_spec="fake",
+    cache_file_path=None,
+    batch_max_texts=DEFAULT_BATCH_MAX_TEXTS,
+    batch_max_chars=DEFAULT_BATCH_MAX_CHARS,
+    concurrency=DEFAULT_CONCURRENCY,
+) -> int:
+    """
+    Pre-translates every Crowdin file of the folder, in place.
+    """
+    try:
+        file_paths = get_crowdin_files(folder)
+        merged_translations_list = []
+        for file_path in file_paths:
+            with open(file_path, "r", encoding="utf-8") as f:
+                merged_translations_list.append(json.load(f))
+
+        started = time.perf_counter()
+        stats = pretranslate(
+            merged_translations_list,
+            load_backend(backend_spec),
+            TranslationCache(cache_file_path or os.path.join(folder, CACHE_FILENAME)),
+            batch_max_texts=batch_max_texts,
+            batch_max_chars=batch_max_chars,
+            concurrency=concurrency,
+        )
+        elapsed = time.perf_counter() - started
+
+        for file_path, merged_translations in zip(file_paths, merged_translations_list):
+            with open(file_path, "wb") as fp:
+                fp.write(
+                    json.dumps(
+                        merged_translations, ensure_ascii=False, indent=2
+                    ).encode("utf8")
+                )
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(
+        f"{stats['lines']} lines pre-translated ({stats['unique_texts']} unique texts:"
+        f" {stats['cached_texts']} cached, {stats['translated_texts']} translated"
+        f" in {stats['requests']} requests) in {elapsed:.2f}s."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-fill untranslated es-ES lines of CROWDIN files with machine translation."
+    )
+    parser.add_argument(
+        "folder",
+        type=str,
+        help="Path to the folder containing .txt_crowdin.json files.",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="fake",
+        help="Registered backend name or `module:ClassName` (default: fake).",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        help=f"Path of the translation cache (default: <folder>/{CACHE_FILENAME}).",
+    )
+    parser.add_argument(
+        "--batch-max-texts",
+        type=int,
+        default=DEFAULT_BATCH_MAX_TEXTS,
+        help=f"Texts per request (default: {DEFAULT_BATCH_MAX_TEXTS}).",
+    )
+    parser.add_argument(
+        "--batch-max-chars",
+        type=int,
+        default=DEFAULT_BATCH_MAX_CHARS,
+        help=f"Characters per request (default: {DEFAULT_BATCH_MAX_CHARS}).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Parallel requests (default: {DEFAULT_CONCURRENCY}).",
+    )
+    args = parser.parse_args()
+
+    exit(
+        main(
+            args.folder,
+            args.backend,
+            args.cache_file,
+            args.batch_max_texts,
+            args.batch_max_chars,
+            args.concurrency,
+        )
+    )
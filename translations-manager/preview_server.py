@@ -0,0 +1,318 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Local HTTP server to read the game scenes as dialogue, with EN, JA and ES side by side
+# and the choices of selection scenes linked to their target scenes.
+# Scripts are loaded on demand, and recently viewed files are kept in an LRU cache.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import html, json, os, argparse, threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import quote, unquote
+
+from plamemo import (
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    SPANISH_TAG,
+    get_file_pairs,
+    get_output_file_name,
+    iter_file_records,
+    process_file_pair,
+)
+
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_MB = 64
+
+PAGE_STYLE = """
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; width: 100%; }
+td, th { border-bottom: 1px solid #ddd; padding: .3em .5em; vertical-align: top; text-align: left; }
+td.speaker { white-space: nowrap; font-weight: bold; }
+td.identifier { white-space: nowrap; color: #888; font-size: .8em; }
+.untranslated { color: #b00; }
+.pretranslated { color: #a60; }
+h2 { margin-top: 2em; }
+"""
+
+
+# ============================== CACHE ====================================
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with a memory cap, in bytes.
+    Entries are only valid while their `version` (e.g. the source files mtimes) doesn't change.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()  # key -> (version, value, size)
+        self.lock = threading.Lock()
+
+    def get_or_build(
+        self, key: str, version: tuple, build: Callable[[], bytes]
+    ) -> bytes:
+        """
+        Returns the cached value, or builds and caches it if missing or outdated.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                return entry[1]
+
+        # Built outside the lock, so other pages are served meanwhile
+        value = build()
+
+        with self.lock:
+            if key in self.entries:
+                self.used_bytes -= self.entries.pop(key)[2]
+            self.entries[key] = (version, value, len(value))
+            self.used_bytes += len(value)
+            # Least recently used first, but always keep the page just built
+            while self.used_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, _, size) = self.entries.popitem(last=False)
+                self.used_bytes -= size
+        return value
+
+
+def file_mtime(file_path: Optional[str]) -> Optional[int]:
+    try:
+        return os.stat(file_path).st_mtime_ns if file_path else None
+    except OSError:
+        return None
+
+
+# ============================== PAGES ====================================
+
+
+def render_page(title: str, body: str) -> bytes:
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title><style>{PAGE_STYLE}</style></head>"
+        f"<body>{body}</body></html>"
+    ).encode("utf8")
+
+
+def render_index(file_names: list[str]) -> bytes:
+    items = "".join(
+        f"<li><a href='/file/{quote(name)}'>{html.escape(name)}</a></li>"
+        for name in file_names
+    )
+    return render_page("Scenes preview", f"<h1>Scripts</h1><ul>{items}</ul>")
+
+
+def render_translation(translation: dict) -> str:
+    status = translation.get("status", "untranslated")
+    text = translation.get("text") or "(untranslated)"
+    return f"<span class='{html.escape(status)}'>{html.escape(text)}</span>"
+
+
+def load_downloaded_translations(translations_file_path: Optional[str]) -> dict:
+    """
+    Returns `{identifier: es-ES translation}` from a downloaded Crowdin file, if any.
+    """
+    if not translations_file_path or not os.path.exists(translations_file_path):
+        return {}
+    with open(translations_file_path, "r", encoding="utf-8") as f:
+        content = json.load(f)
+    return {
+        identifier: item.get("translations", {}).get(SPANISH_TAG, {})
+        for texts in content.get("texts", {}).values()
+        for identifier, item in texts.items()
+    }
+
+
+def render_file(file_pair: dict, translations_file_path: Optional[str]) -> bytes:
+    """
+    Renders every scene of a script as dialogue, with EN, JA and ES side by side.
+    """
+    translations_es = load_downloaded_translations(translations_file_path)
+    output_file_name = get_output_file_name(file_pair)
+
+    sections = []
+    rows = []
+    current_scene = None
+
+    def close_scene() -> None:
+        if current_scene is not None:
+            sections.append(
+                f"<h2 id='{html.escape(current_scene.scene_label)}'>"
+                f"{html.escape(current_scene.scene_title)}"
+                f" <small>({html.escape(current_scene.scene_label)})</small></h2>"
+                "<table><tr><th></th><th></th><th>EN</th><th>JA</th><th>ES</th></tr>"
+                + "".join(rows)
+                + "</table>"
+            )
+
+    for record in iter_file_records(process_file_pair(file_pair)):
+        if current_scene is None or record.scene_label != current_scene.scene_label:
+            close_scene()
+            rows = []
+            current_scene = record
+
+        if record.scene_type == "selection":
+            # Choices link to the scene they lead to
+            target = record.scene_target or "none"
+            speaker = (
+                f"<a href='#{html.escape(target)}'>choice &rarr; {html.escape(target)}</a>"
+                if target != "none"
+                else "choice"
+            )
+        else:
+            speaker = html.escape(
+                record.before_revealing_name or record.character or "voice-off"
+            )
+
+        translation_es = translations_es.get(
+            record.identifier, record.translations[SPANISH_TAG]
+        )
+        rows.append(
+            f"<tr><td class='identifier'>{html.escape(record.identifier)}</td>"
+            f"<td class='speaker'>{speaker}</td>"
+            f"<td>{html.escape(record.translations[ENGLISH_TAG]['text'])}</td>"
+            f"<td>{html.escape(record.translations[JAPANESE_TAG]['text'])}</td>"
+            f"<td>{render_translation(translation_es)}</td></tr>"
+        )
+    close_scene()
+
+    return render_page(
+        output_file_name,
+        f"<p><a href='/'>&larr; Scripts</a></p><h1>{html.escape(output_file_name)}</h1>"
+        + "".join(sections),
+    )
+
+
+# ============================== SERVER ====================================
+
+
+class PreviewServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple,
+        folder_en: str,
+        folder_ja: str,
+        translations_folder: Optional[str],
+        cache_bytes: int,
+    ) -> None:
+        super().__init__(address, PreviewRequestHandler)
+        self.folder_en = folder_en
+        self.folder_ja = folder_ja
+        self.translations_folder = translations_folder
+        self.cache = LRUCache(cache_bytes)
+
+    def file_pairs(self) -> dict:
+        """
+        Source file name -> file pair. Only lists the folders, nothing is parsed.
+        """
+        return {
+            os.path.basename(pair.get(ENGLISH_TAG) or pair.get(JAPANESE_TAG)): pair
+            for pair in get_file_pairs(self.folder_en, self.folder_ja)
+        }
+
+    def file_page(self, file_name: str) -> Optional[bytes]:
+        file_pair = self.file_pairs().get(file_name)
+        if file_pair is None:
+            return None
+
+        translations_file_path = (
+            os.path.join(self.translations_folder, get_output_file_name(file_pair))
+            if self.translations_folder
+            else None
+        )
+        # Re-parsed only when any of the files changes
+        version = (
+            file_mtime(file_pair.get(ENGLISH_TAG)),
+            file_mtime(file_pair.get(JAPANESE_TAG)),
+            file_mtime(translations_file_path),
+        )
+        return self.cache.get_or_build(
+            file_name, version, lambda: render_file(file_pair, translations_file_path)
+        )
+
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    server: PreviewServer
+
+    def do_GET(self) -> None:
+        path = unquote(self.path.split("?", 1)[0])
+        try:
+            if path == "/":
+                self.send_page(render_index(sorted(self.server.file_pairs())))
+            elif path.startswith("/file/"):
+                page = self.server.file_page(path[len("/file/") :])
+                if page is None:
+                    self.send_error(404, "Script not found")
+                else:
+                    self.send_page(page)
+            else:
+                self.send_error(404)
+        except Exception as e:
+            self.send_error(500, str(e))
+
+    def send_page(self, page: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+
+# ================================ MAIN ======================================
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve a local preview of the game scenes, with EN, JA and ES side by side."
+    )
+    parser.add_argument(
+        "--input-folder-en",
+        type=str,
+        required=True,
+        help="Path to the folder containing English JSON files.",
+    )
+    parser.add_argument(
+        "--input-folder-ja",
+        type=str,
+        required=True,
+        help="Path to the folder containing Japanese JSON files.",
+    )
+    parser.add_argument(
+        "--translations-folder",
+        type=str,
+        help="Path to the folder with .txt_crowdin.json files downloaded from Crowdin, for the ES texts.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on (default: {DEFAULT_PORT}).",
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=DEFAULT_CACHE_MB,
+        help=f"Memory for recently viewed scripts, in MB (default: {DEFAULT_CACHE_MB}).",
+    )
+    args = parser.parse_args()
+
+    server = PreviewServer(
+        ("127.0.0.1", args.port),
+        args.input_folder_en,
+        args.input_folder_ja,
+        args.translations_folder,
+        args.cache_mb * 1024 * 1024,
+    )
+    print(f"Serving the scenes preview at http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,320 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# This script reports the translation progress and the remaining workload of the
+# `.txt_crowdin.json` files, exported or downloaded from CROWDIN.
+# Files are read one at a time and only the counters are kept in memory.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import re, json, os, argparse
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from corpus_cache import CORPUS_CACHE_FILENAME, CorpusCache, open_corpus_cache
+from output_planner import BUNDLE_INDEX_FILENAME, load_bundle_index, source_scene
+from plamemo import (
+    CROWDIN_FILE_SUFFIX,
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    SPANISH_TAG,
+    get_crowdin_files,
+    label_value,
+)
+
+
+DONE_STATUSES = ("translated", "approved")
+
+# Route of a script, taken from its file name (e.g. `pm01` for `pm01_03.txt_crowdin.json`)
+DEFAULT_ROUTE_PATTERN = r"^([A-Za-z]+\d*)"
+
+GROUPS = ("character", "scene-title", "file", "route")
+
+
+# ============================== UTIL ====================================
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+# ============================== REPORT ====================================
+
+
+def new_workload() -> dict:
+    return {
+        "lines": 0,
+        "words": 0,
+        "characters": 0,
+        "remaining_lines": 0,
+        "remaining_words": 0,
+    }
+
+
+def build_report(
+    folder: str,
+    target_language: str = SPANISH_TAG,
+    route_pattern: str = DEFAULT_ROUTE_PATTERN,
+    corpus: Optional[CorpusCache] = None,
+) -> dict:
+    """
+    Aggregates the status counts per locale, and the source (EN) word and character counts
+    per character, scene title, file and route, with what's left to translate into `target_language`.
+    Scenes of bundles are counted in the script they were exported from (see `bundles-index.json`).
+    """
+    route_regex = re.compile(route_pattern)
+    scenes_index = load_bundle_index(os.path.join(folder, BUNDLE_INDEX_FILENAME))
+    statuses = defaultdict(Counter)
+    workload = {group: defaultdict(new_workload) for group in GROUPS}
+    totals = new_workload()
+    sections = {}
+
+    for file_path in get_crowdin_files(folder):
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+
+        for scene_label, texts in content.get("texts", {}).items():
+            file_name, source_scene_label = source_scene(
+                scenes_index, os.path.basename(file_path), scene_label
+            )
+            route_match = route_regex.match(file_name)
+            route = route_match.group(1) if route_match else "none"
+            # A bundle holds scenes of many scripts, each section is loaded once
+            if file_name not in sections:
+                sections[file_name] = (
+                    corpus.section(
+                        file_name.replace(CROWDIN_FILE_SUFFIX, ".txt.scn.m.json")
+                    )
+                    if corpus is not None
+                    else None
+                )
+            section = sections[file_name]
+
+            for identifier, item in texts.items():
+                translations = item.get("translations", {})
+                for lang, translation in translations.items():
+                    statuses[lang][translation.get("status", "untranslated")] += 1
+
+                # Files exported without labels don't carry the character nor the scene title
+                labels = item.get("labels", [])
+                # Lines whose texts differ from the cached ones are stale
+                line = (
+                    section.find(
+                        identifier,
+                        translations.get(ENGLISH_TAG, {}).get("text"),
+                        translations.get(JAPANESE_TAG, {}).get("text"),
+                    )
+                    if section is not None
+                    else None
+                )
+                character = (
+                    item.get("character")
+                    or label_value(labels, "character")
+                    or (line.character if line else None)
+                    or "none"
+                )
+                scene_title = (
+                    label_value(labels, "scene-title")
+                    or (line.scene_title if line else None)
+                    or source_scene_label
+                )
+
+                source_text = (
+                    translations.get(ENGLISH_TAG, {}).get("text")
+                    or item.get("text")
+                    or ""
+                )
+                words = count_words(source_text)
+                remaining = (
+                    translations.get(target_language, {}).get("status", "untranslated")
+                    not in DONE_STATUSES
+                )
+
+                for entry in (
+                    totals,
+                    workload["character"][character],
+                    workload["scene-title"][scene_title],
+                    workload["file"][file_name],
+                    workload["route"][route],
+                ):
+                    entry["lines"] += 1
+                    entry["words"] += words
+                    entry["characters"] += len(source_text)
+                    if remaining:
+                        entry["remaining_lines"] += 1
+                        entry["remaining_words"] += words
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "target_language": target_language,
+        "totals": totals,
+        "statuses": {lang: dict(counter) for lang, counter in sorted(statuses.items())},
+        "workload": {
+            group: dict(sorted(entries.items())) for group, entries in workload.items()
+        },
+    }
+
+
+def add_velocity(report: dict, previous_report: dict) -> None:
+    """
+    Adds the translated lines per day since the previous report, and the days left at that pace.
+    """
+    elapsed = datetime.fromisoformat(report["generated_at"]) - datetime.fromisoformat(
+        previous_report["generated_at"]
+    )
+    elapsed_days = max(elapsed.total_seconds() / 86400, 1 / 86400)
+
+    done_lines = (
+        previous_report["totals"]["remaining_lines"]
+        - report["totals"]["remaining_lines"]
+    )
+    done_words = (
+        previous_report["totals"]["remaining_words"]
+        - report["totals"]["remaining_words"]
+    )
+    lines_per_day = done_lines / elapsed_days
+
+    report["velocity"] = {
+        "since": previous_report["generated_at"],
+        "translated_lines": done_lines,
+        "translated_words": done_words,
+        "lines_per_day": round(lines_per_day, 2),
+        "words_per_day": round(done_words / elapsed_days, 2),
+        "days_left": (
+            round(report["totals"]["remaining_lines"] / lines_per_day, 1)
+            if lines_per_day > 0
+            else None
+        ),
+    }
+
+
+def print_table(report: dict, group: str, limit: int) -> None:
+    """
+    Prints the workload of a group, biggest remaining workload first.
+    """
+    rows = sorted(
+        report["workload"][group].items(),
+        key=lambda item: item[1]["remaining_words"],
+        reverse=True,
+    )[:limit]
+    name_width = max([len(group)] + [len(name) for name, _ in rows])
+
+    print(
+        f"\n{group.upper():<{name_width}}  {'LINES':>7}  {'WORDS':>8}  {'LEFT LINES':>10}  {'LEFT WORDS':>10}  {'DONE':>6}"
+    )
+    for name, entry in rows:
+        done = 1 - entry["remaining_lines"] / entry["lines"] if entry["lines"] else 1
+        print(
+            f"{name:<{name_width}}  {entry['lines']:>7}  {entry['words']:>8}"
+            f"  {entry['remaining_lines']:>10}  {entry['remaining_words']:>10}  {done:>6.1%}"
+        )
+
+
+# ================================ MAIN ======================================
+
+
+def main(
+    folder=None,
+    target_language=SPANISH_TAG,
+    route_pattern=DEFAULT_ROUTE_PATTERN,
+    previous_report_path=None,
+    output_report_path=None,
+    group="file",
+    limit=20,
+) -> int:
+    """
+    Builds the report, saves it as JSON if requested, and prints it as tables.
+    """
+    corpus_cache_path = os.path.join(folder, CORPUS_CACHE_FILENAME)
+    corpus = open_corpus_cache(corpus_cache_path)
+    try:
+        report = build_report(folder, target_language, route_pattern, corpus)
+    finally:
+        if corpus is not None:
+            corpus.close()
+
+    if previous_report_path:
+        with open(previous_report_path, "r", encoding="utf-8") as f:
+            add_velocity(report, json.load(f))
+
+    if output_report_path:
+        with open(output_report_path, "wb") as fp:
+            fp.write(json.dumps(report, ensure_ascii=False, indent=2).encode("utf8"))
+
+    print("STATUS PER LOCALE")
+    for lang, counter in report["statuses"].items():
+        counts = ", ".join(
+            f"{status}: {count}" for status, count in sorted(counter.items())
+        )
+        print(f"  {lang}: {counts}")
+
+    totals = report["totals"]
+    print(
+        f"\n{target_language}: {totals['remaining_lines']}/{totals['lines']} lines"
+        f" and {totals['remaining_words']}/{totals['words']} words left."
+    )
+
+    if "velocity" in report:
+        velocity = report["velocity"]
+        days_left = velocity["days_left"] if velocity["days_left"] is not None else "-"
+        print(
+            f"Since {velocity['since']}: {velocity['translated_lines']} lines"
+            f" ({velocity['lines_per_day']} lines/day), {days_left} days left at this pace."
+        )
+
+    for group_name in GROUPS if group == "all" else (group,):
+        print_table(report, group_name, limit)
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report the translation progress and remaining workload of CROWDIN files."
+    )
+    parser.add_argument(
+        "folder",
+        type=str,
+        help="Path to the folder containing .txt_crowdin.json files.",
+    )
+    parser.add_argument(
+        "--target-language",
+        type=str,
+        default=SPANISH_TAG,
+        help="Language being translated (default: es-ES).",
+    )
+    parser.add_argument(
+        "--route-pattern",
+        type=str,
+        default=DEFAULT_ROUTE_PATTERN,
+        help=f"Regex whose first group is the route of a file name (default: {DEFAULT_ROUTE_PATTERN}).",
+    )
+    parser.add_argument(
+        "--previous", type=str, help="Previous JSON report, to show the velocity."
+    )
+    parser.add_argument("--output", type=str, help="Save the report as JSON.")
+    parser.add_argument(
+        "--group",
+        choices=GROUPS + ("all",),
+        default="file",
+        help="Workload table to print (default: file).",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=20, help="Rows per table (default: 20)."
+    )
+    args = parser.parse_args()
+
+    exit(
+        main(
+            args.folder,
+            args.target_language,
+            args.route_pattern,
+            args.previous,
+            args.output,
+            args.group,
+            args.limit,
+        )
+    )
@@ -0,0 +1,619 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Quality checks of the translations, run by a single engine: every rule is evaluated over the
+# line records of a script in one pass, scripts are checked in parallel, and results are cached
+# per input hash and rule version so unchanged scripts aren't checked again.
+#
+# Custom rules subclass `Rule` in their own module, registered with `@register_rule`,
+# and are loaded with `--rules-module <module>`:
+#
+#     from qa_engine import WARNING, Rule, register_rule
+#
+#     @register_rule
+#     class ExclamationRule(Rule):
+#         code = "exclamation"
+#         severity = WARNING
+#
+#         def check_line(self, record):
+#             if record.text_en.endswith("!") and not record.translations["es-ES"]["text"].endswith("!"):
+#                 yield "the source ends with an exclamation mark"
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import json, os, argparse, hashlib, importlib
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from corpus_cache import source_hash
+from markup_checker import compare_markup
+from output_formats import iter_loaded_records
+from plamemo import (
+    CROWDIN_FILE_SUFFIX,
+    DEFAULT_CONTEXT_LINES,
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    MISSING_SOURCE_TEXTS,
+    SPANISH_TAG,
+    LineRecord,
+    get_file_pairs,
+    get_output_file_name,
+    iter_file_records,
+    process_file_pair,
+)
+from text_overflow_checker import TextWidthMeter, measure_overflow
+
+CACHE_FILENAME = ".qa-cache.json"
+CACHE_VERSION = 1
+
+ERROR = "error"
+WARNING = "warning"
+INFO = "info"
+# Most severe first
+SEVERITIES = (ERROR, WARNING, INFO)
+
+
+# ============================== RULES ====================================
+
+
+class Rule:
+    """
+    Base class of the QA rules. A new instance checks each script:
+    `check_line` is called for every line record in script order, then `finish_file`
+    for the checks that need the whole script. Both yield messages, or
+    `(record, message)` pairs for `finish_file`.
+    Bump `version` when the rule logic changes, so cached results are discarded.
+    """
+
+    code = "base"
+    version = 1
+    severity = WARNING
+    description = ""
+
+    def check_line(self, record: LineRecord) -> Iterable[str]:
+        return ()
+
+    def finish_file(self) -> Iterable[tuple]:
+        return ()
+
+
+# rule code -> rule class
+RULES = {}
+
+
+def register_rule(rule_class: type) -> type:
+    """
+    Class decorator that makes a rule available to the engine.
+    """
+    if rule_class.code in RULES and RULES[rule_class.code] is not rule_class:
+        raise Exception(f"QA rule already registered: {rule_class.code}")
+    RULES[rule_class.code] = rule_class
+    return rule_class
+
+
+def translation_of(record: LineRecord) -> Optional[str]:
+    """
+    The Spanish text of a line, or None if it's not translated yet.
+    """
+    target = record.translations.get(SPANISH_TAG, {})
+    if target.get("status", "untranslated") == "untranslated":
+        return None
+    return target.get("text") or None
+
+
+@register_rule
+class MarkupRule(Rule):
+    code = "markup"
+    # Bump it when `compare_markup` changes too
+    version = 2
+    severity = ERROR
+    description = (
+        "Translations keep the inline markup of the source (see markup_checker.py)."
+    )
+
+    def check_line(self, record: LineRecord) -> Iterable[str]:
+        translation = translation_of(record)
+        if translation is None or record.text_en in MISSING_SOURCE_TEXTS:
+            return
+        difference = compare_markup(record.text_en, translation)
+        if difference is not None:
+            yield (
+                f"missing {', '.join(difference['missing']) or 'nothing'},"
+                f" extra {', '.join(difference['extra']) or 'nothing'}"
+            )
+
+
+@register_rule
+class OverflowRule(Rule):
+    code = "overflow"
+    severity = WARNING
+    version = 2
+    description = "Translations fit in the text box (see text_overflow_checker.py)."
+
+    def __init__(self) -> None:
+        self.meter = TextWidthMeter()
+
+    def check_line(self, record: LineRecord) -> Iterable[str]:
+        translation = translation_of(record)
+        if translation is None:
+            return
+        overflow = measure_overflow(self.meter, translation)
+        if overflow is not None:
+            yield f"width {overflow['width']}, {overflow['rows']} rows"
+
+
+@register_rule
+class WhitespaceRule(Rule):
+    code = "whitespace"
+    severity = WARNING
+    description = "Translations keep the leading and trailing spaces of the source."
+
+    def check_line(self, record: LineRecord) -> Iterable[str]:
+        translation = translation_of(record)
+        if translation is None or record.text_en in MISSING_SOURCE_TEXTS:
+            return
+        source = record.text_en
+        if (source[: len(source) - len(source.lstrip())]) != (
+            translation[: len(translation) - len(translation.lstrip())]
+        ):
+            yield "leading spaces differ from the source"
+        if (source[len(source.rstrip()) :]) != (
+            translation[len(translation.rstrip()) :]
+        ):
+            yield "trailing spaces differ from the source"
+
+
+@register_rule
+class UntranslatedCopyRule(Rule):
+    code = "copy"
+    severity = INFO
+    description = "Translations that are a copy of the English source."
+
+    def check_line(self, record: LineRecord) -> Iterable[str]:
+        translation = translation_of(record)
+        if translation is not None and translation == record.text_en:
+            if any(char.isalpha() for char in translation):
+                yield "same text as the English source"
+
+
+@register_rule
+class PretranslatedRule(Rule):
+    code = "pretranslated"
+    severity = INFO
+    description = "Machine translations not reviewed yet (see pretranslator.py)."
+
+    def check_line(self, record: LineRecord) -> Iterable[str]:
+        if record.translations.get(SPANISH_TAG, {}).get("status") == "pretranslated":
+            yield "machine translation pending review"
+
+
+@register_rule
+class ConsistencyRule(Rule):
+    code = "consistency"
+    severity = WARNING
+    description = "Repeated English lines of a script get the same translation."
+
+    def __init__(self) -> None:
+        # English source -> {translation: first record}
+        self.translations = {}
+
+    def check_line(self, record: LineRecord) -> Iterable[str]:
+        translation = translation_of(record)
+        if translation is not None and record.text_en not in MISSING_SOURCE_TEXTS:
+            self.translations.setdefault(record.text_en, {}).setdefault(
+                translation, record
+            )
+        return ()
+
+    def finish_file(self) -> Iterable[tuple]:
+        for translations in self.translations.values():
+            if len(translations) < 2:
+                continue
+            identifiers = ", ".join(
+                record.identifier for record in translations.values()
+            )
+            for record in list(translations.values())[1:]:
+                yield record, f"translated differently in {identifiers}"
+
+
+def load_rule_modules(module_names: Iterable[str]) -> None:
+    """
+    Imports the modules of custom rules, which register them when imported.
+    """
+    for module_name in module_names:
+        importlib.import_module(module_name)
+
+
+def get_rule_classes(codes: Optional[list] = None) -> list[type]:
+    if codes is None:
+        return list(RULES.values())
+    unknown = [code for code in codes if code not in RULES]
+    if unknown:
+        raise Exception(f"Unknown QA rules: {', '.join(unknown)}")
+    return [RULES[code] for code in codes]
+
+
+def rules_fingerprint(rule_classes: list[type]) -> str:
+    """
+    Identifies the rules and their versions in the cache.
+    """
+    return ",".join(
+        sorted(f"{rule_class.code}@{rule_class.version}" for rule_class in rule_classes)
+    )
+
+
+# ============================== INPUTS ====================================
+
+
+class QaTask(NamedTuple):
+    name: str  # CROWDIN file name, e.g. `pm01_00.txt_crowdin.json`
+    file_pair: Optional[dict]  # EN/JA sources, extracted and merged
+    translations_path: Optional[str]  # CROWDIN file with the `es-ES` translations
+
+
+def get_tasks(
+    translations_folder: Optional[str] = None,
+    folder_en: Optional[str] = None,
+    folder_ja: Optional[str] = None,
+) -> list[QaTask]:
+    """
+    One task per script: the CROWDIN files of `translations_folder`, the EN/JA sources,
+    or the sources with the translations of the matching CROWDIN files.
+    """
+    translation_files = {}
+    if translations_folder:
+        translation_files = {
+            f: os.path.join(translations_folder, f)
+            for f in os.listdir(translations_folder)
+            if f.endswith(CROWDIN_FILE_SUFFIX)
+        }
+
+    if not (folder_en and folder_ja):
+        return [
+            QaTask(name, None, translation_files[name])
+            for name in sorted(translation_files)
+        ]
+
+    tasks = [
+        QaTask(
+            get_output_file_name(file_pair),
+            file_pair,
+            translation_files.get(get_output_file_name(file_pair)),
+        )
+        for file_pair in get_file_pairs(folder_en, folder_ja)
+    ]
+    return sorted(tasks, key=lambda task: task.name)
+
+
+def task_hash(task: QaTask, context_lines: int) -> str:
+    file_pair = task.file_pair or {}
+    return hashlib.sha1(
+        source_hash(
+            file_pair.get(ENGLISH_TAG),
+            file_pair.get(JAPANESE_TAG),
+            task.translations_path,
+        )
+        + str(context_lines).encode("utf8")
+    ).hexdigest()
+
+
+def load_translations(translations_path: str) -> dict:
+    with open(translations_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_task_records(task: QaTask, context_lines: int) -> Iterator[LineRecord]:
+    """
+    Line records of a task. The sources are parsed once, and the `es-ES` translations
+    of the CROWDIN file replace the empty ones of the merge.
+    """
+    if task.file_pair is None:
+        yield from iter_loaded_records(
+            load_translations(task.translations_path), task.name
+        )
+        return
+
+    translations = {}
+    if task.translations_path:
+        translations = {
+            identifier: item["translations"][SPANISH_TAG]
+            for texts in load_translations(task.translations_path)["texts"].values()
+            for identifier, item in texts.items()
+            if SPANISH_TAG in item.get("translations", {})
+        }
+
+    processed_file = process_file_pair(task.file_pair, context_lines=context_lines)
+    for record in iter_file_records(processed_file):
+        if record.identifier in translations:
+            record = record._replace(
+                translations={
+                    **record.translations,
+                    SPANISH_TAG: translations[record.identifier],
+                }
+            )
+        yield record
+
+
+# ============================== ENGINE ====================================
+
+
+def make_issue(rule_class: type, record: LineRecord, message: str) -> dict:
+    return {
+        "severity": rule_class.severity,
+        "code": rule_class.code,
+        "file": record.output_file_name,
+        "scene": record.scene_label,
+        "identifier": record.identifier,
+        "message": message,
+    }
+
+
+def check_task(
+    task: QaTask,
+    rule_codes: list[str],
+    rule_modules: list[str],
+    context_lines: int = DEFAULT_CONTEXT_LINES,
+) -> list[dict]:
+    """
+    Evaluates every rule over the records of a task, in a single pass.
+    Runs in the worker processes, which import the custom rule modules themselves.
+    """
+    load_rule_modules(rule_modules)
+    rule_classes = get_rule_classes(rule_codes)
+    rules = [rule_class() for rule_class in rule_classes]
+
+    issues = []
+    for record in iter_task_records(task, context_lines):
+        for rule in rules:
+            for message in rule.check_line(record):
+                issues.append(make_issue(type(rule), record, message))
+    for rule in rules:
+        for record, message in rule.finish_file():
+            issues.append(make_issue(type(rule), record, message))
+    return issues
+
+
+def load_cache(cache_file_path: str) -> dict:
+    """
+    Loads the previous results: `{file name: {"hash": ..., "issues": [...]}}`.
+    """
+    try:
+        with open(cache_file_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("files", {}) if cache.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(cache_file_path: str, files_cache: dict) -> None:
+    with open(cache_file_path, "wb") as fp:
+        fp.write(
+            json.dumps(
+                {"version": CACHE_VERSION, "files": files_cache}, ensure_ascii=False
+            ).encode("utf8")
+        )
+
+
+def run_qa(
+    tasks: list[QaTask],
+    rule_codes: Optional[list] = None,
+    rule_modules: Iterable[str] = (),
+    cache_file_path: Optional[str] = None,
+    jobs: Optional[int] = None,
+    context_lines: int = DEFAULT_CONTEXT_LINES,
+) -> tuple:
+    """
+    Checks the tasks with the given rules (default: all registered rules).
+    Tasks whose inputs and rules didn't change since the cached run keep their results,
+    the rest are checked in parallel, one task per worker process.
+    Returns the issues of every task, in task order, and the number of tasks checked.
+    """
+    rule_modules = list(rule_modules)
+    load_rule_modules(rule_modules)
+    rule_classes = get_rule_classes(rule_codes)
+    rule_codes = [rule_class.code for rule_class in rule_classes]
+    fingerprint = rules_fingerprint(rule_classes)
+
+    cache = load_cache(cache_file_path) if cache_file_path else {}
+    hashes = {}
+    results = {}
+    for task in tasks:
+        hashes[task.name] = task_hash(task, context_lines) + fingerprint
+        cached = cache.get(task.name)
+        if cached is not None and cached["hash"] == hashes[task.name]:
+            results[task.name] = cached["issues"]
+
+    pending = [task for task in tasks if task.name not in results]
+    arguments = (rule_codes, rule_modules, context_lines)
+    if jobs == 1 or len(pending) < 2:
+        for task in pending:
+            results[task.name] = check_task(task, *arguments)
+    else:
+        # Imported here, loading it would slow down `--help` and cached runs
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                task.name: executor.submit(check_task, task, *arguments)
+                for task in pending
+            }
+            for name, future in futures.items():
+                results[name] = future.result()
+
+    if cache_file_path:
+        save_cache(
+            cache_file_path,
+            {
+                task.name: {"hash": hashes[task.name], "issues": results[task.name]}
+                for task in tasks
+            },
+        )
+
+    issues = [entry for task in tasks for entry in results[task.name]]
+    return issues, len(pending)
+
+
+# ================================ MAIN ======================================
+
+
+def main(
+    translations_folder=None,
+    input_folder_path_en=None,
+    input_folder_path_ja=None,
+    rule_codes=None,
+    rule_modules=(),
+    min_severity=INFO,
+    cache_file_path=None,
+    jobs=None,
+    output_json=False,
+    use_cache=True,
+) -> int:
+    """
+    Runs the QA rules and prints the merged report. Returns the process exit code.
+    """
+    try:
+        if not translations_folder and not (
+            input_folder_path_en and input_folder_path_ja
+        ):
+            raise Exception(
+                "Provide a folder of CROWDIN files, the EN and JA source folders, or both."
+            )
+
+        tasks = get_tasks(
+            translations_folder, input_folder_path_en, input_folder_path_ja
+        )
+        # Without CROWDIN files, the cache goes next to the source folders,
+        # not inside them where it would be read as a script
+        if use_cache and not cache_file_path:
+            cache_file_path = os.path.join(
+                translations_folder
+                or os.path.dirname(os.path.abspath(input_folder_path_en)),
+                CACHE_FILENAME,
+            )
+
+        issues, checked_count = run_qa(
+            tasks,
+            rule_codes,
+            rule_modules,
+            cache_file_path if use_cache else None,
+            jobs,
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    # Severity filter, cached results keep every severity
+    shown_severities = SEVERITIES[: SEVERITIES.index(min_severity) + 1]
+    issues = [entry for entry in issues if entry["severity"] in shown_severities]
+    counts = {
+        severity: sum(1 for entry in issues if entry["severity"] == severity)
+        for severity in shown_severities
+    }
+
+    if output_json:
+        print(json.dumps({**counts, "issues": issues}, ensure_ascii=False, indent=2))
+    else:
+        for entry in issues:
+            location = ":".join(
+                v for v in (entry["file"], entry["scene"], entry["identifier"]) if v
+            )
+            print(
+                f"{entry['severity'].upper()} [{entry['code']}] {location}: {entry['message']}"
+            )
+        print(
+            f"\n{', '.join(f'{count} {severity}s' for severity, count in counts.items())}"
+            f" ({checked_count} files checked, {len(tasks) - checked_count} cached)."
+        )
+
+    return 1 if counts.get(ERROR) else 0
+
+
+def print_rules(rule_modules: list[str]) -> None:
+    load_rule_modules(rule_modules)
+    for rule_class in RULES.values():
+        print(
+            f"{rule_class.code:<15} {rule_class.severity:<8} v{rule_class.version}"
+            f"  {rule_class.description}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the QA rules over the translations, in parallel and with cached results."
+    )
+    parser.add_argument(
+        "folder",
+        type=str,
+        nargs="?",
+        help="Path to the folder containing .txt_crowdin.json files.",
+    )
+    parser.add_argument(
+        "--input-folder-en",
+        type=str,
+        help="Path to the folder containing English JSON files, to check the extracted lines.",
+    )
+    parser.add_argument(
+        "--input-folder-ja",
+        type=str,
+        help="Path to the folder containing Japanese JSON files, to check the extracted lines.",
+    )
+    parser.add_argument(
+        "--rule",
+        type=str,
+        action="append",
+        help="Rule to run (default: all). Can be repeated.",
+    )
+    parser.add_argument(
+        "--rules-module",
+        type=str,
+        action="append",
+        default=[],
+        help="Module with custom rules, imported before running. Can be repeated.",
+    )
+    parser.add_argument(
+        "--severity",
+        type=str,
+        choices=SEVERITIES,
+        default=INFO,
+        help="Lowest severity to report (default: info).",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        help=f"Path of the results cache (default: <folder>/{CACHE_FILENAME}, or next to the EN folder without a folder).",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Check every file again."
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="Number of worker processes (default: CPU count)."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument(
+        "--list-rules", action="store_true", help="List the available rules."
+    )
+    args = parser.parse_args()
+
+    # Run through the importable module, so custom rules registered
+    # with `import qa_engine` share its registry
+    import qa_engine
+
+    if args.list_rules:
+        qa_engine.print_rules(args.rules_module)
+        exit(0)
+
+    exit(
+        qa_engine.main(
+            args.folder,
+            args.input_folder_en,
+            args.input_folder_ja,
+            args.rule,
+            args.rules_module,
+            args.severity,
+            args.cache_file,
+            args.jobs,
+            args.json,
+            not args.no_cache,
+        )
+    )
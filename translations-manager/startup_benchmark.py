@@ -0,0 +1,188 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Startup time benchmark of cli.py, to catch regressions like a tool imported at the top of
+# the CLI or a slow module imported by every tool. It also runs `cli.py validate` over several
+# files, which starts worker processes through the CLI dispatch. Exits with an error when a limit
+# is exceeded or the run fails, so it can guard CI runs:
+#
+#     python cli.py benchmark [--max-overhead-ms 50]
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import os, sys, argparse, json, statistics, subprocess, tempfile, time
+
+from plamemo import CROWDIN_FILE_SUFFIX, ENGLISH_TAG, JAPANESE_TAG, SPANISH_TAG
+
+CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+
+DEFAULT_RUNS = 10
+DEFAULT_MAX_OVERHEAD_MS = 50
+# Commands whose `--help` is measured too: they load the tool and its imports
+DEFAULT_COMMANDS = ["export", "validate", "report"]
+# Files of the `cli.py validate` run, more than one so they're checked in worker processes
+VALIDATE_FILE_COUNT = 4
+
+
+# ============================== UTIL ====================================
+
+
+def measure(command: list[str], runs: int) -> float:
+    """
+    Median wall time of the command, in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def imported_modules(command: list[str]) -> list[str]:
+    """
+    Top-level modules imported by a Python command, from `-X importtime`.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *command],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1]
+            # Nested imports are indented
+            if not name.startswith("  "):
+                modules.append(name.strip())
+    return modules
+
+
+def write_crowdin_files(folder: str, file_count: int) -> None:
+    """
+    Writes small valid Crowdin files to the folder.
+    """
+    for number in range(file_count):
+        file_title = f"pm{number:02d}_00"
+        item = {
+            "text": "Good morning.",
+            "labels": ["scene-label:start"],
+            "translations": {
+                JAPANESE_TAG: {"text": "おはよう。", "status": "approved"},
+                ENGLISH_TAG: {"text": "Good morning.", "status": "approved"},
+                SPANISH_TAG: {"text": "", "status": "untranslated"},
+            },
+            "context": "",
+        }
+        with open(
+            os.path.join(folder, f"{file_title}{CROWDIN_FILE_SUFFIX}"), "wb"
+        ) as fp:
+            fp.write(
+                json.dumps(
+                    {"texts": {"start": {f"{file_title}-start.00": item}}},
+                    ensure_ascii=False,
+                ).encode("utf8")
+            )
+
+
+# ================================ MAIN ======================================
+
+
+def main(
+    runs=DEFAULT_RUNS,
+    max_overhead_ms=DEFAULT_MAX_OVERHEAD_MS,
+    commands=None,
+) -> int:
+    """
+    Compares the time of `cli.py --help` with a bare interpreter start, checks that
+    the top-level help doesn't import any tool, and that `cli.py validate` runs over several files.
+    """
+    # The tools registry is the list of what must not be imported
+    sys.path.insert(0, os.path.dirname(CLI_PATH))
+    import cli
+
+    failures = []
+
+    tool_modules = {module for module, _, _ in cli.COMMANDS.values()}
+    leaked_modules = sorted(
+        tool_modules.intersection(imported_modules([CLI_PATH, "--help"]))
+    )
+    if leaked_modules:
+        failures.append(f"`cli.py --help` imports {', '.join(leaked_modules)}")
+
+    baseline = measure([sys.executable, "-c", "pass"], runs)
+    print(f"{'python -c pass':<28} {baseline:8.1f} ms")
+
+    help_time = measure([sys.executable, CLI_PATH, "--help"], runs)
+    print(
+        f"{'cli.py --help':<28} {help_time:8.1f} ms  (+{help_time - baseline:.1f} ms)"
+    )
+    if help_time - baseline > max_overhead_ms:
+        failures.append(
+            f"`cli.py --help` takes {help_time - baseline:.1f} ms over the interpreter start"
+            f" (limit: {max_overhead_ms} ms)"
+        )
+
+    # Informative: the cost of loading each tool
+    for command in commands if commands is not None else DEFAULT_COMMANDS:
+        command_time = measure([sys.executable, CLI_PATH, command, "--help"], runs)
+        print(
+            f"{'cli.py ' + command + ' --help':<28} {command_time:8.1f} ms"
+            f"  (+{command_time - baseline:.1f} ms)"
+        )
+
+    # The dispatch must run tools that use process pools
+    with tempfile.TemporaryDirectory() as folder:
+        write_crowdin_files(folder, VALIDATE_FILE_COUNT)
+        command = [sys.executable, CLI_PATH, "validate", folder, "--jobs", "2"]
+        started = time.perf_counter()
+        result = subprocess.run(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        validate_time = (time.perf_counter() - started) * 1000
+    print(f"{'cli.py validate <folder>':<28} {validate_time:8.1f} ms")
+    if result.returncode != 0:
+        last_error_line = (result.stderr.strip().splitlines() or [""])[-1]
+        failures.append(
+            f"`cli.py validate` failed over {VALIDATE_FILE_COUNT} files: {last_error_line}"
+        )
+
+    for failure in failures:
+        print(f"Error: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the startup time of cli.py and fail on regressions."
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS,
+        help=f"Runs per measure, the median is kept (default: {DEFAULT_RUNS}).",
+    )
+    parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        default=DEFAULT_MAX_OVERHEAD_MS,
+        help=f"Maximum time of `cli.py --help` over a bare interpreter start (default: {DEFAULT_MAX_OVERHEAD_MS}).",
+    )
+    parser.add_argument(
+        "--command",
+        type=str,
+        action="append",
+        help=f"Subcommand whose `--help` is also measured. Can be repeated (default: {', '.join(DEFAULT_COMMANDS)}).",
+    )
+    args = parser.parse_args()
+
+    sys.exit(main(args.runs, args.max_overhead_ms, args.command))
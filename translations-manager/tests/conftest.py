@@ -0,0 +1,104 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# Shared fixtures: small EN/JA game scripts written to a temporary folder,
+# and the translations manager folder on the import path (the tools are plain scripts).
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import importlib.util, json, os, sys
+
+import pytest
+
+TOOLS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOLS_FOLDER)
+
+
+def load_script(file_name: str):
+    """
+    Imports a tool whose file name isn't a valid module name, e.g. `json-exporter.py`.
+    The path is relative to the translations manager folder.
+    """
+    spec = importlib.util.spec_from_file_location(
+        os.path.basename(file_name).replace("-", "_")[:-3],
+        os.path.join(TOOLS_FOLDER, file_name),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_script(language: str, name: str) -> dict:
+    """
+    A script with default scenes, a temporary character name and a selection.
+    """
+
+    def text(en: str, ja: str) -> str:
+        return en if language == "en" else ja
+
+    return {
+        "name": name,
+        "scenes": [
+            {
+                "label": "*start",
+                "title": text("Morning", "朝"),
+                "texts": [
+                    [
+                        "Tsukasa",
+                        None,
+                        text("Good morning![r]How are you?", "おはよう！[r]元気？"),
+                    ],
+                    ["Isla", "Girl", text("I'm fine, Tsukasa.", "元気です、ツカサ。")],
+                    [None, None, text("The wind blows.", "風が吹く。")],
+                ],
+            },
+            {
+                "label": "*choice",
+                "title": text("Choice", "選択"),
+                "selects": [
+                    {"target": "*a", "text": text("Go left", "左へ")},
+                    {"target": "*b", "text": text("Go right", "右へ")},
+                ],
+            },
+            {
+                "label": "*a",
+                "title": text("Left", "左"),
+                "texts": [["Isla", None, text("Left it is.", "左ね。")]],
+            },
+        ],
+    }
+
+
+SCRIPT_NAMES = ("pm01_00.txt", "pm01_01.txt")
+
+
+@pytest.fixture
+def script_folders(tmp_path) -> tuple:
+    """
+    EN and JA folders with the same scripts. Returns `(folder_en, folder_ja)`.
+    """
+    folders = []
+    for language in ("en", "ja"):
+        folder = tmp_path / language
+        folder.mkdir()
+        for name in SCRIPT_NAMES:
+            with open(folder / f"{name}.scn.m.json", "w", encoding="utf-8") as f:
+                json.dump(make_script(language, name), f, ensure_ascii=False)
+        folders.append(str(folder))
+    return tuple(folders)
+
+
+@pytest.fixture
+def json_exporter():
+    return load_script("json-exporter.py")
+
+
+@pytest.fixture
+def exported_folder(tmp_path, script_folders, json_exporter) -> str:
+    """
+    Output folder of a default export of `script_folders`.
+    """
+    output_folder = tmp_path / "out"
+    output_folder.mkdir()
+    json_exporter.main(*script_folders, str(output_folder))
+    return str(output_folder)
@@ -0,0 +1,45 @@
+import os, subprocess, sys
+
+import pytest
+
+from conftest import TOOLS_FOLDER
+from crowdin_validator import get_crowdin_files
+
+CLI_PATH = os.path.join(TOOLS_FOLDER, "cli.py")
+
+
+def run_cli(*arguments) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, CLI_PATH, *arguments],
+        capture_output=True,
+        text=True,
+        cwd=TOOLS_FOLDER,
+    )
+
+
+def test_help_lists_the_commands():
+    result = run_cli("--help")
+    assert result.returncode == 0
+    assert "validate" in result.stdout
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_validate_several_files(exported_folder, jobs):
+    file_paths = get_crowdin_files(exported_folder)
+    assert len(file_paths) > 1
+
+    result = run_cli("validate", exported_folder, "--jobs", jobs)
+    assert result.returncode == 0, result.stderr
+    assert "0 errors, 0 warnings." in result.stdout
+
+
+def test_qa_several_files(exported_folder):
+    result = run_cli("qa", exported_folder, "--jobs", "2", "--no-cache")
+    assert "Traceback" not in result.stderr
+    assert "2 files checked" in result.stdout
+
+
+def test_unknown_command():
+    result = run_cli("unknown")
+    assert result.returncode == 1
+    assert "unknown command" in result.stdout
@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+from corpus_cache import (
+    CORPUS_CACHE_FILENAME,
+    CorpusCache,
+    CorpusCacheError,
+    CorpusCacheWriter,
+    CorpusLine,
+    open_corpus_cache,
+    source_hash,
+)
+
+
+def make_line(identifier: str, text: str = "text") -> CorpusLine:
+    return CorpusLine(identifier, "Isla", "start", "Morning", text, "テキスト")
+
+
+def test_write_and_read_sections(tmp_path):
+    writer = CorpusCacheWriter()
+    # Added out of order, sections are sorted by file name
+    writer.add_file("b.txt.scn.m.json", b"b" * 20, [make_line("b-start.00")])
+    writer.add_file(
+        "a.txt.scn.m.json",
+        b"a" * 20,
+        [make_line("a-start.00", "first"), make_line("a-start.01", "second")],
+    )
+    cache_path = str(tmp_path / CORPUS_CACHE_FILENAME)
+    writer.write(cache_path)
+
+    with CorpusCache(cache_path) as cache:
+        assert cache.files() == ["a.txt.scn.m.json", "b.txt.scn.m.json"]
+        section = cache.section("a.txt.scn.m.json")
+        assert len(section) == 2
+        assert section[1].text_en == "second"
+        assert section.find("a-start.01").text_ja == "テキスト"
+        assert section.find("a-start.99") is None
+        assert [line.identifier for line in cache] == [
+            "a-start.00",
+            "a-start.01",
+            "b-start.00",
+        ]
+
+
+def test_stale_sections_are_not_returned(tmp_path):
+    writer = CorpusCacheWriter()
+    writer.add_file("a.txt.scn.m.json", b"a" * 20, [make_line("a-start.00")])
+    cache_path = str(tmp_path / CORPUS_CACHE_FILENAME)
+    writer.write(cache_path)
+
+    with CorpusCache(cache_path) as cache:
+        assert cache.is_fresh("a.txt.scn.m.json", b"a" * 20)
+        assert cache.section("a.txt.scn.m.json", b"x" * 20) is None
+
+
+def test_lines_with_other_texts_are_stale(tmp_path):
+    writer = CorpusCacheWriter()
+    writer.add_file("a.txt.scn.m.json", b"a" * 20, [make_line("a-start.00", "old")])
+    cache_path = str(tmp_path / CORPUS_CACHE_FILENAME)
+    writer.write(cache_path)
+
+    with CorpusCache(cache_path) as cache:
+        section = cache.section("a.txt.scn.m.json")
+        assert section.find("a-start.00", "old", "テキスト") is not None
+        assert section.find("a-start.00", "new", "テキスト") is None
+        assert section.find("a-start.00", "old", "新しい") is None
+
+
+def test_failed_write_removes_the_temporary_file(tmp_path, monkeypatch):
+    writer = CorpusCacheWriter()
+    writer.add_file("a.txt.scn.m.json", b"a" * 20, [make_line("a-start.00")])
+
+    def fail_replace(source, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        writer.write(str(tmp_path / CORPUS_CACHE_FILENAME))
+    assert os.listdir(tmp_path) == []
+
+
+def test_unreadable_cache_is_ignored(tmp_path, capsys):
+    cache_path = tmp_path / CORPUS_CACHE_FILENAME
+    assert open_corpus_cache(str(cache_path)) is None
+
+    cache_path.write_bytes(b"not a cache")
+    assert open_corpus_cache(str(cache_path)) is None
+    assert "Warning" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("size", [0, 3, 12, 40, -10])
+def test_truncated_cache_raises_corpus_cache_error(tmp_path, size):
+    writer = CorpusCacheWriter()
+    writer.add_file("a.txt.scn.m.json", b"a" * 20, [make_line("a-start.00")])
+    cache_path = str(tmp_path / CORPUS_CACHE_FILENAME)
+    writer.write(cache_path)
+
+    with open(cache_path, "rb") as f:
+        data = f.read()
+    with open(cache_path, "wb") as fp:
+        fp.write(data[:size])
+
+    with pytest.raises(CorpusCacheError):
+        CorpusCache(cache_path)
+
+
+def test_source_hash_tells_missing_counterparts_apart(tmp_path):
+    file_path = tmp_path / "a.json"
+    file_path.write_text("{}")
+    assert source_hash(str(file_path), None) != source_hash(None, str(file_path))
+
+
+def test_exporter_writes_the_corpus_cache(exported_folder):
+    with CorpusCache(os.path.join(exported_folder, CORPUS_CACHE_FILENAME)) as cache:
+        assert cache.files() == ["pm01_00.txt.scn.m.json", "pm01_01.txt.scn.m.json"]
+        line = cache.section("pm01_00.txt.scn.m.json").find("pm01_00-start.01")
+        assert (line.character, line.text_en) == ("Isla", "I'm fine, Tsukasa.")
+
+
+def test_overflow_checker_runs_with_a_corrupt_cache(exported_folder):
+    import text_overflow_checker
+
+    with open(os.path.join(exported_folder, CORPUS_CACHE_FILENAME), "r+b") as fp:
+        fp.truncate(10)
+    assert text_overflow_checker.main(exported_folder) == 0
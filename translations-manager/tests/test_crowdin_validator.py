@@ -0,0 +1,71 @@
+import json, os
+
+from crowdin_validator import (
+    ERROR,
+    get_crowdin_files,
+    validate_file,
+    validate_folder,
+    validate_item,
+)
+
+
+def codes(issues: list) -> list:
+    return [entry["code"] for entry in issues]
+
+
+def make_item(**changes) -> dict:
+    item = {
+        "text": "Hello",
+        "labels": ["scene-label:start"],
+        "translations": {
+            "ja": {"text": "こんにちは", "status": "approved"},
+            "es-ES": {"text": "", "status": "untranslated"},
+        },
+    }
+    item.update(changes)
+    return item
+
+
+def test_valid_item_has_no_issues():
+    assert validate_item(make_item(), "pm01_00-start.00", "start", "a.json") == []
+
+
+def test_scene_label_must_match_its_scene():
+    issues = validate_item(make_item(), "pm01_00-start.00", "other", "a.json")
+    assert codes(issues) == ["wrong-scene-label"]
+
+
+def test_item_errors():
+    item = make_item(labels=None, translations={"es-ES": {"text": 1, "status": "x"}})
+    del item["labels"]
+    issues = validate_item(item, "pm01_00-start.00", "start", "a.json")
+    assert codes(issues) == [
+        "missing-labels",
+        "invalid-translation-text",
+        "invalid-status",
+    ]
+    assert all(entry["severity"] == ERROR for entry in issues)
+
+
+def test_duplicated_identifiers_across_scenes(tmp_path):
+    file_path = tmp_path / "pm01_00.txt_crowdin.json"
+    item = make_item()
+    file_path.write_text(
+        json.dumps({"texts": {"start": {"x": item}, "a": {"x": item}}}),
+        encoding="utf-8",
+    )
+    assert "duplicated-identifier" in codes(validate_file(str(file_path)))
+
+
+def test_exported_files_pass(exported_folder):
+    serial = validate_folder(exported_folder, jobs=1)
+    parallel = validate_folder(exported_folder, jobs=2)
+    assert serial == parallel == []
+    assert len(get_crowdin_files(exported_folder)) == 2
+
+
+def test_invalid_json(tmp_path):
+    file_path = tmp_path / "pm01_00.txt_crowdin.json"
+    file_path.write_text("{", encoding="utf-8")
+    assert codes(validate_folder(str(tmp_path))) == ["invalid-json"]
+    assert os.path.basename(get_crowdin_files(str(tmp_path))[0]) == file_path.name
@@ -0,0 +1,118 @@
+import json, os, subprocess, sys
+
+import pytest
+
+from conftest import TOOLS_FOLDER
+from export_archive import (
+    ArchiveReader,
+    ArchiveWriter,
+    ExportArchiveError,
+    diff_archives,
+    extract_archive,
+)
+
+
+def export_archive_with_hash_seed(script_folders, archive_path, hash_seed: str):
+    subprocess.run(
+        [
+            sys.executable,
+            os.path.join(TOOLS_FOLDER, "json-exporter.py"),
+            "--input-folder-en",
+            script_folders[0],
+            "--input-folder-ja",
+            script_folders[1],
+            "--archive",
+            archive_path,
+            "--no-corpus-cache",
+        ],
+        env={**os.environ, "PYTHONHASHSEED": hash_seed},
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    with open(archive_path, "rb") as fp:
+        return fp.read()
+
+
+def test_archive_matches_the_folder_export(
+    tmp_path, script_folders, exported_folder, json_exporter
+):
+    archive_path = str(tmp_path / "export.pmarchive")
+    json_exporter.main(*script_folders, archive_path=archive_path)
+
+    extracted_folder = tmp_path / "extracted"
+    extracted_folder.mkdir()
+    names = extract_archive(archive_path, str(extracted_folder))
+    assert names == ["pm01_00.txt_crowdin.json", "pm01_01.txt_crowdin.json"]
+    for name in names:
+        assert (extracted_folder / name).read_bytes() == open(
+            os.path.join(exported_folder, name), "rb"
+        ).read()
+
+
+def test_export_is_deterministic(tmp_path, script_folders):
+    archives = [
+        export_archive_with_hash_seed(
+            script_folders, str(tmp_path / f"{seed}.pmarchive"), seed
+        )
+        for seed in ("1", "2", "3")
+    ]
+    assert archives[0] == archives[1] == archives[2]
+
+
+def test_diff_archives(tmp_path):
+    def write(archive_path, files):
+        with ArchiveWriter(archive_path) as writer:
+            for name, content in files.items():
+                writer.add(name, json.dumps(content).encode("utf8"))
+
+    item = {"text": "Hi", "translations": {}}
+    old_path, new_path = str(tmp_path / "old"), str(tmp_path / "new")
+    write(old_path, {"a": {"texts": {"s": {"x": item, "y": item}}}, "b": {}})
+    write(new_path, {"a": {"texts": {"s": {"x": {**item, "text": "Ho"}}}}, "c": {}})
+
+    assert diff_archives(old_path, new_path) == {
+        "added": ["c"],
+        "removed": ["b"],
+        "changed": {"a": {"added": [], "removed": ["y"], "changed": ["x"]}},
+    }
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    archive_path = str(tmp_path / "export.pmarchive")
+    with pytest.raises(ExportArchiveError):
+        with ArchiveWriter(archive_path) as writer:
+            writer.add("a", b"{}")
+            writer.add("a", b"{}")
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("size", [3, -5])
+def test_truncated_archive(tmp_path, size):
+    archive_path = str(tmp_path / "export.pmarchive")
+    with ArchiveWriter(archive_path) as writer:
+        writer.add("pm01_00.txt_crowdin.json", b"{}")
+    with open(archive_path, "rb") as fp:
+        data = fp.read()
+    with open(archive_path, "wb") as fp:
+        fp.write(data[:size])
+
+    with pytest.raises(ExportArchiveError):
+        ArchiveReader(archive_path)
+
+
+def test_failed_export_leaves_no_temporary_archive(
+    tmp_path, script_folders, json_exporter, monkeypatch
+):
+    def fail(merged_translations):
+        raise ValueError("serialization failed")
+
+    monkeypatch.setattr(json_exporter.export_archive, "serialize", fail)
+    archive_folder = tmp_path / "archive"
+    archive_folder.mkdir()
+    with pytest.raises(SystemExit):
+        json_exporter.main(
+            *script_folders,
+            archive_path=str(archive_folder / "export.pmarchive"),
+            write_corpus_cache=False,
+        )
+    assert os.listdir(archive_folder) == []
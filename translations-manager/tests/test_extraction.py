@@ -0,0 +1,57 @@
+from plamemo import CONTEXT_MAX_LENGTH, build_dialogue_contexts, extract_translations
+
+from conftest import make_script
+
+LINES = [f"Isla: line {i}" for i in range(6)]
+
+
+def test_window_at_scene_edges():
+    contexts = build_dialogue_contexts(LINES, 2)
+    assert contexts[0] == "> Isla: line 0\nIsla: line 1\nIsla: line 2"
+    assert contexts[3] == (
+        "Isla: line 1\nIsla: line 2\n> Isla: line 3\nIsla: line 4\nIsla: line 5"
+    )
+    assert contexts[5] == "Isla: line 3\nIsla: line 4\n> Isla: line 5"
+
+
+def test_single_line_scene():
+    assert build_dialogue_contexts(["Isla: hi"], 3) == ["> Isla: hi"]
+
+
+def test_chosen_option_comes_first():
+    contexts = build_dialogue_contexts(LINES[:2], 1, choice="Go left")
+    assert contexts == [
+        'Chosen option: "Go left"\n> Isla: line 0\nIsla: line 1',
+        'Chosen option: "Go left"\nIsla: line 0\n> Isla: line 1',
+    ]
+
+
+def test_long_contexts_keep_the_current_line():
+    lines = [f"Isla: {i}" + "a" * 500 for i in range(9)]
+    contexts = build_dialogue_contexts(lines, 4, choice="Go left")
+
+    for i, context in enumerate(contexts):
+        assert len(context) <= CONTEXT_MAX_LENGTH
+        assert "> " + lines[i] in context.split("\n")
+    # The farthest lines are dropped first
+    assert contexts[4].split("\n") == [
+        'Chosen option: "Go left"',
+        lines[3],
+        "> " + lines[4],
+        lines[5],
+    ]
+    assert contexts[8].split("\n") == ['Chosen option: "Go left"'] + lines[6:8] + [
+        "> " + lines[8]
+    ]
+
+
+def test_choice_targets_in_contexts():
+    texts = extract_translations(make_script("en", "pm01_00.txt"))["texts"]
+    assert texts["choice"]["pm01_00-choice.01"]["context"] == (
+        "Options:\n  Go left (-> a)\n> Go right (-> b)"
+    )
+    # The scene a choice leads to shows that choice
+    assert texts["a"]["pm01_00-a.00"]["context"] == (
+        'Chosen option: "Go left"\n> Isla: Left it is.'
+    )
+    assert "Chosen option" not in texts["start"]["pm01_00-start.00"]["context"]
@@ -0,0 +1,78 @@
+from glossary_checker import GlossaryChecker, TermMatcher
+
+
+def test_overlapping_terms_are_all_found():
+    matcher = TermMatcher({"he": 1, "she": 2, "his": 3, "hers": 4})
+    assert sorted(matcher.find("ushers")) == []
+    assert sorted(matcher.find("u she hers")) == [(2, 5, 2), (6, 10, 4)]
+
+
+def test_suffix_terms_through_failure_links():
+    matcher = TermMatcher({"giftia": "g", "tia": "t", "ia": "i"})
+    # only whole words: "ia" and "tia" are inside "giftia"
+    assert list(matcher.find("A Giftia.")) == [(2, 8, "g")]
+    assert list(matcher.find("tia, ia")) == [(0, 3, "t"), (5, 7, "i")]
+
+
+def test_case_insensitive_whole_words():
+    matcher = TermMatcher({"Eru": 0})
+    assert list(matcher.find("ERU and eru")) == [(0, 3, 0), (8, 11, 0)]
+    assert list(matcher.find("Eruption")) == []
+
+
+def test_cjk_terms_match_anywhere():
+    matcher = TermMatcher({"アイラ": 0})
+    assert list(matcher.find("これはアイラです")) == [(3, 6, 0)]
+
+
+def test_length_changing_casefold():
+    matcher = TermMatcher({"Isla": 0})
+    assert list(matcher.find("Straße Isla")) == [(7, 11, 0)]
+
+
+def test_terms_with_length_changing_casefold():
+    matcher = TermMatcher({"Straße": 0, "STRASSE": 1, "s": 2})
+    # Spans are positions of the original text, "s" doesn't match inside "ß"
+    assert sorted(matcher.find("Die straße, STRASSE")) == [
+        (4, 10, 0),
+        (4, 10, 1),
+        (12, 19, 0),
+        (12, 19, 1),
+    ]
+    assert list(matcher.find("groß s")) == [(5, 6, 2)]
+
+
+def test_glossary_checker():
+    checker = GlossaryChecker(
+        [
+            {
+                "en": ["Isla"],
+                "ja": ["アイラ"],
+                "es-ES": ["Isla"],
+                "forbidden": ["Aila"],
+            },
+            {"en": ["Giftia"], "ja": [], "es-ES": ["Giftia"], "forbidden": []},
+        ]
+    )
+    assert checker.check("Isla is a Giftia.", "", "Isla es una Giftia.") == []
+    assert [issue["kind"] for issue in checker.check("", "アイラ", "Aila")] == [
+        "misused",
+        "missing",
+    ]
+
+
+def test_terms_in_several_entries():
+    checker = GlossaryChecker(
+        [
+            {"en": ["Michiru"], "ja": [], "es-ES": ["Michiru"], "forbidden": []},
+            {"en": ["Michiru"], "ja": [], "es-ES": ["Mich"], "forbidden": ["Michi"]},
+        ]
+    )
+    issues = checker.check("Michiru!", "", "¡Michi!")
+    assert sorted(issue["term"] for issue in issues if issue["kind"] == "missing") == [
+        ["Mich"],
+        ["Michiru"],
+    ]
+    assert [issue["found"] for issue in issues if issue["kind"] == "misused"] == [
+        "Michi"
+    ]
@@ -0,0 +1,84 @@
+import os, queue, threading
+
+import pytest
+
+from conftest import load_script
+
+
+@pytest.fixture
+def gui_exporter():
+    return load_script(os.path.join("TODO-gui-version", "json-exporter-with-gui.py"))
+
+
+@pytest.fixture
+def output_folder(tmp_path) -> str:
+    folder = tmp_path / "out"
+    folder.mkdir()
+    return str(folder)
+
+
+def drain(progress_queue: queue.Queue) -> list:
+    messages = []
+    while not progress_queue.empty():
+        messages.append(progress_queue.get_nowait())
+    return messages
+
+
+def test_export_worker_reports_progress(output_folder, script_folders, gui_exporter):
+    file_pairs = sorted(
+        gui_exporter.get_file_pairs(*script_folders), key=lambda pair: pair["en"]
+    )
+    progress_queue = queue.Queue()
+    gui_exporter.export_worker(
+        file_pairs, output_folder, progress_queue, threading.Event()
+    )
+
+    assert drain(progress_queue) == [
+        ("progress", 1, 2, "pm01_00.txt.scn.m.json"),
+        ("progress", 2, 2, "pm01_01.txt.scn.m.json"),
+        ("done", 2, 2),
+    ]
+    assert sorted(f for f in os.listdir(output_folder) if f.endswith(".json")) == [
+        "pm01_00.txt_crowdin.json",
+        "pm01_01.txt_crowdin.json",
+    ]
+
+
+def test_export_worker_stops_when_cancelled(
+    output_folder, script_folders, gui_exporter, monkeypatch
+):
+    file_pairs = sorted(
+        gui_exporter.get_file_pairs(*script_folders), key=lambda pair: pair["en"]
+    )
+    progress_queue = queue.Queue()
+    cancel_event = threading.Event()
+
+    export_file_pair = gui_exporter.export_file_pair
+
+    def export_and_cancel(file_pair, output_folder_path):
+        export_file_pair(file_pair, output_folder_path)
+        # Cancelled from the window while the first file was exported
+        cancel_event.set()
+
+    monkeypatch.setattr(gui_exporter, "export_file_pair", export_and_cancel)
+    gui_exporter.export_worker(file_pairs, output_folder, progress_queue, cancel_event)
+
+    assert drain(progress_queue) == [
+        ("progress", 1, 2, "pm01_00.txt.scn.m.json"),
+        ("cancelled", 1, 2),
+    ]
+    assert os.listdir(output_folder) == ["pm01_00.txt_crowdin.json"]
+
+
+def test_export_worker_reports_errors(tmp_path, gui_exporter):
+    progress_queue = queue.Queue()
+    missing_file = str(tmp_path / "missing.txt.scn.m.json")
+    gui_exporter.export_worker(
+        [{"en": missing_file, "ja": missing_file}],
+        str(tmp_path),
+        progress_queue,
+        threading.Event(),
+    )
+
+    [(kind, message)] = drain(progress_queue)
+    assert kind == "error" and message
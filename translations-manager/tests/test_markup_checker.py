@@ -0,0 +1,69 @@
+import json
+
+from markup_checker import STATE_FILENAME, check_file, compare_markup, main
+
+
+def write_crowdin_file(file_path, translation: str) -> None:
+    item = {
+        "text": "Hello[r]%name%",
+        "translations": {"es-ES": {"text": translation, "status": "translated"}},
+    }
+    file_path.write_text(
+        json.dumps({"texts": {"start": {"pm01_00-start.00": item}}}),
+        encoding="utf-8",
+    )
+
+
+def test_compare_markup():
+    assert compare_markup("a[r]b", "c[r]d") is None
+    assert compare_markup('[ruby text="x"]a[r]', "[ruby text='y']b") == {
+        "missing": ["tag:r"],
+        "extra": [],
+    }
+
+
+def test_unchanged_files_are_skipped_before_parsing(tmp_path, monkeypatch):
+    file_path = tmp_path / "pm01_00.txt_crowdin.json"
+    write_crowdin_file(file_path, "Hola")
+    file_state, checked_count = check_file(str(file_path), {})
+    assert checked_count == 1
+    assert file_state["lines"]["pm01_00-start.00"]["issue"]["missing"] == [
+        "substitution:%name%",
+        "tag:r",
+    ]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged file parsed")
+
+    monkeypatch.setattr(json, "loads", fail)
+    assert check_file(str(file_path), file_state) == (file_state, 0)
+
+
+def test_only_changed_lines_are_checked_again(tmp_path):
+    file_path = tmp_path / "pm01_00.txt_crowdin.json"
+    write_crowdin_file(file_path, "Hola")
+    file_state, _ = check_file(str(file_path), {})
+
+    # Same line, but the file changed elsewhere
+    content = json.loads(file_path.read_text(encoding="utf-8"))
+    content["texts"]["start"]["pm01_00-start.01"] = {
+        "text": "Bye",
+        "translations": {"es-ES": {"text": "Adiós", "status": "translated"}},
+    }
+    file_path.write_text(json.dumps(content), encoding="utf-8")
+
+    new_state, checked_count = check_file(str(file_path), file_state)
+    assert checked_count == 1
+    assert new_state["hash"] != file_state["hash"]
+    assert (
+        new_state["lines"]["pm01_00-start.00"]
+        == file_state["lines"]["pm01_00-start.00"]
+    )
+
+
+def test_main_keeps_the_state(tmp_path, capsys):
+    write_crowdin_file(tmp_path / "pm01_00.txt_crowdin.json", "Hola[r]%name%")
+    assert main(str(tmp_path)) == 0
+    assert (tmp_path / STATE_FILENAME).exists()
+    assert main(str(tmp_path)) == 0
+    assert "(0 lines checked)" in capsys.readouterr().out
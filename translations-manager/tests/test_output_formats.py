@@ -0,0 +1,131 @@
+import json, os
+
+import pytest
+
+from output_formats import (
+    EMITTERS,
+    CrowdinEmitter,
+    Emitter,
+    convert_folder,
+    find_format,
+)
+
+TRICKY_TEXTS = {
+    "en": 'He said "hi" & <left>,\nthen [r]\\n left',
+    "ja": "「こんにちは」\t、と言った",
+    "es-ES": 'Dijo "hola" y se fue\r\n',
+}
+
+
+def make_crowdin_file(folder) -> dict:
+    content = {
+        "texts": {
+            "start": {
+                "pm01_00-start.00": {
+                    "text": TRICKY_TEXTS["en"],
+                    "translations": {
+                        "ja": {"text": TRICKY_TEXTS["ja"], "status": "approved"},
+                        "en": {"text": TRICKY_TEXTS["en"], "status": "approved"},
+                        "es-ES": {
+                            "text": TRICKY_TEXTS["es-ES"],
+                            "status": "pretranslated",
+                        },
+                    },
+                    "context": "Original Text: 「こんにちは」\n\n> Isla: hi",
+                    "labels": ["scene-label:start", "scene-title:Good morning"],
+                },
+                "pm01_00-start.01": {
+                    "text": "",
+                    "translations": {
+                        "ja": {"text": "…", "status": "approved"},
+                        "en": {"text": "", "status": "untranslated"},
+                        "es-ES": {"text": "", "status": "untranslated"},
+                    },
+                    "context": "",
+                },
+            },
+            "choice": {
+                "pm01_00-choice.00": {
+                    "text": "Go left",
+                    "translations": {
+                        "ja": {"text": "左へ", "status": "approved"},
+                        "en": {"text": "Go left", "status": "approved"},
+                        "es-ES": {"text": "A la izquierda", "status": "translated"},
+                    },
+                    "context": "Options:\n> Go left (-> a)",
+                },
+            },
+        }
+    }
+    with open(os.path.join(folder, "pm01_00.txt_crowdin.json"), "w") as f:
+        json.dump(content, f, ensure_ascii=False)
+    return content
+
+
+@pytest.mark.parametrize("format_name", ["xliff", "po", "csv"])
+def test_round_trip(tmp_path, format_name):
+    content = make_crowdin_file(tmp_path)
+    converted_folder = tmp_path / format_name
+    converted_folder.mkdir()
+    assert convert_folder(str(tmp_path), str(converted_folder), [format_name]) == [
+        "pm01_00.txt" + EMITTERS[format_name].extension
+    ]
+
+    back_folder = tmp_path / "back"
+    back_folder.mkdir()
+    convert_folder(str(converted_folder), str(back_folder), ["crowdin"])
+    assert (
+        CrowdinEmitter.load_file(str(back_folder / "pm01_00.txt_crowdin.json"))
+        == content
+    )
+
+
+def test_export_writes_every_format(tmp_path, script_folders, json_exporter):
+    output_folder = tmp_path / "out"
+    output_folder.mkdir()
+    json_exporter.main(
+        *script_folders,
+        str(output_folder),
+        write_corpus_cache=False,
+        formats=("crowdin", "xliff", "po", "csv"),
+    )
+    file_names = sorted(os.listdir(output_folder))
+    assert len(file_names) == 8
+
+    crowdin = CrowdinEmitter.load_file(str(output_folder / "pm01_00.txt_crowdin.json"))
+    for file_name in file_names:
+        if file_name.startswith("pm01_00."):
+            emitter_class = find_format(file_name)
+            assert emitter_class.load_file(str(output_folder / file_name)) == crowdin
+
+
+def test_emitters_must_implement_every_method(tmp_path):
+    class IncompleteEmitter(Emitter):
+        name = "incomplete"
+        extension = ".txt"
+
+        def start_file(self, file_path: str) -> None:
+            pass
+
+        def emit_record(self, record) -> None:
+            pass
+
+        def finish_file(self) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteEmitter(str(tmp_path))
+
+
+def test_xliff_leaves_out_characters_xml_does_not_allow(tmp_path):
+    content = make_crowdin_file(tmp_path)
+    item = content["texts"]["start"]["pm01_00-start.00"]
+    item["text"] = item["translations"]["en"]["text"] = "Bell\x07 \x0bring\r\n"
+    with open(tmp_path / "pm01_00.txt_crowdin.json", "w") as f:
+        json.dump(content, f, ensure_ascii=False)
+
+    xliff_folder = tmp_path / "xliff"
+    xliff_folder.mkdir()
+    convert_folder(str(tmp_path), str(xliff_folder), ["xliff"])
+    loaded = EMITTERS["xliff"].load_file(str(xliff_folder / "pm01_00.txt.xliff"))
+    assert loaded["texts"]["start"]["pm01_00-start.00"]["text"] == "Bell ring\r\n"
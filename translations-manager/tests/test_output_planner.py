@@ -0,0 +1,70 @@
+import json, os
+
+from crowdin_validator import validate_folder
+from output_planner import (
+    BUNDLE_INDEX_FILENAME,
+    plan_bundles,
+    split_bundles,
+    write_bundles,
+)
+
+
+def load_texts(file_path: str) -> dict:
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)["texts"]
+
+
+def exported_files(exported_folder: str) -> dict:
+    return {
+        file_name: {"texts": load_texts(os.path.join(exported_folder, file_name))}
+        for file_name in sorted(os.listdir(exported_folder))
+        if file_name.endswith(".txt_crowdin.json")
+    }
+
+
+def test_plan_keeps_previous_bundles():
+    scenes = [("a", 3, 10), ("b", 3, 10), ("c", 3, 10)]
+    assignments = plan_bundles(scenes, {}, max_lines=5, max_bytes=100)
+    assert assignments == {
+        "a": "bundle-0001.txt_crowdin.json",
+        "b": "bundle-0002.txt_crowdin.json",
+        "c": "bundle-0003.txt_crowdin.json",
+    }
+
+    previous_index = {key: {"bundle": bundle} for key, bundle in assignments.items()}
+    new_scenes = [("d", 1, 10), *scenes]
+    new_assignments = plan_bundles(new_scenes, previous_index, 5, 100)
+    assert {key: new_assignments[key] for key in assignments} == assignments
+    assert new_assignments["d"] == "bundle-0001.txt_crowdin.json"
+
+
+def test_bundles_split_back_to_the_exported_files(tmp_path, exported_folder):
+    merged_translations_by_file = exported_files(exported_folder)
+    bundle_folder = tmp_path / "bundles"
+    bundle_folder.mkdir()
+    bundles = write_bundles(merged_translations_by_file, str(bundle_folder), 4)
+    assert len(bundles) > 1
+    assert (bundle_folder / BUNDLE_INDEX_FILENAME).exists()
+
+    split_folder = tmp_path / "split"
+    split_folder.mkdir()
+    assert split_bundles(str(bundle_folder), str(split_folder)) == sorted(
+        merged_translations_by_file
+    )
+
+    # Splitting gives back the exported strings, labels included
+    for file_name in merged_translations_by_file:
+        assert load_texts(os.path.join(split_folder, file_name)) == load_texts(
+            os.path.join(exported_folder, file_name)
+        )
+
+
+def test_bundle_scene_labels_match_their_scene_keys(tmp_path, exported_folder):
+    bundle_folder = tmp_path / "bundles"
+    bundle_folder.mkdir()
+    write_bundles(exported_files(exported_folder), str(bundle_folder))
+
+    # The same scene labels are in every script, the bundle still routes each string
+    texts = load_texts(str(bundle_folder / "bundle-0001.txt_crowdin.json"))
+    assert "pm01_00-start" in texts and "pm01_01-start" in texts
+    assert validate_folder(str(bundle_folder), jobs=1) == []
@@ -0,0 +1,121 @@
+import pretranslator, pytest
+
+from markup_checker import compare_markup
+from pretranslator import (
+    FAKE_TRANSLATION_MARKER,
+    PRETRANSLATED_STATUS,
+    FakeBackend,
+    TranslationBackend,
+    TranslationBackendError,
+    TranslationCache,
+    make_batches,
+    pretranslate,
+    translate_with_retries,
+)
+
+
+def make_merged_translations(*texts: str) -> dict:
+    return {
+        "texts": {
+            "start": {
+                f"pm01_00-start.{i:02d}": {
+                    "text": text,
+                    "translations": {
+                        "en": {"text": text, "status": "approved"},
+                        "es-ES": {"text": "", "status": "untranslated"},
+                    },
+                }
+                for i, text in enumerate(texts)
+            }
+        }
+    }
+
+
+def test_backends_must_implement_translate_batch():
+    class IncompleteBackend(TranslationBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+def test_fake_translations_have_no_markup():
+    translations = FakeBackend().translate_batch(["Hi[r]there"], "en", "es-ES")
+    assert translations == [f"{FAKE_TRANSLATION_MARKER}Hi[r]there"]
+    assert compare_markup("Hi[r]there", translations[0]) is None
+
+
+def test_make_batches():
+    assert make_batches(["aa", "bb", "cccccc", "d"], 2, 5) == [
+        ["aa", "bb"],
+        ["cccccc"],
+        ["d"],
+    ]
+
+
+def test_pretranslate_deduplicates_and_caches(tmp_path):
+    merged_translations = make_merged_translations("Hi", "Bye", "Hi")
+    backend = FakeBackend(fail_every=2)
+    cache_path = str(tmp_path / "cache.jsonl")
+
+    stats = pretranslate(
+        [merged_translations],
+        backend,
+        TranslationCache(cache_path),
+        batch_max_texts=1,
+        concurrency=1,
+    )
+    assert stats["lines"] == 3
+    assert stats["translated_texts"] == 2
+    item = merged_translations["texts"]["start"]["pm01_00-start.02"]
+    assert item["translations"]["es-ES"] == {
+        "text": f"{FAKE_TRANSLATION_MARKER}Hi",
+        "status": PRETRANSLATED_STATUS,
+    }
+
+    stats = pretranslate(
+        [make_merged_translations("Hi", "Bye")], backend, TranslationCache(cache_path)
+    )
+    assert (stats["cached_texts"], stats["requests"]) == (2, 0)
+
+
+def test_cache_skips_an_incomplete_last_line(tmp_path):
+    cache_path = tmp_path / "cache.jsonl"
+    TranslationCache(str(cache_path)).add_many({"a": "A", "b": "B"})
+    # Interrupted while writing the next entry
+    with open(cache_path, "ab") as fp:
+        fp.write('{"key": "c", "transl'.encode("utf8"))
+
+    cache = TranslationCache(str(cache_path))
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("A", "B", None)
+
+    cache.add_many({"c": "C"})
+    assert TranslationCache(str(cache_path)).entries == {"a": "A", "b": "B", "c": "C"}
+
+
+def test_cache_skips_undecodable_lines(tmp_path):
+    cache_path = tmp_path / "cache.jsonl"
+    cache_path.write_bytes(b'{"key": "a", "translation": "A"}\n\xff\xfe{\n[]\n')
+    assert TranslationCache(str(cache_path)).entries == {"a": "A"}
+
+
+class FlakyBackend(TranslationBackend):
+    name = "flaky"
+
+    def __init__(self, errors: list) -> None:
+        self.errors = errors
+
+    def translate_batch(self, texts, source_language, target_language):
+        if self.errors:
+            raise self.errors.pop(0)
+        return texts
+
+
+def test_transport_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(pretranslator.time, "sleep", lambda seconds: None)
+    backend = FlakyBackend([ConnectionResetError("reset"), TimeoutError("timed out")])
+    assert translate_with_retries(backend, ["Hi"], "en", "es-ES", 2) == ["Hi"]
+
+    backend = FlakyBackend([TimeoutError("timed out")] * 3)
+    with pytest.raises(TranslationBackendError, match="TimeoutError"):
+        translate_with_retries(backend, ["Hi"], "en", "es-ES", 2)
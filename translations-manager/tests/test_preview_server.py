@@ -0,0 +1,114 @@
+import io, json, os
+
+import pytest
+
+from preview_server import LRUCache, PreviewRequestHandler, PreviewServer, render_file
+
+
+@pytest.fixture
+def preview_server(script_folders, tmp_path):
+    translations_folder = tmp_path / "translations"
+    translations_folder.mkdir()
+    server = PreviewServer(
+        ("127.0.0.1", 0), *script_folders, str(translations_folder), 1024 * 1024
+    )
+    yield server
+    server.server_close()
+
+
+def get(server: PreviewServer, path: str) -> tuple:
+    """
+    Runs the request handler without a connection. Returns `(status, body)`.
+    """
+    handler = PreviewRequestHandler.__new__(PreviewRequestHandler)
+    handler.server = server
+    handler.path = path
+    handler.command = "GET"
+    handler.request_version = "HTTP/1.1"
+    handler.requestline = f"GET {path} HTTP/1.1"
+    handler.client_address = ("127.0.0.1", 0)
+    handler.wfile = io.BytesIO()
+    handler.do_GET()
+
+    response = handler.wfile.getvalue()
+    headers, body = response.split(b"\r\n\r\n", 1)
+    return int(headers.split(b" ", 2)[1]), body.decode("utf8")
+
+
+def test_render_file(script_folders, tmp_path):
+    folder_en, folder_ja = script_folders
+    file_pair = {
+        "en": os.path.join(folder_en, "pm01_00.txt.scn.m.json"),
+        "ja": os.path.join(folder_ja, "pm01_00.txt.scn.m.json"),
+    }
+    translations_file_path = tmp_path / "pm01_00.txt_crowdin.json"
+    translations_file_path.write_text(
+        json.dumps(
+            {
+                "texts": {
+                    "start": {
+                        "pm01_00-start.01": {
+                            "translations": {
+                                "es-ES": {
+                                    "text": "Bien, <Tsukasa>.",
+                                    "status": "approved",
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    page = render_file(file_pair, str(translations_file_path)).decode("utf8")
+    assert "<h1>pm01_00.txt_crowdin.json</h1>" in page
+    assert "<h2 id='start'>Morning <small>(start)</small></h2>" in page
+    # The temporary name is shown before the character is revealed
+    assert "<td class='speaker'>Girl</td>" in page
+    assert "<span class='approved'>Bien, &lt;Tsukasa&gt;.</span>" in page
+    assert "<span class='untranslated'>(untranslated)</span>" in page
+    # Choices link to their target scene, which is on the page
+    assert "<a href='#a'>choice &rarr; a</a>" in page
+    assert "<h2 id='a'>" in page
+
+
+def test_index_lists_the_scripts(preview_server):
+    status, body = get(preview_server, "/")
+    assert status == 200
+    assert "<a href='/file/pm01_00.txt.scn.m.json'>" in body
+    assert "<a href='/file/pm01_01.txt.scn.m.json'>" in body
+
+
+def test_file_page_lookup(preview_server):
+    status, body = get(preview_server, "/file/pm01_01.txt.scn.m.json?scene=start")
+    assert status == 200
+    assert "<h1>pm01_01.txt_crowdin.json</h1>" in body
+    assert preview_server.file_page("pm01_99.txt.scn.m.json") is None
+
+
+@pytest.mark.parametrize("path", ["/file/pm01_99.txt.scn.m.json", "/other"])
+def test_not_found(preview_server, path):
+    status, _ = get(preview_server, path)
+    assert status == 404
+
+
+def test_pages_are_cached_until_their_files_change(preview_server, script_folders):
+    page = preview_server.file_page("pm01_00.txt.scn.m.json")
+    assert preview_server.file_page("pm01_00.txt.scn.m.json") is page
+
+    file_path = os.path.join(script_folders[0], "pm01_00.txt.scn.m.json")
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert preview_server.file_page("pm01_00.txt.scn.m.json") is not page
+
+
+def test_lru_cache_evicts_the_least_recently_used():
+    cache = LRUCache(max_bytes=10)
+    cache.get_or_build("a", (1,), lambda: b"aaaa")
+    cache.get_or_build("b", (1,), lambda: b"bbbb")
+    cache.get_or_build("a", (1,), lambda: b"")  # used again, kept
+    cache.get_or_build("c", (1,), lambda: b"cccc")
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.used_bytes == 8
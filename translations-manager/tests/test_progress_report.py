@@ -0,0 +1,97 @@
+import json, os
+
+import pytest
+
+from corpus_cache import CORPUS_CACHE_FILENAME, CorpusCache
+from progress_report import build_report
+
+# Lines and EN words of each script of the conftest scripts
+CHARACTERS = {
+    "Isla": (2, 6),
+    "Tsukasa": (1, 4),
+    "none": (2, 4),
+    "voice-off": (1, 3),
+}
+SCENE_TITLES = {"Choice": (2, 4), "Left": (1, 3), "Morning": (3, 10)}
+
+
+def counts(entries: dict, scripts: int = 2) -> dict:
+    return {
+        name: (entry["lines"] // scripts, entry["words"] // scripts)
+        for name, entry in entries.items()
+    }
+
+
+def remove_labels(folder: str) -> None:
+    for file_name in os.listdir(folder):
+        if not file_name.endswith(".txt_crowdin.json"):
+            continue
+        file_path = os.path.join(folder, file_name)
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        for texts in content["texts"].values():
+            for item in texts.values():
+                del item["labels"]
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(content, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def bundled_folder(tmp_path, script_folders, json_exporter) -> str:
+    output_folder = tmp_path / "bundles"
+    output_folder.mkdir()
+    json_exporter.main(*script_folders, str(output_folder), bundle=True)
+    return str(output_folder)
+
+
+def check_workload(report: dict) -> None:
+    workload = report["workload"]
+    assert report["totals"]["lines"] == 12
+    assert report["totals"]["words"] == 34
+    assert counts(workload["character"]) == CHARACTERS
+    assert counts(workload["scene-title"]) == SCENE_TITLES
+    assert counts(workload["file"], 1) == {
+        "pm01_00.txt_crowdin.json": (6, 17),
+        "pm01_01.txt_crowdin.json": (6, 17),
+    }
+    assert counts(workload["route"], 1) == {"pm01": (12, 34)}
+
+
+@pytest.mark.parametrize("labels", [True, False])
+def test_report_of_plain_files(exported_folder, labels):
+    if not labels:
+        remove_labels(exported_folder)
+    with CorpusCache(os.path.join(exported_folder, CORPUS_CACHE_FILENAME)) as corpus:
+        report = build_report(exported_folder, corpus=corpus)
+    check_workload(report)
+    assert report["statuses"]["es-ES"] == {"untranslated": 12}
+
+
+@pytest.mark.parametrize("labels", [True, False])
+def test_report_of_bundles(bundled_folder, labels):
+    assert any(name.startswith("bundle-") for name in os.listdir(bundled_folder))
+    if not labels:
+        remove_labels(bundled_folder)
+    with CorpusCache(os.path.join(bundled_folder, CORPUS_CACHE_FILENAME)) as corpus:
+        report = build_report(bundled_folder, corpus=corpus)
+    check_workload(report)
+
+
+def test_remaining_workload(exported_folder):
+    file_path = os.path.join(exported_folder, "pm01_00.txt_crowdin.json")
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = json.load(f)
+    content["texts"]["start"]["pm01_00-start.00"]["translations"]["es-ES"] = {
+        "text": "¡Buenos días![r]¿Cómo estás?",
+        "status": "approved",
+    }
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(content, f, ensure_ascii=False)
+
+    report = build_report(exported_folder)
+    assert report["totals"]["remaining_lines"] == 11
+    assert report["totals"]["remaining_words"] == 30
+    assert report["workload"]["character"]["Tsukasa"]["remaining_words"] == 4
+    assert (
+        report["workload"]["file"]["pm01_00.txt_crowdin.json"]["remaining_lines"] == 5
+    )
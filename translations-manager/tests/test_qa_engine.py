@@ -0,0 +1,52 @@
+import json, os
+
+from qa_engine import CACHE_FILENAME, main
+
+
+def write_crowdin_file(folder: str, translation: str) -> None:
+    item = {
+        "text": "Good morning![r]",
+        "translations": {
+            "ja": {"text": "おはよう！[r]", "status": "approved"},
+            "en": {"text": "Good morning![r]", "status": "approved"},
+            "es-ES": {"text": translation, "status": "translated"},
+        },
+    }
+    with open(os.path.join(folder, "pm01_00.txt_crowdin.json"), "w") as f:
+        json.dump({"texts": {"start": {"pm01_00-start.00": item}}}, f)
+
+
+def run_json(capsys, *arguments, **options) -> dict:
+    main(*arguments, output_json=True, jobs=1, **options)
+    return json.loads(capsys.readouterr().out)
+
+
+def test_wrapped_translations_dont_overflow(tmp_path, capsys):
+    # Wider than a row, but wrapped in 2 of the 3 rows
+    write_crowdin_file(str(tmp_path), "¡Buenos días! " * 5 + "[r]")
+    report = run_json(capsys, str(tmp_path), rule_codes=["overflow"])
+    assert report["issues"] == []
+
+    write_crowdin_file(str(tmp_path), "x" * 60 + "[r]")
+    report = run_json(capsys, str(tmp_path), rule_codes=["overflow"])
+    assert [entry["message"] for entry in report["issues"]] == ["width 60, 1 rows"]
+
+
+def test_markup_rule(tmp_path, capsys):
+    write_crowdin_file(str(tmp_path), "¡Buenos días!")
+    report = run_json(capsys, str(tmp_path), rule_codes=["markup"])
+    assert [entry["code"] for entry in report["issues"]] == ["markup"]
+
+
+def test_cache_next_to_the_sources(script_folders, tmp_path, monkeypatch, capsys):
+    working_folder = tmp_path / "cwd"
+    working_folder.mkdir()
+    monkeypatch.chdir(working_folder)
+    assert main(None, *script_folders, jobs=1) == 0
+    assert "(2 files checked, 0 cached)" in capsys.readouterr().out
+    # next to the EN and JA folders, not in the working folder nor among the scripts
+    assert (tmp_path / CACHE_FILENAME).exists()
+    assert os.listdir(working_folder) == []
+
+    assert main(None, *script_folders, jobs=1) == 0
+    assert "(0 files checked, 2 cached)" in capsys.readouterr().out
@@ -0,0 +1,67 @@
+from plamemo import extract_translations, iter_line_records, translations_merger
+
+from conftest import make_script
+
+
+def test_records_in_script_order(script_folders):
+    records = list(iter_line_records(*script_folders))
+    assert [record.identifier for record in records[:6]] == [
+        "pm01_00-start.00",
+        "pm01_00-start.01",
+        "pm01_00-start.02",
+        "pm01_00-choice.00",
+        "pm01_00-choice.01",
+        "pm01_00-a.00",
+    ]
+    assert len(records) == 12
+
+    record = records[1]
+    assert record.file_name == "pm01_00.txt.scn.m.json"
+    assert record.output_file_name == "pm01_00.txt_crowdin.json"
+    assert (record.character, record.before_revealing_name) == ("Isla", "Girl")
+    assert (record.text_en, record.text_ja) == (
+        "I'm fine, Tsukasa.",
+        "元気です、ツカサ。",
+    )
+    assert record.scene_title == "Morning"
+
+
+def test_selection_records(script_folders):
+    records = list(iter_line_records(*script_folders, scenes=["choice"]))
+    assert [record.scene_target for record in records] == ["a", "b"] * 2
+    assert {record.scene_type for record in records} == {"selection"}
+    assert {record.character for record in records} == {None}
+
+
+def test_filters(script_folders):
+    records = list(
+        iter_line_records(
+            *script_folders,
+            files=["pm01_01.txt.scn.m.json"],
+            scenes=["Morning"],
+            characters=["Isla"],
+        )
+    )
+    assert [record.identifier for record in records] == ["pm01_01-start.01"]
+
+
+def test_merged_lines_keep_their_labels(script_folders):
+    record = next(iter(iter_line_records(*script_folders)))
+    assert record.labels == [
+        "character:Tsukasa",
+        "scene-type:default",
+        "scene-label:start",
+        "scene-title:Morning",
+        "filename:pm01_00.txt",
+    ]
+
+
+def test_merged_lines_without_labels_get_their_scene_label():
+    # The simplified extraction has no labels, the Japanese-only lines still get one
+    translations_ja = extract_translations(
+        make_script("ja", "pm01_00.txt"), simplified=True
+    )
+    merged = translations_merger(None, translations_ja)
+    assert merged["texts"]["choice"]["pm01_00-choice.01"]["labels"] == [
+        "scene-label:choice"
+    ]
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from text_overflow_checker import TextWidthMeter, check_overflow, measure_overflow
+
+
+@pytest.fixture
+def meter():
+    return TextWidthMeter()
+
+
+def test_full_width_glyphs_count_double(meter):
+    assert meter.text_width("abc") == 3
+    assert meter.text_width("あいう") == 6
+
+
+def test_wrapped_text_that_fits_is_not_flagged(meter):
+    # wider than the box, but it fits once wrapped
+    text = "aaaa bbbb cccc"
+    assert meter.wrapped_rows(text, 10) == [9, 4]
+    assert measure_overflow(meter, text, 10, 2) is None
+
+
+def test_too_many_rows(meter):
+    assert measure_overflow(meter, "aaaa bbbb cccc dddd", 10, 1) == {
+        "width": 9,
+        "rows": 2,
+    }
+    assert measure_overflow(meter, "a[r]b[r]c", 10, 2) == {"width": 1, "rows": 3}
+
+
+def test_trailing_line_break_and_markup_are_ignored(meter):
+    assert meter.wrapped_rows("[ruby text=x]abc[l][r]", 10) == [3]
+
+
+def test_unbreakable_word_wider_than_a_row(meter):
+    assert measure_overflow(meter, "a " + "x" * 12, 10, 3) == {"width": 12, "rows": 2}
+
+
+def test_full_width_text_wraps_anywhere(meter):
+    assert meter.wrapped_rows("あ" * 8, 10) == [10, 6]
+    assert measure_overflow(meter, "あ" * 8, 10, 2) is None
+
+
+def test_check_overflow_reads_the_folder(tmp_path, meter):
+    item = {
+        "text": "Hi",
+        "translations": {
+            "es-ES": {"text": "x" * 60, "status": "translated"},
+            "en": {"text": "Hi", "status": "approved"},
+        },
+    }
+    (tmp_path / "pm01_00.txt_crowdin.json").write_text(
+        json.dumps({"texts": {"start": {"pm01_00-start.00": item}}}),
+        encoding="utf-8",
+    )
+    overflows = check_overflow(str(tmp_path), meter)
+    assert [(entry["language"], entry["width"]) for entry in overflows] == [
+        ("es-ES", 60)
+    ]
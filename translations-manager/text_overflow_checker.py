@@ -0,0 +1,332 @@
+# Made for ENOSHIMA MEMO TEAM. https://github.com/enoshima-memo-team
+
+# This script finds lines that don't fit in the game's text box.
+# It measures the rendered width of every `es-ES`, EN and JA text of the `.txt_crowdin.json` files.
+
+# For any questions, visit https://github.com/enoshima-memo-team/plamemo-vn-scripts/blob/develop/README.md#contact-us
+
+# TODO: remove after Python < 3.9 is no longer used/supported
+from __future__ import annotations
+
+import re, json, os, argparse, unicodedata
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from corpus_cache import CORPUS_CACHE_FILENAME, CorpusCache, open_corpus_cache
+from output_planner import BUNDLE_INDEX_FILENAME, load_bundle_index, source_scene
+from plamemo import (
+    CROWDIN_FILE_SUFFIX,
+    ENGLISH_TAG,
+    JAPANESE_TAG,
+    SPANISH_TAG,
+    get_crowdin_files,
+    label_value,
+)
+
+
+# Text box size, in width units (a half-width glyph is 1 unit, a full-width glyph is 2)
+DEFAULT_MAX_LINE_WIDTH = 56
+DEFAULT_MAX_LINES = 3
+
+# East Asian width classes (https://www.unicode.org/reports/tr11/)
+# Ambiguous (A) glyphs are rendered half-width by the game font
+EAST_ASIAN_WIDTHS = {"F": 2, "W": 2, "A": 1, "H": 1, "Na": 1, "N": 1}
+
+# Explicit line break markup: engine `[r]` tags and literal newlines
+LINE_BREAK_PATTERN = re.compile(r"\[r\]|\\n|\n")
+# Any other inline tag (e.g. `[l]`, `[ruby text=...]`) is not rendered
+MARKUP_PATTERN = re.compile(r"\[[^\[\]]*\]")
+# Words and the spaces before them, the game wraps rows between words
+WORD_PATTERN = re.compile(r"(\s*)(\S+)")
+
+
+# ============================== WIDTHS ====================================
+
+
+def load_width_table(width_table_path: Optional[str]) -> dict:
+    """
+    Loads a glyph width table: a JSON object of `"<character>": <width>` overrides.
+    Keys can also be `"U+XXXX"` code points.
+    """
+    if not width_table_path:
+        return {}
+
+    with open(width_table_path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+
+    widths = {}
+    for glyph, width in table.items():
+        if glyph.upper().startswith("U+"):
+            glyph = chr(int(glyph[2:], 16))
+        widths[glyph] = width
+    return widths
+
+
+class TextWidthMeter:
+    """
+    Measures rendered text widths. Widths are memoized per code point.
+    """
+
+    def __init__(self, width_overrides: Optional[dict] = None) -> None:
+        self.width_overrides = width_overrides or {}
+        # per-instance memoized width of a single character
+        self.char_width = lru_cache(maxsize=None)(self._char_width)
+
+    def _char_width(self, char: str) -> int:
+        if char in self.width_overrides:
+            return self.width_overrides[char]
+        # Combining marks and control characters take no space
+        if unicodedata.combining(char) or unicodedata.category(char) in ("Cc", "Cf"):
+            return 0
+        return EAST_ASIAN_WIDTHS.get(unicodedata.east_asian_width(char), 1)
+
+    def text_width(self, text: str) -> int:
+        char_width = self.char_width
+        return sum(char_width(char) for char in text)
+
+    def word_widths(self, line: str) -> Iterator[tuple]:
+        """
+        Yields `(space width, word width)` of the unbreakable words of a rendered line.
+        Full-width glyphs can be wrapped anywhere, so each one is a word by itself.
+        """
+        char_width = self.char_width
+        for spaces, word in WORD_PATTERN.findall(line):
+            space_width = self.text_width(spaces)
+            if not any(char_width(char) > 1 for char in word):
+                yield space_width, self.text_width(word)
+                continue
+            run_width = 0
+            for char in word:
+                width = char_width(char)
+                if width > 1:
+                    if run_width:
+                        yield space_width, run_width
+                        space_width, run_width = 0, 0
+                    yield space_width, width
+                    space_width = 0
+                else:
+                    run_width += width
+            if run_width:
+                yield space_width, run_width
+
+    def wrapped_rows(self, text: str, max_line_width: int) -> list[int]:
+        """
+        Returns the width of every row once the game wraps the text at `max_line_width`.
+        A row is only wider than that when it holds a single word that can't be wrapped.
+        """
+        rows = []
+        for line in LINE_BREAK_PATTERN.split(text):
+            row_width = 0
+            for space_width, word_width in self.word_widths(
+                MARKUP_PATTERN.sub("", line)
+            ):
+                if row_width and row_width + space_width + word_width > max_line_width:
+                    rows.append(row_width)
+                    row_width = word_width
+                else:
+                    row_width += space_width + word_width
+            rows.append(row_width)
+        # a trailing line break doesn't start a new row
+        while len(rows) > 1 and not rows[-1]:
+            rows.pop()
+        return rows
+
+
+# ============================== CHECKS ====================================
+
+
+def iter_texts(
+    file_path: str,
+    languages: tuple,
+    corpus: Optional[CorpusCache] = None,
+    scenes_index: Optional[dict] = None,
+) -> Iterator[dict]:
+    """
+    Yields every non-empty text of the selected languages in a Crowdin file, with its details.
+    Files exported without labels don't carry the character nor the scene title, so they're
+    taken from the corpus cache when available and up to date. Scenes of bundles are reported
+    with the script they were exported from, found in `scenes_index` (see `bundles-index.json`).
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = json.load(f)
+
+    sections = {}
+    for scene_label, texts in content.get("texts", {}).items():
+        file_name, source_scene_label = source_scene(
+            scenes_index or {}, os.path.basename(file_path), scene_label
+        )
+        # A bundle holds scenes of many scripts, each section is loaded once
+        if file_name not in sections:
+            sections[file_name] = (
+                corpus.section(
+                    file_name.replace(CROWDIN_FILE_SUFFIX, ".txt.scn.m.json")
+                )
+                if corpus is not None
+                else None
+            )
+        section = sections[file_name]
+
+        for identifier, item in texts.items():
+            labels = item.get("labels", [])
+            translations = item.get("translations", {})
+            # Lines whose texts differ from the cached ones are stale
+            line = (
+                section.find(
+                    identifier,
+                    translations.get(ENGLISH_TAG, {}).get("text"),
+                    translations.get(JAPANESE_TAG, {}).get("text"),
+                )
+                if section is not None
+                else None
+            )
+            details = {
+                "file": file_name,
+                "identifier": identifier,
+                "character": (
+                    item.get("character")
+                    or label_value(labels, "character")
+                    or (line.character if line else None)
+                ),
+                "scene-title": (
+                    label_value(labels, "scene-title")
+                    or (line.scene_title if line else None)
+                    or source_scene_label
+                ),
+            }
+            for lang in languages:
+                text = translations.get(lang, {}).get("text")
+                if text:
+                    yield {**details, "language": lang, "text": text}
+
+
+def measure_overflow(
+    meter: TextWidthMeter,
+    text: str,
+    max_line_width: int = DEFAULT_MAX_LINE_WIDTH,
+    max_lines: int = DEFAULT_MAX_LINES,
+) -> Optional[dict]:
+    """
+    Returns the `width` of the widest row and the number of `rows` of the wrapped text
+    when it doesn't fit in the box, or None if it fits.
+    A text overflows when wrapping it needs more rows than the box has, or when a word
+    is wider than a row. Shared by this checker and the QA engine's overflow rule.
+    """
+    rows = meter.wrapped_rows(text, max_line_width)
+    widest = max(rows)
+    if len(rows) > max_lines or widest > max_line_width:
+        return {"width": widest, "rows": len(rows)}
+    return None
+
+
+def check_overflow(
+    folder: str,
+    meter: TextWidthMeter,
+    languages: tuple = (SPANISH_TAG, ENGLISH_TAG, JAPANESE_TAG),
+    max_line_width: int = DEFAULT_MAX_LINE_WIDTH,
+    max_lines: int = DEFAULT_MAX_LINES,
+    corpus: Optional[CorpusCache] = None,
+) -> list[dict]:
+    """
+    Checks every text of the folder in a single pass (see `measure_overflow`).
+    """
+    scenes_index = load_bundle_index(os.path.join(folder, BUNDLE_INDEX_FILENAME))
+    overflows = []
+    for file_path in get_crowdin_files(folder):
+        for entry in iter_texts(file_path, languages, corpus, scenes_index):
+            overflow = measure_overflow(meter, entry["text"], max_line_width, max_lines)
+            if overflow is not None:
+                overflows.append({**entry, **overflow})
+    return overflows
+
+
+# ================================ MAIN ======================================
+
+
+def main(
+    folder=None,
+    languages=None,
+    max_line_width=DEFAULT_MAX_LINE_WIDTH,
+    max_lines=DEFAULT_MAX_LINES,
+    width_table_path=None,
+    output_json=False,
+) -> int:
+    """
+    Checks the folder and prints the overflowing lines. Returns the process exit code.
+    """
+    meter = TextWidthMeter(load_width_table(width_table_path))
+
+    corpus_cache_path = os.path.join(folder, CORPUS_CACHE_FILENAME)
+    corpus = open_corpus_cache(corpus_cache_path)
+    try:
+        overflows = check_overflow(
+            folder,
+            meter,
+            tuple(languages or (SPANISH_TAG, ENGLISH_TAG, JAPANESE_TAG)),
+            max_line_width,
+            max_lines,
+            corpus,
+        )
+    finally:
+        if corpus is not None:
+            corpus.close()
+
+    if output_json:
+        print(json.dumps(overflows, ensure_ascii=False, indent=2))
+    else:
+        for entry in overflows:
+            print(
+                f"{entry['identifier']} [{entry['language']}] {entry['character'] or '-'}"
+                f" @ {entry['scene-title']}: width {entry['width']}/{max_line_width},"
+                f" {entry['rows']}/{max_lines} rows"
+            )
+            print(f"    {entry['text']}")
+        print(f"\n{len(overflows)} overflowing lines.")
+
+    return 1 if overflows else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Find texts of CROWDIN files that overflow the game's text box."
+    )
+    parser.add_argument(
+        "folder",
+        type=str,
+        help="Path to the folder containing .txt_crowdin.json files.",
+    )
+    parser.add_argument(
+        "--language",
+        action="append",
+        choices=(SPANISH_TAG, ENGLISH_TAG, JAPANESE_TAG),
+        help="Language to check, can be repeated (default: all).",
+    )
+    parser.add_argument(
+        "--max-line-width",
+        type=int,
+        default=DEFAULT_MAX_LINE_WIDTH,
+        help=f"Text box width in half-width glyphs (default: {DEFAULT_MAX_LINE_WIDTH}).",
+    )
+    parser.add_argument(
+        "--max-lines",
+        type=int,
+        default=DEFAULT_MAX_LINES,
+        help=f"Text box rows (default: {DEFAULT_MAX_LINES}).",
+    )
+    parser.add_argument(
+        "--width-table",
+        type=str,
+        help='JSON file with per-glyph width overrides, e.g. {"W": 2, "U+2026": 2}.',
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    exit(
+        main(
+            args.folder,
+            args.language,
+            args.max_line_width,
+            args.max_lines,
+            args.width_table,
+            args.json,
+        )
+    )